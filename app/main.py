@@ -1,9 +1,515 @@
-from modules import process_workbooks, process_data_base, merge_last_dbs
+from typing import Optional
+import argparse
+import os
+import sys
 import warnings
 
 warnings.filterwarnings("ignore", category=UserWarning, module="openpyxl")
 
-if __name__ == "__main__":  
-    # process_workbooks("Permissionária")
-    # process_data_base("Concessionária")
-    merge_last_dbs()
+AGENTS = ["Concessionária", "Permissionária"]
+
+OUTPUT_MODES = ["denormalized", "star"]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = _create_parser()
+    args = parser.parse_args(argv)
+
+    if getattr(args, "resume", False) and _is_partial(args):
+        parser.error("--resume só vale para a reconstrução completa; não use com --tariff-process, --since ou --until")
+
+    if not hasattr(args, "run"):
+        parser.print_help()
+        return 1
+
+    try:
+        return args.run(args) or 0
+    except ValueError as error:
+        print(f"Erro: {error}")
+        return 2
+
+
+def _create_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Extração e consolidação das planilhas tarifárias.")
+    subparsers = parser.add_subparsers(title="comandos")
+
+    process_parser = subparsers.add_parser("process", help="Extrai as planilhas e monta os bancos das distribuidoras")
+    _add_agent_argument(process_parser)
+    _add_filter_arguments(process_parser)
+    _add_processing_arguments(process_parser)
+    process_parser.add_argument("--resume", action="store_true", help="Retoma a última execução interrompida")
+    process_parser.add_argument("--consolidate", action="store_true", help="Também reconstrói os bancos consolidados")
+    process_parser.add_argument("--dry-run", action="store_true", help="Mostra o plano de execução sem processar nada")
+    _add_aggregates_argument(process_parser)
+    process_parser.set_defaults(run=_run_process)
+
+    data_base_parser = subparsers.add_parser("data-base", help="Consolida os bancos das distribuidoras de um agente")
+    _add_agent_argument(data_base_parser)
+    _add_mode_argument(data_base_parser)
+    _add_compression_argument(data_base_parser)
+    data_base_parser.set_defaults(run=_run_data_base)
+
+    merge_parser = subparsers.add_parser("merge", help="Junta os bancos consolidados em BANCO_Geral.xlsx")
+    _add_mode_argument(merge_parser)
+    _add_compression_argument(merge_parser)
+    merge_parser.set_defaults(run=_run_merge)
+
+    watch_parser = subparsers.add_parser("watch", help="Monitora e processa planilhas novas automaticamente")
+    _add_agent_argument(watch_parser)
+    _add_processing_arguments(watch_parser)
+    watch_parser.add_argument("--interval", type=float, default=30.0, help="Segundos entre verificações")
+    watch_parser.add_argument("--settle", type=float, default=10.0, help="Segundos sem alteração antes de processar um arquivo")
+    watch_parser.add_argument("--process-existing", action="store_true", help="Processa as planilhas já existentes na primeira execução")
+    _add_aggregates_argument(watch_parser)
+    watch_parser.set_defaults(run=_run_watch)
+
+    tariff_parser = subparsers.add_parser("tariff", help="Consulta a tarifa vigente no BANCO_Geral.xlsx")
+    tariff_parser.add_argument("sigla", help="Sigla da distribuidora")
+    tariff_parser.add_argument("--subgroup", required=True, help="Subgrupo (ex.: B1)")
+    tariff_parser.add_argument("--modality", required=True, help="Modalidade (ex.: CONVENCIONAL)")
+    tariff_parser.add_argument("--post", help="Posto tarifário (padrão: todos os postos)")
+    tariff_parser.add_argument("--date", type=_parse_date, required=True, help="Data da consulta (ou início do período com --until)")
+    tariff_parser.add_argument("--until", type=_parse_date, help="Fim do período consultado")
+    tariff_parser.add_argument("--tabs", nargs="+", choices=["TUSD", "TE", "TABELAS REH"], help="Abas consultadas")
+    tariff_parser.add_argument("--rebuild", action="store_true", help="Reconstrói o índice de vigências")
+    tariff_parser.set_defaults(run=_run_tariff)
+
+    diff_parser = subparsers.add_parser("diff", help="Compara cada processo com o anterior da mesma distribuidora")
+    diff_parser.add_argument("--sigla", nargs="+", help="Siglas das distribuidoras")
+    diff_parser.add_argument("--tabs", nargs="+", choices=["CUSTOS", "TUSD", "TE", "TABELAS REH"], help="Abas comparadas")
+    diff_parser.add_argument("--output", help="Planilha de saída (padrão: Relatórios/ALTERACOES.xlsx)")
+    diff_parser.set_defaults(run=_run_diff)
+
+    aggregates_parser = subparsers.add_parser("aggregates", help="Atualiza as tabelas agregadas a partir dos bancos das distribuidoras")
+    aggregates_parser.add_argument("--output", help="Planilha de saída (padrão: Relatórios/AGREGADOS.xlsx)")
+    aggregates_parser.set_defaults(run=_run_aggregates)
+
+    shard_parser = subparsers.add_parser("shard", help="Divide o processamento em fragmentos para vários workers")
+    shard_parser.add_argument(
+        "action", 
+        choices=["plan", "worker", "status", "finish", "local"], 
+        help="plan: divide as distribuidoras; worker: processa fragmentos livres; status: lista pendentes; finish: consolida; local: tudo com processos locais"
+    )
+    _add_agent_argument(shard_parser)
+    _add_processing_arguments(shard_parser)
+    _add_compression_argument(shard_parser)
+    shard_parser.add_argument("--sigla", nargs="+", help="Siglas das distribuidoras")
+    shard_parser.add_argument("--shards", type=int, default=2, help="Número de fragmentos (para plan e local)")
+    shard_parser.add_argument("--strategy", choices=["cost", "hash"], default="cost", help="cost: equilibra o tempo estimado; hash: distribuição fixa por sigla")
+    shard_parser.add_argument("--processes", type=int, default=2, help="Número de workers locais (para local)")
+    _add_aggregates_argument(shard_parser)
+    shard_parser.set_defaults(run=_run_shard)
+
+    daemon_parser = subparsers.add_parser("daemon", help="Serviço residente que mantém caches carregados e recebe tarefas")
+    daemon_parser.add_argument(
+        "action", 
+        choices=["start", "stop", "status", "process", "rebuild", "merge"], 
+        help="start: inicia o serviço; process: planilhas novas (ou --files); rebuild: refaz distribuidoras; merge: consolida"
+    )
+    _add_agent_argument(daemon_parser)
+    _add_processing_arguments(daemon_parser)
+    _add_compression_argument(daemon_parser)
+    daemon_parser.add_argument("--sigla", nargs="+", help="Siglas das distribuidoras (para rebuild)")
+    daemon_parser.add_argument("--files", nargs="+", help="Planilhas a processar (para process; padrão: novas ou alteradas)")
+    daemon_parser.add_argument("--consolidate", action="store_true", help="Também reconstrói os bancos consolidados (para rebuild)")
+    _add_aggregates_argument(daemon_parser)
+    daemon_parser.add_argument("--socket", help="Caminho do socket Unix do serviço")
+    daemon_parser.add_argument("--cache-entries", type=int, default=32, help="Planilhas mantidas em memória pelo serviço")
+    daemon_parser.set_defaults(run=_run_daemon)
+
+    sqlite_parser = subparsers.add_parser("sqlite", help="Exporta um banco XLSX para SQLite com as colunas categóricas codificadas")
+    sqlite_parser.add_argument("--input", help="Banco de entrada (padrão: Banco de Dados/BANCO_Geral.xlsx)")
+    sqlite_parser.add_argument("--output", help="Arquivo SQLite de saída (padrão: o de entrada com extensão .sqlite)")
+    sqlite_parser.add_argument("--tabs", nargs="+", help="Abas exportadas")
+    sqlite_parser.set_defaults(run=_run_sqlite)
+
+    compare_parser = subparsers.add_parser("compare", help="Verifica se dois bancos de saída (XLSX ou SQLite) têm os mesmos dados")
+    compare_parser.add_argument("left", help="Banco de referência (ex.: gerado pelo pipeline anterior)")
+    compare_parser.add_argument("right", help="Banco comparado")
+    compare_parser.add_argument("--tabs", nargs="+", help="Abas comparadas")
+    compare_parser.add_argument("--unordered", action="store_true", help="Ignora a ordem das linhas dentro de cada aba")
+    compare_parser.add_argument("--raw", action="store_true", help="Não resolve os IDs de processo dos bancos em estrela")
+    compare_parser.add_argument("--digits", type=int, help="Algarismos significativos considerados nos números decimais")
+    compare_parser.add_argument("--max-differences", type=int, default=10, help="Linhas diferentes mostradas por aba")
+    compare_parser.set_defaults(run=_run_compare)
+
+    serve_parser = subparsers.add_parser("serve", help="Serve recortes do BANCO_Geral.xlsx por HTTP (JSON ou CSV)")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Endereço de escuta")
+    serve_parser.add_argument("--port", type=int, default=8765, help="Porta de escuta")
+    serve_parser.add_argument("--cache-mb", type=int, default=256, help="Tamanho máximo do cache de respostas em MB")
+    serve_parser.set_defaults(run=_run_serve)
+
+    clear_cache_parser = subparsers.add_parser("clear-cache", help="Apaga o cache de planilhas lidas")
+    clear_cache_parser.set_defaults(run=_run_clear_cache)
+
+    arrange_parser = subparsers.add_parser("arrange", help="Organiza os nomes dos arquivos das distribuidoras")
+    arrange_parser.add_argument("action", choices=["rename", "missing"], help="rename: adiciona as datas aos nomes; missing: lista arquivos faltantes")
+    arrange_parser.set_defaults(run=_run_arrange)
+
+    distributor_parser = subparsers.add_parser("distributor-info", help="Consulta o cadastro de distribuidoras")
+    distributor_parser.add_argument("action", choices=["show", "folders"], help="show: mostra os dados de uma sigla; folders: cria as pastas")
+    distributor_parser.add_argument("sigla", nargs="?", help="Sigla da distribuidora (para show)")
+    distributor_parser.set_defaults(run=_run_distributor_info)
+
+    return parser
+
+
+def _add_agent_argument(parser: argparse.ArgumentParser):
+    parser.add_argument("--agent", choices=AGENTS, default="Concessionária", help="Tipo de agente")
+
+
+def _add_mode_argument(parser: argparse.ArgumentParser):
+    parser.add_argument("--mode", choices=OUTPUT_MODES, default="denormalized", help="Formato do banco de saída")
+    parser.add_argument("--sorted", action="store_true", help="Ordena as linhas por sigla, data do processo e chaves da aba")
+
+
+def _add_compression_argument(parser: argparse.ArgumentParser):
+    parser.add_argument("--compression-level", type=int, choices=range(0, 10), default=6, metavar="0-9", help="Nível de compressão do banco de saída")
+
+
+def _add_aggregates_argument(parser: argparse.ArgumentParser):
+    parser.add_argument("--aggregates", action="store_true", help="Também atualiza as tabelas agregadas (Relatórios/AGREGADOS.xlsx)")
+
+
+def _add_filter_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--sigla", nargs="+", help="Siglas das distribuidoras")
+    parser.add_argument("--tariff-process", nargs="+", help="Processos tarifários (ex.: Reajuste Revisão)")
+    parser.add_argument("--since", type=_parse_date, help="Data mínima do processo (dd/mm/aaaa ou aaaa-mm-dd)")
+    parser.add_argument("--until", type=_parse_date, help="Data máxima do processo (dd/mm/aaaa ou aaaa-mm-dd)")
+
+
+def _add_processing_arguments(parser: argparse.ArgumentParser):
+    _add_mode_argument(parser)
+    parser.add_argument("--tabs", nargs="+", help="Abas a extrair")
+    parser.add_argument("--workers", type=int, default=1, help="Número de processos em paralelo")
+    parser.add_argument("--no-cache", action="store_true", help="Não usa o cache de planilhas lidas")
+
+
+def _parse_date(text: str):
+    from modules.utils import get_date_from
+
+    date = get_date_from(text)
+
+    if date is None:
+        raise argparse.ArgumentTypeError(f"data inválida: {text}")
+
+    return date
+
+
+def _run_process(args: argparse.Namespace) -> int:
+    from modules import process_workbooks, process_new_workbooks, process_data_base, merge_last_dbs, select_workbook_jobs, inventory_workbook_jobs
+
+    jobs = select_workbook_jobs(
+        agent=args.agent,
+        distributors=args.sigla,
+        tariff_processes=args.tariff_process,
+        start_date=args.since,
+        end_date=args.until
+    )
+
+    is_partial = _is_partial(args)
+
+    if args.dry_run:
+        inventory_workbook_jobs(args.agent, jobs, tabs=args.tabs)
+        _print_plan(args.agent, jobs, is_partial)
+        return 0
+
+    if not jobs:
+        print("Nenhuma planilha corresponde aos filtros.")
+        return 0
+
+    if is_partial:
+        process_new_workbooks(
+            agent=args.agent,
+            file_paths=[job["file_path"] for job in jobs],
+            tabs=args.tabs,
+            workers=args.workers,
+            output_mode=args.mode,
+            use_cache=not args.no_cache,
+            consolidate=args.consolidate,
+            sorted_output=args.sorted,
+            update_aggregates=args.aggregates
+        )
+
+        return 0
+
+    process_workbooks(
+        agent=args.agent,
+        tabs=args.tabs,
+        workers=args.workers,
+        output_mode=args.mode,
+        use_cache=not args.no_cache,
+        resume=args.resume,
+        distributors=args.sigla,
+        sorted_output=args.sorted,
+        update_aggregates=args.aggregates
+    )
+
+    if args.consolidate:
+        process_data_base(args.agent, output_mode=args.mode, sorted_output=args.sorted)
+        merge_last_dbs(output_mode=args.mode, sorted_output=args.sorted)
+
+    return 0
+
+
+def _is_partial(args: argparse.Namespace) -> bool:
+    return args.tariff_process is not None or args.since is not None or args.until is not None
+
+
+def _print_plan(agent: str, jobs: list[dict[str, any]], is_partial: bool):
+    distributors = sorted({job["distributor"] for job in jobs})
+    action = "atualização incremental" if is_partial else "reconstrução completa"
+
+    skipped_count = sum(1 for job in jobs if job["skip_reason"] is not None)
+
+    print(f"Plano ({agent}s): {len(jobs)} planilha(s) em {len(distributors)} distribuidora(s), {action} dos bancos.")
+
+    if skipped_count:
+        print(f"{skipped_count} planilha(s) serão ignoradas.")
+
+    for distributor in distributors:
+        print(f"\n{distributor}")
+
+        for job in jobs:
+            if job["distributor"] != distributor:
+                continue
+
+            print(f"  {job['tariff_process']}: {os.path.basename(job['file_path'])} ({job['size'] / 1024 ** 2:.1f} MB)")
+
+            if job["skip_reason"] is not None:
+                print(f"    ignorada: {job['skip_reason']}")
+            else:
+                print(f"    abas: {', '.join(job['tabs'])}")
+
+
+def _run_data_base(args: argparse.Namespace) -> int:
+    from modules import process_data_base
+
+    process_data_base(args.agent, output_mode=args.mode, sorted_output=args.sorted, compression_level=args.compression_level)
+    return 0
+
+
+def _run_merge(args: argparse.Namespace) -> int:
+    from modules import merge_last_dbs
+
+    merge_last_dbs(output_mode=args.mode, sorted_output=args.sorted, compression_level=args.compression_level)
+    return 0
+
+
+def _run_watch(args: argparse.Namespace) -> int:
+    from modules import watch_workbooks
+
+    watch_workbooks(
+        agent=args.agent,
+        interval=args.interval,
+        settle_seconds=args.settle,
+        tabs=args.tabs,
+        workers=args.workers,
+        output_mode=args.mode,
+        use_cache=not args.no_cache,
+        process_existing=args.process_existing,
+        sorted_output=args.sorted,
+        update_aggregates=args.aggregates
+    )
+
+    return 0
+
+
+def _run_tariff(args: argparse.Namespace) -> int:
+    from modules import load_tariff_index
+
+    index = load_tariff_index(rebuild=args.rebuild)
+    keys = (args.sigla, args.subgroup, args.modality, args.post)
+
+    if args.until is None:
+        results = index.lookup(*keys, on=args.date, tabs=args.tabs)
+    else:
+        results = index.lookup_range(*keys, start=args.date, end=args.until, tabs=args.tabs)
+
+    if not results:
+        print("Nenhuma tarifa vigente encontrada.")
+        return 1
+
+    for result in results:
+        valid_until = result["valid_until"].strftime("%d/%m/%Y") if result["valid_until"] else "atual"
+        print(f"\n{result['tab']} - {result['post']} - {result['process']} ({result['valid_from']:%d/%m/%Y} a {valid_until})")
+
+        for row in result["rows"]:
+            print("  " + ", ".join(f"{key}: {value}" for key, value in row.items() if value is not None))
+
+    return 0
+
+
+def _run_diff(args: argparse.Namespace) -> int:
+    from modules import write_change_report
+
+    output_path = write_change_report(output_path=args.output, distributors=args.sigla, tabs=args.tabs)
+    print(f"Relatório de alterações salvo em {output_path}")
+    return 0
+
+
+def _run_aggregates(args: argparse.Namespace) -> int:
+    from modules import refresh_aggregates
+
+    refresh_aggregates(output_path=args.output)
+    return 0
+
+
+def _run_shard(args: argparse.Namespace) -> int:
+    from modules import plan_shards, run_shard_worker, get_pending_shards, finish_shards, run_local_shards
+
+    if args.action == "plan":
+        shards = plan_shards(
+            agent=args.agent,
+            shard_count=args.shards,
+            strategy=args.strategy,
+            distributors=args.sigla,
+            tabs=args.tabs,
+            output_mode=args.mode,
+            sorted_output=args.sorted
+        )
+
+        total_cost = sum(shard["cost"] for shard in shards) or 1
+
+        for shard in shards:
+            print(
+                f"Fragmento {shard['index']}: {shard['files']} planilha(s), "
+                f"{100 * shard['cost'] / total_cost:.0f}% do custo estimado - {', '.join(shard['distributors'])}"
+            )
+    elif args.action == "worker":
+        finished = run_shard_worker(agent=args.agent, workers=args.workers, use_cache=not args.no_cache)
+        print(f"\n{len(finished)} fragmento(s) processado(s) por este worker.")
+    elif args.action == "status":
+        pending = get_pending_shards(args.agent)
+
+        if not pending:
+            print("Todos os fragmentos foram concluídos.")
+
+        for shard in pending:
+            print(f"Fragmento {shard['index']}: {'em andamento em ' + shard['worker'] if shard['worker'] else 'livre'}")
+    elif args.action == "finish":
+        finish_shards(args.agent, compression_level=args.compression_level, update_aggregates=args.aggregates)
+    else:
+        run_local_shards(
+            agent=args.agent,
+            shard_count=args.shards,
+            processes=args.processes,
+            strategy=args.strategy,
+            distributors=args.sigla,
+            tabs=args.tabs,
+            output_mode=args.mode,
+            sorted_output=args.sorted,
+            use_cache=not args.no_cache,
+            update_aggregates=args.aggregates
+        )
+
+    return 0
+
+
+def _run_daemon(args: argparse.Namespace) -> int:
+    from modules import start_daemon, submit_job
+
+    if args.action == "start":
+        start_daemon(socket_path=args.socket, cache_entries=args.cache_entries)
+        return 0
+
+    request = {
+        "job": args.action,
+        "agent": args.agent,
+        "tabs": args.tabs,
+        "workers": args.workers,
+        "output_mode": args.mode,
+        "sorted_output": args.sorted,
+        "use_cache": not args.no_cache,
+        "compression_level": args.compression_level,
+        "distributors": args.sigla,
+        "files": [os.path.abspath(file_path) for file_path in args.files] if args.files else None,
+        "consolidate": args.consolidate if args.action == "rebuild" else True,
+        "update_aggregates": args.aggregates
+    }
+
+    ok, result = submit_job(request, socket_path=args.socket)
+
+    if ok and args.action == "status":
+        for key, value in result.items():
+            print(f"{key}: {value}")
+
+    return 0 if ok else 1
+
+
+def _run_sqlite(args: argparse.Namespace) -> int:
+    from modules import export_sqlite_db
+
+    base_path = os.path.join(os.path.dirname(__file__), "../")
+    base_path = os.path.abspath(base_path)
+
+    input_path = args.input or os.path.join(base_path, "Banco de Dados", "BANCO_Geral.xlsx")
+    output_path = args.output or os.path.splitext(input_path)[0] + ".sqlite"
+
+    if not os.path.exists(input_path):
+        raise ValueError(f"Banco não encontrado: {input_path}")
+
+    export_sqlite_db(input_path, output_path, tabs=args.tabs)
+    print(f"Banco SQLite salvo em {output_path}")
+    return 0
+
+
+def _run_compare(args: argparse.Namespace) -> int:
+    from modules import compare_outputs, print_comparison
+
+    results = compare_outputs(
+        left_path=args.left,
+        right_path=args.right,
+        tabs=args.tabs,
+        order="unordered" if args.unordered else "ordered",
+        resolve_processes=not args.raw,
+        significant_digits=args.digits,
+        max_differences=args.max_differences
+    )
+
+    return 0 if print_comparison(results) else 1
+
+
+def _run_serve(args: argparse.Namespace) -> int:
+    from modules import serve_data_base
+
+    serve_data_base(host=args.host, port=args.port, cache_bytes=args.cache_mb * 1024 ** 2)
+    return 0
+
+
+def _run_clear_cache(args: argparse.Namespace) -> int:
+    from modules import clear_workbook_cache
+
+    clear_workbook_cache()
+    return 0
+
+
+def _run_arrange(args: argparse.Namespace) -> int:
+    from modules.arrange import replace_all_files_suffixes, show_all_missing_files
+
+    if args.action == "rename":
+        replace_all_files_suffixes()
+    else:
+        show_all_missing_files()
+
+    return 0
+
+
+def _run_distributor_info(args: argparse.Namespace) -> int:
+    from modules.distributor_info import create_all_folders, get_distributor_info
+
+    if args.action == "folders":
+        create_all_folders()
+        return 0
+
+    if not args.sigla:
+        raise ValueError("Informe a sigla da distribuidora.")
+
+    for key, value in get_distributor_info(acronym=args.sigla).items():
+        print(f"{key}: {value}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,40 @@
-from .data_base import process_workbooks, process_data_base, merge_last_dbs
\ No newline at end of file
+from importlib import import_module
+
+
+_EXPORTS = {
+    "process_workbooks": ".data_base",
+    "process_new_workbooks": ".data_base",
+    "process_data_base": ".data_base",
+    "merge_last_dbs": ".data_base",
+    "export_denormalized": ".data_base",
+    "select_workbook_jobs": ".data_base",
+    "inventory_workbook_jobs": ".data_base",
+    "export_sqlite_db": ".sqlite_data_base",
+    "clear_workbook_cache": ".workbook_cache",
+    "load_tariff_index": ".tariff_index",
+    "serve_data_base": ".server",
+    "write_change_report": ".diff",
+    "refresh_aggregates": ".aggregates",
+    "plan_shards": ".shards",
+    "run_shard_worker": ".shards",
+    "get_pending_shards": ".shards",
+    "finish_shards": ".shards",
+    "run_local_shards": ".shards",
+    "watch_workbooks": ".watcher",
+    "start_daemon": ".daemon",
+    "submit_job": ".daemon",
+    "compare_outputs": ".equivalence",
+    "print_comparison": ".equivalence"
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> any:
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+
+    return value
@@ -0,0 +1,280 @@
+from openpyxl import Workbook
+from datetime import datetime
+from typing import Iterator, Optional
+import math
+import os
+import pickle
+from .db_reader import load_db_workbook, load_processes, get_db_tab_names, get_db_header, iter_db_rows
+from .db_reader import DISTRIBUTOR_HEADER, PROCESS_KEY_COLUMN, AGENT_INDEX, DATE_INDEX
+from .tabs.tusd_or_te_data import UC_COLUMN, resolve_column_names
+
+
+AGGREGATES_VERSION = 2
+
+AGENTS = ["Concessionária", "Permissionária"]
+
+TARIFF_TABS = ["TUSD", "TE"]
+
+MARKET_TABS = {"MERCADO TUSD": "MERCADO DE REFERÊNCIA", "MERCADO TE": "MERCADO DE REFERÊNCIA"}
+
+EFFECT_TAB = "EFEITO"
+
+EFFECT_MEASURES = ["RA0", "RA1"]
+
+TARIFF_GROUP_COLUMNS = ["TIPO DE TARIFA", "SUBGRUPO"]
+
+TARIFF_SKIPPED_COLUMNS = TARIFF_GROUP_COLUMNS + ["MODALIDADE", "CLASSE", "SUBCLASSE", "DETALHE", UC_COLUMN, "POSTO", "UNIDADE"]
+
+
+class Summary:
+    __slots__ = ["count", "total", "squares", "minimum", "maximum"]
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        self.squares += value * value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+
+    def merge(self, other: "Summary"):
+        self.count += other.count
+        self.total += other.total
+        self.squares += other.squares
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count
+
+    @property
+    def deviation(self) -> float:
+        return math.sqrt(max(self.squares / self.count - self.mean ** 2, 0.0))
+
+    def __getstate__(self) -> tuple:
+        return (self.count, self.total, self.squares, self.minimum, self.maximum)
+
+    def __setstate__(self, state: tuple):
+        self.count, self.total, self.squares, self.minimum, self.maximum = state
+
+
+Partials = dict[str, dict[tuple, Summary]]
+
+
+def get_aggregates_cache_path() -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    return os.path.join(base_path, ".cache", "agregados.pkl")
+
+
+def refresh_aggregates(output_path: Optional[str] = None, cache_path: Optional[str] = None) -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    output_path = output_path or os.path.join(base_path, "Relatórios", "AGREGADOS.xlsx")
+    cache_path = cache_path or get_aggregates_cache_path()
+
+    cached_entries = _read_cache(cache_path)
+    entries = {}
+    rescanned = 0
+
+    for db_path in _get_distributor_db_paths(base_path):
+        db_stat = os.stat(db_path)
+        stamp = (db_stat.st_size, db_stat.st_mtime)
+        entry = cached_entries.get(db_path)
+
+        if entry is None or entry["stamp"] != stamp:
+            entry = {"stamp": stamp, "processes": compute_partials(db_path)}
+            rescanned += 1
+
+        entries[db_path] = entry
+
+    if rescanned or entries.keys() != cached_entries.keys():
+        _write_cache(cache_path, entries)
+
+    totals = {}
+
+    for entry in entries.values():
+        for partials in entry["processes"].values():
+            merge_partials(totals, partials)
+
+    write_aggregate_tables(totals, output_path)
+
+    print(f"\nAgregados atualizados ({rescanned} de {len(entries)} banco(s) relidos) em {output_path}")
+
+    return output_path
+
+
+def compute_partials(db_path: str) -> dict[tuple, Partials]:
+    workbook = load_db_workbook(db_path)
+
+    try:
+        processes = load_processes(workbook)
+        partials_by_process = {}
+
+        for tab_name in get_db_tab_names(workbook):
+            if tab_name not in TARIFF_TABS and tab_name not in MARKET_TABS and tab_name != EFFECT_TAB:
+                continue
+
+            header = get_db_header(workbook, tab_name)
+
+            if tab_name in TARIFF_TABS:
+                skipped_columns = set(resolve_column_names(TARIFF_SKIPPED_COLUMNS, header, tab_name))
+
+            for distributor_values, values in _iter_process_rows(workbook, tab_name, header, processes):
+                process = tuple(distributor_values)
+                partials = partials_by_process.setdefault(process, {})
+                agent = distributor_values[AGENT_INDEX]
+                year = distributor_values[DATE_INDEX].year
+
+                if tab_name in TARIFF_TABS:
+                    _add_tariff_values(partials, tab_name, agent, year, values, skipped_columns)
+                elif tab_name in MARKET_TABS:
+                    _add_value(partials, "mercado", (agent, tab_name, year), values.get(MARKET_TABS[tab_name]))
+                else:
+                    for measure in EFFECT_MEASURES:
+                        _add_value(partials, "efeito", (agent, values.get("TIPO TARIFA"), year, measure), values.get(measure))
+    finally:
+        workbook.close()
+
+    return partials_by_process
+
+
+def merge_partials(totals: Partials, partials: Partials):
+    for table_name, summaries in partials.items():
+        table = totals.setdefault(table_name, {})
+
+        for key, summary in summaries.items():
+            if key not in table:
+                table[key] = Summary()
+
+            table[key].merge(summary)
+
+
+def write_aggregate_tables(totals: Partials, output_path: str):
+    workbook = Workbook(write_only=True)
+
+    tariffs_sheet = workbook.create_sheet(title="TARIFAS MÉDIAS")
+    tariffs_sheet.append(["Agente", "Aba", "TIPO DE TARIFA", "SUBGRUPO", "Ano", "Componente", "Média", "Mínimo", "Máximo", "Linhas"])
+
+    for key, summary in _sorted_items(totals.get("tarifas", {})):
+        tariffs_sheet.append(list(key) + [summary.mean, summary.minimum, summary.maximum, summary.count])
+
+    market_sheet = workbook.create_sheet(title="MERCADO")
+    market_sheet.append(["Agente", "Aba", "Ano", "Mercado de referência total", "Linhas"])
+
+    for key, summary in _sorted_items(totals.get("mercado", {})):
+        market_sheet.append(list(key) + [summary.total, summary.count])
+
+    effect_sheet = workbook.create_sheet(title="EFEITO")
+    effect_sheet.append(["Agente", "TIPO TARIFA", "Ano", "Medida", "Média", "Desvio padrão", "Mínimo", "Máximo", "Linhas"])
+
+    for key, summary in _sorted_items(totals.get("efeito", {})):
+        effect_sheet.append(list(key) + [summary.mean, summary.deviation, summary.minimum, summary.maximum, summary.count])
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    workbook.save(output_path)
+
+
+def _add_tariff_values(
+    partials: Partials,
+    tab_name: str,
+    agent: str,
+    year: int,
+    values: dict[any, any],
+    skipped_columns: set[any]
+):
+    group = tuple(values.get(column_name) for column_name in TARIFF_GROUP_COLUMNS)
+
+    for column_name, value in values.items():
+        if column_name in skipped_columns:
+            continue
+
+        _add_value(partials, "tarifas", (agent, tab_name) + group + (year, column_name), value)
+
+
+def _add_value(partials: Partials, table_name: str, key: tuple, value: any):
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return
+
+    table = partials.setdefault(table_name, {})
+
+    if key not in table:
+        table[key] = Summary()
+
+    table[key].add(value)
+
+
+def _iter_process_rows(
+    workbook: Workbook,
+    tab_name: str,
+    header: list[any],
+    processes: Optional[dict[any, tuple]]
+) -> Iterator[tuple[tuple, dict[any, any]]]:
+    is_star = processes is not None and header[:1] == [PROCESS_KEY_COLUMN]
+    values_start = 1 if is_star else len(DISTRIBUTOR_HEADER)
+    value_header = header[values_start:]
+
+    for row in iter_db_rows(workbook, tab_name):
+        distributor_values = processes.get(row[0]) if is_star else row[:values_start]
+
+        if not distributor_values or not isinstance(distributor_values[DATE_INDEX], datetime):
+            continue
+
+        yield distributor_values, dict(zip(value_header, row[values_start:]))
+
+
+def _get_distributor_db_paths(base_path: str) -> list[str]:
+    db_paths = []
+
+    for agent in AGENTS:
+        distributors_path = os.path.join(base_path, f"{agent}s")
+
+        if not os.path.isdir(distributors_path):
+            continue
+
+        for distributor in sorted(os.listdir(distributors_path)):
+            db_path = os.path.join(distributors_path, distributor, "Banco de Dados", f"{distributor}_BANCO.xlsx")
+
+            if os.path.exists(db_path):
+                db_paths.append(db_path)
+
+    return db_paths
+
+
+def _sorted_items(table: dict[tuple, Summary]) -> list[tuple[tuple, Summary]]:
+    return sorted(table.items(), key=lambda item: tuple(str(value) for value in item[0]))
+
+
+def _read_cache(cache_path: str) -> dict[str, dict[str, any]]:
+    if not os.path.exists(cache_path):
+        return {}
+
+    try:
+        with open(cache_path, "rb") as file:
+            cache = pickle.load(file)
+    except Exception:
+        return {}
+
+    if cache.get("version") != AGGREGATES_VERSION:
+        return {}
+
+    return cache["entries"]
+
+
+def _write_cache(cache_path: str, entries: dict[str, dict[str, any]]):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "wb") as file:
+        pickle.dump({"version": AGGREGATES_VERSION, "entries": entries}, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temp_path, cache_path)
@@ -0,0 +1,145 @@
+from typing import Optional
+import json
+import os
+from .utils import get_file_hash
+
+
+def get_journal_path(base_path: str, run_name: str) -> str:
+    return os.path.join(base_path, ".cache", f"execucao_{run_name}.jsonl")
+
+
+class RunJournal:
+    def __init__(self, journal_path: str, run_info: dict[str, any]):
+        self.journal_path = journal_path
+        self.run_info = run_info
+        self.done_files: dict[str, dict[str, any]] = {}
+        self.done_distributors: dict[str, dict[str, any]] = {}
+
+    def start(self, resume: bool):
+        if resume and self._load():
+            return
+
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+
+        with open(self.journal_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"type": "run", **self.run_info}, ensure_ascii=False) + "\n")
+
+        self.done_files = {}
+        self.done_distributors = {}
+
+    def _load(self) -> bool:
+        if not os.path.exists(self.journal_path):
+            return False
+
+        with open(self.journal_path, "r", encoding="utf-8") as file:
+            lines = file.readlines()
+
+        entries = []
+
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+
+        if not entries or entries[0].get("type") != "run":
+            return False
+
+        if entries[-1].get("type") == "done":
+            print("\nExecução anterior foi concluída, recomeçando do início.")
+            return False
+
+        run_info = {key: value for key, value in entries[0].items() if key != "type"}
+
+        if run_info != self.run_info:
+            print("\nExecução anterior usou outros parâmetros, recomeçando do início.")
+            return False
+
+        for entry in entries[1:]:
+            if entry["type"] == "file":
+                self.done_files[entry["file_path"]] = entry
+            elif entry["type"] == "distributor":
+                self.done_distributors[entry["distributor"]] = entry
+
+        return True
+
+    def _append(self, entry: dict[str, any]):
+        with open(self.journal_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def finish(self):
+        self._append({"type": "done"})
+
+    def record_file(self, file_path: str, output_path: Optional[str]):
+        entry = {
+            "type": "file",
+            "file_path": file_path,
+            "output": output_path,
+            "output_hash": get_file_hash(output_path) if output_path else None,
+            "failed": output_path is None
+        }
+
+        self._append(entry)
+        self.done_files[file_path] = entry
+
+    def record_distributor(self, distributor: str, output_path: Optional[str], failed: bool = False):
+        has_output = output_path is not None and os.path.exists(output_path)
+
+        entry = {
+            "type": "distributor",
+            "distributor": distributor,
+            "output": output_path if has_output else None,
+            "output_hash": get_file_hash(output_path) if has_output else None,
+            "failed": failed
+        }
+
+        self._append(entry)
+        self.done_distributors[distributor] = entry
+
+    def is_distributor_done(self, distributor: str) -> bool:
+        entry = self.done_distributors.get(distributor)
+
+        if entry is None:
+            return False
+
+        return _is_output_intact(entry)
+
+    def get_failed_files(self) -> set[str]:
+        return {file_path for file_path, entry in self.done_files.items() if entry.get("failed")}
+
+    def get_done_files(self) -> dict[str, Optional[str]]:
+        return {
+            file_path: entry["output"]
+            for file_path, entry in self.done_files.items()
+            if _is_output_intact(entry)
+        }
+
+
+def _is_output_intact(entry: dict[str, any]) -> bool:
+    output_path = entry["output"]
+
+    if entry.get("failed"):
+        return False
+
+    if output_path is None:
+        return True
+
+    if not os.path.exists(output_path):
+        return False
+
+    return get_file_hash(output_path) == entry["output_hash"]
+
+
+def remove_partial_files(file_paths: list[str], keep_paths: set[str]) -> list[str]:
+    removed = []
+
+    for file_path in file_paths:
+        if file_path in keep_paths or not os.path.exists(file_path):
+            continue
+
+        os.remove(file_path)
+        removed.append(file_path)
+
+    return removed
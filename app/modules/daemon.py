@@ -0,0 +1,336 @@
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Callable, Literal, Optional
+import hashlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+from .aggregates import refresh_aggregates
+from .data_base import process_workbooks, process_new_workbooks, process_data_base, merge_last_dbs
+from .distributor_info import load_distributor_registry
+from .watcher import WorkbookWatcher
+from .workbook_cache import get_memory_cache_info, set_memory_cache_size
+
+
+DEFAULT_CACHE_ENTRIES = 32
+
+MAX_SOCKET_PATH_BYTES = 100
+
+AGENTS = ["Concessionária", "Permissionária"]
+
+
+class ClientStream(io.TextIOBase):
+    def __init__(self, wfile: io.BufferedIOBase):
+        self.wfile = wfile
+        self.connected = True
+        self._lock = threading.Lock()
+
+    def write(self, text: str) -> int:
+        if text:
+            self.send({"type": "output", "text": text})
+
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def send(self, message: dict[str, any]):
+        if not self.connected:
+            return
+
+        line = json.dumps(message, ensure_ascii=False, default=str) + "\n"
+
+        with self._lock:
+            try:
+                self.wfile.write(line.encode("utf-8"))
+            except OSError:
+                self.connected = False
+
+
+class WarmDaemon:
+    def __init__(self, socket_path: str):
+        self.socket_path = socket_path
+        self.started = time.time()
+        self.jobs_done = 0
+        self.current_job: Optional[str] = None
+        self.server: Optional[socketserver.BaseServer] = None
+        self.watchers: dict[str, WorkbookWatcher] = {}
+        self.scanned_agents: set[str] = set()
+        self._job_lock = threading.Lock()
+
+    def warm_up(self):
+        load_distributor_registry()
+
+        for agent in AGENTS:
+            if os.path.isdir(_get_distributors_path(agent)):
+                self.get_watcher(agent)
+
+    def get_watcher(self, agent: Literal["Concessionária", "Permissionária"]) -> WorkbookWatcher:
+        if agent not in self.watchers:
+            base_path = os.path.join(os.path.dirname(__file__), "../../")
+            base_path = os.path.abspath(base_path)
+
+            watcher = WorkbookWatcher(
+                distributors_path=_get_distributors_path(agent),
+                catalog_path=os.path.join(base_path, ".cache", f"catalogo_{agent}.json"),
+                settle_seconds=0
+            )
+
+            if not watcher.load_catalog():
+                watcher.seed_catalog()
+
+            self.watchers[agent] = watcher
+
+        return self.watchers[agent]
+
+    def handle(self, request: dict[str, any], stream: ClientStream) -> any:
+        job = request.get("job")
+
+        if job == "status":
+            return self.get_status()
+
+        if job == "stop":
+            return {"stopping": True}
+
+        if job not in JOBS:
+            raise ValueError(f"Tarefa desconhecida: {job}. Use uma de {['status', 'stop'] + list(JOBS)}")
+
+        if not self._job_lock.acquire(blocking=False):
+            stream.write(f"Aguardando a tarefa em andamento ({self.current_job})...\n")
+            self._job_lock.acquire()
+
+        try:
+            self.current_job = job
+
+            with redirect_stdout(stream), redirect_stderr(stream):
+                result = JOBS[job](self, request)
+
+            self.jobs_done += 1
+            return result
+        finally:
+            self.current_job = None
+            self._job_lock.release()
+
+    def get_status(self) -> dict[str, any]:
+        return {
+            "pid": os.getpid(),
+            "uptime_seconds": round(time.time() - self.started),
+            "jobs_done": self.jobs_done,
+            "current_job": self.current_job,
+            "workbook_cache": get_memory_cache_info(),
+            "catalogs": {agent: len(watcher.files) for agent, watcher in self.watchers.items()}
+        }
+
+
+class DaemonRequestHandler(socketserver.StreamRequestHandler):
+    warm_daemon: WarmDaemon = None
+
+    def handle(self):
+        stream = ClientStream(self.wfile)
+
+        try:
+            request = json.loads(self.rfile.readline().decode("utf-8"))
+            result = self.warm_daemon.handle(request, stream)
+        except Exception as error:
+            stream.send({"type": "done", "ok": False, "error": f"{type(error).__name__}: {error}"})
+            return
+
+        stream.send({"type": "done", "ok": True, "result": result})
+
+        if request.get("job") == "stop":
+            self.server.shutdown()
+
+
+def get_socket_path() -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    socket_path = os.path.join(base_path, ".cache", "servico.sock")
+
+    if len(socket_path.encode("utf-8")) > MAX_SOCKET_PATH_BYTES:
+        digest = hashlib.sha1(base_path.encode("utf-8")).hexdigest()[:12]
+        socket_path = os.path.join(tempfile.gettempdir(), f"tarifas-{digest}.sock")
+
+    return socket_path
+
+
+def start_daemon(socket_path: Optional[str] = None, cache_entries: int = DEFAULT_CACHE_ENTRIES):
+    if not hasattr(socket, "AF_UNIX"):
+        raise ValueError("Sockets Unix não são suportados neste sistema")
+
+    socket_path = socket_path or get_socket_path()
+
+    if os.path.exists(socket_path):
+        if _is_listening(socket_path):
+            raise ValueError(f"Serviço já em execução em {socket_path}")
+
+        os.remove(socket_path)
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    set_memory_cache_size(cache_entries)
+
+    warm_daemon = WarmDaemon(socket_path=socket_path)
+    warm_daemon.warm_up()
+
+    handler = type("Handler", (DaemonRequestHandler,), {"warm_daemon": warm_daemon})
+    server = socketserver.ThreadingUnixStreamServer(socket_path, handler)
+    server.daemon_threads = True
+    warm_daemon.server = server
+    os.chmod(socket_path, 0o600)
+
+    print(f"Serviço ouvindo em {socket_path} (Ctrl+C para encerrar)...")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+        print("\nServiço encerrado.")
+
+
+def submit_job(request: dict[str, any], socket_path: Optional[str] = None) -> tuple[bool, any]:
+    socket_path = socket_path or get_socket_path()
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        client.connect(socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        client.close()
+        raise ValueError(f"Serviço não está em execução em {socket_path}. Rode 'daemon start' primeiro")
+
+    with client, client.makefile("r", encoding="utf-8") as responses:
+        client.sendall((json.dumps(request, ensure_ascii=False) + "\n").encode("utf-8"))
+
+        for line in responses:
+            message = json.loads(line)
+
+            if message["type"] == "output":
+                sys.stdout.write(message["text"])
+                sys.stdout.flush()
+                continue
+
+            if not message["ok"]:
+                print(f"\nErro no serviço: {message['error']}", file=sys.stderr)
+
+            return message["ok"], message.get("result")
+
+    print("\nConexão com o serviço encerrada antes do fim da tarefa.", file=sys.stderr)
+    return False, None
+
+
+def _run_process_job(warm_daemon: WarmDaemon, request: dict[str, any]) -> dict[str, any]:
+    agent = request["agent"]
+    watcher = warm_daemon.get_watcher(agent)
+
+    if request.get("files"):
+        file_paths = [os.path.abspath(file_path) for file_path in request["files"]]
+    else:
+        file_paths = watcher.poll(full=agent not in warm_daemon.scanned_agents)
+        warm_daemon.scanned_agents.add(agent)
+
+    if not file_paths:
+        print("Nenhuma planilha nova ou alterada.")
+        return {"files": 0, "distributors": []}
+
+    print(f"{len(file_paths)} planilha(s) para processar.")
+
+    failed_paths = []
+
+    updated_distributors = process_new_workbooks(
+        agent=agent,
+        file_paths=file_paths,
+        tabs=request.get("tabs"),
+        workers=request.get("workers", 1),
+        output_mode=request.get("output_mode", "denormalized"),
+        use_cache=request.get("use_cache", True),
+        consolidate=request.get("consolidate", True),
+        sorted_output=request.get("sorted_output", False),
+        update_aggregates=request.get("update_aggregates", False),
+        on_file_failed=failed_paths.append
+    )
+
+    watcher.record_files([file_path for file_path in file_paths if file_path not in failed_paths])
+
+    if failed_paths:
+        print(f"{len(failed_paths)} planilha(s) falharam e serão processadas de novo na próxima tarefa.")
+
+    return {"files": len(file_paths), "failed": len(failed_paths), "distributors": updated_distributors}
+
+
+def _run_rebuild_job(warm_daemon: WarmDaemon, request: dict[str, any]) -> dict[str, any]:
+    agent = request["agent"]
+    output_mode = request.get("output_mode", "denormalized")
+    sorted_output = request.get("sorted_output", False)
+
+    process_workbooks(
+        agent=agent,
+        tabs=request.get("tabs"),
+        workers=request.get("workers", 1),
+        output_mode=output_mode,
+        use_cache=request.get("use_cache", True),
+        distributors=request.get("distributors"),
+        sorted_output=sorted_output,
+        run_name=f"{agent}_servico",
+        update_aggregates=request.get("update_aggregates", False)
+    )
+
+    if request.get("consolidate"):
+        process_data_base(agent, output_mode=output_mode, sorted_output=sorted_output)
+        merge_last_dbs(output_mode=output_mode, sorted_output=sorted_output)
+
+    return {"distributors": request.get("distributors")}
+
+
+def _run_merge_job(warm_daemon: WarmDaemon, request: dict[str, any]) -> dict[str, any]:
+    options = {
+        "output_mode": request.get("output_mode", "denormalized"),
+        "sorted_output": request.get("sorted_output", False)
+    }
+
+    if request.get("compression_level") is not None:
+        options["compression_level"] = request["compression_level"]
+
+    process_data_base(request["agent"], **options)
+    merge_last_dbs(**options)
+
+    if request.get("update_aggregates"):
+        refresh_aggregates()
+
+    return {"agent": request["agent"]}
+
+
+JOBS: dict[str, Callable[[WarmDaemon, dict[str, any]], any]] = {
+    "process": _run_process_job,
+    "rebuild": _run_rebuild_job,
+    "merge": _run_merge_job
+}
+
+
+def _get_distributors_path(agent: str) -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    return os.path.join(base_path, f"{agent}s")
+
+
+def _is_listening(socket_path: str) -> bool:
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        client.connect(socket_path)
+    except OSError:
+        return False
+    finally:
+        client.close()
+
+    return True
@@ -1,28 +1,53 @@
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl import load_workbook, Workbook
-from typing import Literal, Optional
+from typing import Callable, Iterator, Literal, Optional
 from datetime import datetime
+from functools import partial
+from itertools import chain
+from operator import itemgetter
+import heapq
 import os
 from tqdm import tqdm
 from .distributor_info import get_distributor_info
-from .tabs.costs_data import load_costs_sheet
-from .tabs.tusd_or_te_market_data import load_tusd_or_te_market_sheet
-from .tabs.tusd_or_te_data import load_tusd_or_te_sheet, TusdOrTe, create_mixed_tusd_or_te_worksheet
-from .tabs.effect_data import load_effect_sheet
-from .tabs.reh_tables_data import load_reh_tables_sheet
-from .utils import get_date_from, get_suffix
+from .stages import load_tab_rows, validate_tabs, HIDE_FIRST_LINE_TABS
+from .scheduler import run_grouped_jobs
+from .workbook_cache import load_cached_workbook
+from .db_reader import load_processes, DISTRIBUTOR_HEADER, PROCESS_KEY_COLUMN, PROCESSES_TAB
+from .checkpoint import RunJournal, get_journal_path, remove_partial_files
+from .inventory import inventory_jobs
+from .external_sort import ExternalSorter
+from .xlsx_writer import XlsxWriter, SheetWriter, DEFAULT_COMPRESSION_LEVEL, MAX_ROWS_PER_SHEET
+from .encoding import get_categorical_indexes
+from .metrics import get_metrics, run_metrics, timed_stage
+from .utils import get_date_from, get_suffix, get_base_tab_name
 
 
-def merge_last_dbs():
+OutputMode = Literal["denormalized", "star"]
+
+SORTED_KEYWORD = "ordenado: Sigla, data do processo, chaves da aba"
+
+TRAILING_ROW_KEY = (2, "")
+
+TARIFF_PROCESSES = ["Ajuste EER ANGRA III", "Liminar abrace", "Reajuste", "Revisão", "Revisão Extraordinária", "Tarifas Iniciais"]
+
+
+def merge_last_dbs(
+    output_mode: OutputMode = "denormalized", 
+    sorted_output: bool = False,
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL
+):
     base_path = os.path.join(os.path.dirname(__file__), "../../")
     base_path = os.path.abspath(base_path)
 
     data_base_path = os.path.join(base_path, "Banco de Dados")
 
+    output_name = os.path.join(data_base_path, "BANCO_Geral.xlsx")
+
     file_names = [
         name for name in os.listdir(data_base_path)
         if (name.endswith(".xlsx") or name.endswith(".xlsm")) 
         and not name.startswith("~$")
+        and name != os.path.basename(output_name)
     ]
 
     file_paths = []
@@ -31,15 +56,22 @@ def merge_last_dbs():
         file_path = os.path.join(data_base_path, file_name)
         file_paths.append(file_path)
 
-    output_name = os.path.join(data_base_path, "BANCO_Geral.xlsx")
-
-    _mix_db_files(
-        file_paths=file_paths,
-        output_name=output_name
-    )
+    with run_metrics(base_path, "banco_geral"), timed_stage("banco_geral"):
+        _mix_db_files(
+            file_paths=file_paths,
+            output_name=output_name,
+            output_mode=output_mode,
+            sorted_output=sorted_output,
+            compression_level=compression_level
+        )
 
 
-def process_data_base(agent: Literal["Concessionária", "Permissionária"]):
+def process_data_base(
+    agent: Literal["Concessionária", "Permissionária"],
+    output_mode: OutputMode = "denormalized",
+    sorted_output: bool = False,
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL
+):
     base_path = os.path.join(os.path.dirname(__file__), "../../")
     base_path = os.path.abspath(base_path)
 
@@ -80,18 +112,262 @@ def process_data_base(agent: Literal["Concessionária", "Permissionária"]):
 
         output_path = os.path.join(output_folder_path, f"BANCO_{agent}s.xlsx")
 
-        _mix_db_files(
-            file_paths=all_file_paths,
-            output_name=output_path
+        with run_metrics(base_path, f"banco_{agent}", agent=agent), timed_stage("banco_agente"):
+            _mix_db_files(
+                file_paths=all_file_paths,
+                output_name=output_path,
+                output_mode=output_mode,
+                sorted_output=sorted_output,
+                compression_level=compression_level
+            )
+
+
+def process_workbooks(
+    agent: Literal["Concessionária", "Permissionária"],
+    tabs: Optional[list[str]] = None,
+    workers: int = 1,
+    output_mode: OutputMode = "denormalized",
+    use_cache: bool = True,
+    resume: bool = False,
+    distributors: Optional[list[str]] = None,
+    sorted_output: bool = False,
+    run_name: Optional[str] = None,
+    update_aggregates: bool = False,
+    base_path: Optional[str] = None
+):
+    tabs = validate_tabs(tabs)
+    run_name = run_name or agent
+
+    if base_path is None:
+        base_path = os.path.join(os.path.dirname(__file__), "../../")
+        base_path = os.path.abspath(base_path)
+
+    distributors_path = os.path.join(base_path, f"{agent}s")
+
+    journal = RunJournal(
+        journal_path=get_journal_path(base_path, run_name),
+        run_info={"agent": agent, "tabs": tabs, "output_mode": output_mode, "distributors": distributors, "sorted_output": sorted_output}
+    )
+
+    journal.start(resume=resume)
+
+    jobs = [
+        job for job in select_workbook_jobs(agent, distributors=distributors)
+        if not journal.is_distributor_done(job["distributor"])
+    ]
+
+    done_files = journal.get_done_files()
+
+    remove_partial_files(
+        file_paths=_get_temp_files(distributors_path, distributors=distributors),
+        keep_paths={temp_path for temp_path in done_files.values() if temp_path}
+    )
+
+    file_paths_by_distributor = {}
+
+    for job in jobs:
+        file_paths_by_distributor.setdefault(job["distributor"], []).append(job["file_path"])
+
+    def distributor_done(distributor: str, temp_file_paths: list[Optional[str]]):
+        with timed_stage("banco_distribuidora"):
+            output_path = _create_distributor_db(
+                distributor=distributor,
+                temp_file_paths=temp_file_paths,
+                distributors_path=distributors_path,
+                output_mode=output_mode,
+                sorted_output=sorted_output
+            )
+
+        failed_files = journal.get_failed_files()
+        failed = any(file_path in failed_files for file_path in file_paths_by_distributor[distributor])
+        journal.record_distributor(distributor, output_path, failed=failed)
+
+    with run_metrics(base_path, f"processamento_{run_name}", agent=agent):
+        _, skipped_jobs = inventory_workbook_jobs(agent, jobs, tabs=tabs)
+
+        run_grouped_jobs(
+            jobs=jobs,
+            run_job=partial(_process_workbook_file, tabs=tabs, output_mode=output_mode, use_cache=use_cache),
+            on_group_done=distributor_done,
+            workers=workers,
+            history_path=os.path.join(base_path, ".cache", "tempos_de_execucao.json"),
+            desc="Processando planilhas...",
+            done_results={**_skip_jobs(skipped_jobs), **done_files},
+            on_job_done=lambda job, temp_path: journal.record_file(job["file_path"], temp_path)
         )
 
+        failed_files = journal.get_failed_files()
+
+        if failed_files:
+            print(f"\n{len(failed_files)} planilha(s) falharam e serão processadas de novo com --resume.")
+        else:
+            journal.finish()
+
+        if update_aggregates:
+            _refresh_aggregates()
+
+
+def process_new_workbooks(
+    agent: Literal["Concessionária", "Permissionária"],
+    file_paths: list[str],
+    tabs: Optional[list[str]] = None,
+    workers: int = 1,
+    output_mode: OutputMode = "denormalized",
+    use_cache: bool = True,
+    consolidate: bool = True,
+    sorted_output: bool = False,
+    update_aggregates: bool = False,
+    on_file_failed: Optional[Callable[[str], None]] = None
+) -> list[str]:
+    tabs = validate_tabs(tabs)
 
-def process_workbooks(agent: Literal["Concessionária", "Permissionária"]):
     base_path = os.path.join(os.path.dirname(__file__), "../../")
     base_path = os.path.abspath(base_path)
 
     distributors_path = os.path.join(base_path, f"{agent}s")
+    file_paths = {os.path.abspath(file_path) for file_path in file_paths}
+
+    jobs = [
+        job for job in _get_workbook_jobs(distributors_path)
+        if os.path.abspath(job["file_path"]) in file_paths
+    ]
+
+    if not jobs:
+        return []
+
+    def file_done(job: dict[str, any], temp_path: Optional[str]):
+        if temp_path is None and on_file_failed:
+            on_file_failed(job["file_path"])
+
+    replaced_processes = {}
+
+    for job in jobs:
+        replaced_processes.setdefault(job["distributor"], set()).add(
+            (job["distributor"], job["tariff_process"], _get_process_date(job["file_path"]))
+        )
+
+    updated_distributors = []
+
+    def distributor_done(distributor: str, temp_file_paths: list[Optional[str]]):
+        with timed_stage("banco_distribuidora"):
+            output_path = _update_distributor_db(
+                distributor=distributor,
+                temp_file_paths=temp_file_paths,
+                distributors_path=distributors_path,
+                replaced_processes=replaced_processes[distributor],
+                output_mode=output_mode,
+                sorted_output=sorted_output
+            )
+
+        if output_path:
+            updated_distributors.append(distributor)
+
+    with run_metrics(base_path, f"novas_planilhas_{agent}", agent=agent):
+        _, skipped_jobs = inventory_workbook_jobs(agent, jobs, tabs=tabs)
+
+        run_grouped_jobs(
+            jobs=jobs,
+            run_job=partial(_process_workbook_file, tabs=tabs, output_mode=output_mode, use_cache=use_cache),
+            on_group_done=distributor_done,
+            workers=workers,
+            history_path=os.path.join(base_path, ".cache", "tempos_de_execucao.json"),
+            desc="Processando planilhas novas...",
+            done_results=_skip_jobs(skipped_jobs),
+            on_job_done=file_done
+        )
+
+        if updated_distributors and update_aggregates:
+            _refresh_aggregates()
+
+    if updated_distributors and consolidate:
+        process_data_base(agent, output_mode=output_mode, sorted_output=sorted_output)
+        merge_last_dbs(output_mode=output_mode, sorted_output=sorted_output)
+
+    return updated_distributors
+
+
+def _refresh_aggregates():
+    from .aggregates import refresh_aggregates
 
+    with timed_stage("agregados"):
+        refresh_aggregates()
+
+
+def select_workbook_jobs(
+    agent: Literal["Concessionária", "Permissionária"],
+    distributors: Optional[list[str]] = None,
+    tariff_processes: Optional[list[str]] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None
+) -> list[dict[str, any]]:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    distributors_path = os.path.join(base_path, f"{agent}s")
+
+    unknown_processes = [process for process in tariff_processes or [] if process not in TARIFF_PROCESSES]
+
+    if unknown_processes:
+        raise ValueError(f"Processos tarifários desconhecidos: {', '.join(unknown_processes)}")
+
+    jobs = _get_workbook_jobs(distributors_path)
+
+    if distributors is not None:
+        unknown_distributors = set(distributors) - {job["distributor"] for job in jobs}
+
+        if unknown_distributors:
+            raise ValueError(f"Distribuidoras sem planilhas em {distributors_path}: {', '.join(sorted(unknown_distributors))}")
+
+        jobs = [job for job in jobs if job["distributor"] in distributors]
+
+    if tariff_processes is not None:
+        jobs = [job for job in jobs if job["tariff_process"] in tariff_processes]
+
+    if start_date is not None or end_date is not None:
+        jobs = [job for job in jobs if _is_within_dates(job["file_path"], start_date, end_date)]
+
+    return jobs
+
+
+def inventory_workbook_jobs(
+    agent: Literal["Concessionária", "Permissionária"],
+    jobs: list[dict[str, any]],
+    tabs: Optional[list[str]] = None
+) -> tuple[list[dict[str, any]], list[dict[str, any]]]:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    with timed_stage("inventario"):
+        return inventory_jobs(
+            jobs=jobs,
+            tabs=validate_tabs(tabs),
+            inventory_path=os.path.join(base_path, ".cache", f"inventario_{agent}.json")
+        )
+
+
+def _skip_jobs(skipped_jobs: list[dict[str, any]]) -> dict[str, None]:
+    metrics = get_metrics()
+
+    for job in skipped_jobs:
+        print(f"\nIgnorando planilha {job['file_path']}: {job['skip_reason']}")
+        metrics.inc("files_skipped_total", tariff_process=job["tariff_process"])
+
+    return {job["file_path"]: None for job in skipped_jobs}
+
+
+def _is_within_dates(file_path: str, start_date: Optional[datetime], end_date: Optional[datetime]) -> bool:
+    process_date = _get_process_date(file_path)
+
+    if process_date is None:
+        return False
+
+    if start_date is not None and process_date < start_date:
+        return False
+
+    return end_date is None or process_date <= end_date
+
+
+def _get_workbook_jobs(distributors_path: str) -> list[dict[str, any]]:
     distributors = [
         name for name in os.listdir(distributors_path)
         if os.path.isdir(os.path.join(distributors_path, name))
@@ -99,163 +375,260 @@ def process_workbooks(agent: Literal["Concessionária", "Permissionária"]):
 
     distributors.sort()
 
-    for distributor in tqdm(distributors, desc="Processando distribuidoras..."):
-        distributor_path = os.path.join(distributors_path, distributor)
+    jobs = []
 
-        temp_file_paths = []
+    for distributor in distributors:
+        distributor_path = os.path.join(distributors_path, distributor)
 
-        for type in ["Ajuste EER ANGRA III", "Liminar abrace", "Reajuste", "Revisão", "Revisão Extraordinária", "Tarifas Iniciais"]:
+        for type in TARIFF_PROCESSES:
             type_path = os.path.join(distributor_path, type)
 
             file_names = [
                 name for name in os.listdir(type_path)
                 if (name.endswith(".xlsx") or name.endswith(".xlsm")) 
                 and not name.startswith("~$")
+                and not _is_temp_file(name)
             ]
 
-            for file_name in tqdm(file_names, desc=f"{distributor} - {type}", leave=False):
-                file_path = os.path.join(type_path, file_name)
-                file_workbook = load_workbook(file_path, data_only=True)
-
-                suffix = get_suffix(file_name)
-                file_name_without_suffix = file_name.replace(suffix, "")
-                parts = file_name_without_suffix.split("_")
-                process_date_str = parts[len(parts) - 1]
-                process_date = get_date_from(process_date_str)
-
-                try:
-                    new_workbook = _filtered_workbook(
-                        workbook=file_workbook,
-                        acronym=distributor,
-                        tariff_process=type,
-                        process_date=process_date
-                    )
+            for file_name in file_names:
+                jobs.append({
+                    "group": distributor,
+                    "distributor": distributor,
+                    "tariff_process": type,
+                    "file_path": os.path.join(type_path, file_name)
+                })
+
+    return jobs
+
+
+def _process_workbook_file(
+    job: dict[str, any], 
+    tabs: list[str], 
+    output_mode: OutputMode, 
+    use_cache: bool
+) -> Optional[str]:
+    file_path = job["file_path"]
+    metrics = get_metrics()
+    metrics.inc("bytes_read_total", os.path.getsize(file_path))
+
+    with timed_stage("carregar"):
+        if use_cache:
+            file_workbook = load_cached_workbook(file_path)
+        else:
+            file_workbook = load_workbook(file_path, data_only=True)
+
+    process_date = _get_process_date(file_path)
+
+    try:
+        new_workbook = _filtered_workbook(
+            workbook=file_workbook,
+            acronym=job["distributor"],
+            tariff_process=job["tariff_process"],
+            process_date=process_date,
+            tabs=tabs,
+            output_mode=output_mode
+        )
 
-                    temp_path = file_path.replace(suffix, f"_temp{suffix}")
-                    new_workbook.save(temp_path)
-                    temp_file_paths.append(temp_path)
-                except Exception as error:
-                    print(f"\nFalha ao filtrar planilha em {file_path}: {str(error)}") 
+        temp_path = _get_temp_path(file_path)
 
-        if temp_file_paths:
-            output_folder_path = os.path.join(distributor_path, "Banco de Dados")
-            os.makedirs(output_folder_path, exist_ok=True)
+        with timed_stage("salvar"):
+            new_workbook.save(temp_path)
 
-            output_path = os.path.join(output_folder_path, f"{distributor}_BANCO.xlsx")
+        metrics.inc("files_processed_total", tariff_process=job["tariff_process"])
 
-            _mix_db_files(
-                file_paths=temp_file_paths,
-                output_name=output_path
-            )
+        return temp_path
+    except Exception as error:
+        print(f"\nFalha ao filtrar planilha em {file_path}: {str(error)}") 
 
-            for temp_file in temp_file_paths:
-                os.remove(temp_file)
+    metrics.inc("files_failed_total", tariff_process=job["tariff_process"])
 
+    return None
 
-def _filtered_workbook(
-    workbook: Workbook,
-    acronym: str, 
-    tariff_process: Literal["Ajuste EER ANGRA III", "Liminar abrace", "Reajuste", "Revisão", "Revisão Extraordinária", "Tarifas Iniciais"],
-    process_date: any
-) -> Workbook:
-    distributor_info = get_distributor_info(acronym=acronym)
-    distributor_info = {
-        'Nome': distributor_info['name'],
-        'Sigla': acronym,
-        'Concessionária/Permissionária': distributor_info['agent'],
-        'Código da Empresa': distributor_info['company_code'],
-        'ID Agente': distributor_info['agent_id'],
-        'ID Concessão': distributor_info['concession_id'],
-        'Processo Tarifário': tariff_process,
-        'Data do processo tarifário em processamento': process_date
-    }
 
-    distributor_header = list(distributor_info.keys())
+def _get_process_date(file_path: str) -> Optional[datetime]:
+    suffix = get_suffix(file_path)
+    file_name_without_suffix = os.path.basename(file_path).replace(suffix, "")
+    parts = file_name_without_suffix.split("_")
+    process_date_str = parts[len(parts) - 1]
 
-    new_workbook = Workbook()
-    default_sheet = new_workbook.active
-    new_workbook.remove(default_sheet)
+    return get_date_from(process_date_str)
 
-    _create_db_tab(
-        distributor_info=distributor_info,
-        distributor_header=distributor_header,
-        workbook=new_workbook,
-        worksheet=load_costs_sheet(workbook=workbook),
-        tab_name='CUSTOS'
-    )
 
-    _create_db_tab(
-        distributor_info=distributor_info,
-        distributor_header=distributor_header,
-        workbook=new_workbook,
-        worksheet=load_tusd_or_te_market_sheet(workbook=workbook, tusd_or_te="TUSD"),
-        tab_name='MERCADO TUSD'
-    )
+def _get_temp_path(file_path: str) -> str:
+    suffix = get_suffix(file_path)
+    return file_path.replace(suffix, f"_temp{suffix}")
 
-    _create_db_tab(
-        distributor_info=distributor_info,
-        distributor_header=distributor_header,
-        workbook=new_workbook,
-        worksheet=load_tusd_or_te_sheet(workbook=workbook, tusd_or_te=TusdOrTe.TUSD),
-        tab_name='TUSD',
-        hide_first_line=True
-    )
 
-    _create_db_tab(
-        distributor_info=distributor_info,
-        distributor_header=distributor_header,
-        workbook=new_workbook,
-        worksheet=load_tusd_or_te_market_sheet(workbook=workbook, tusd_or_te="TE"),
-        tab_name='MERCADO TE'
-    )
+def _is_temp_file(file_name: str) -> bool:
+    suffix = get_suffix(file_name)
+    return file_name.replace(suffix, "").endswith("_temp")
+
+
+def _get_temp_files(distributors_path: str, distributors: Optional[list[str]] = None) -> list[str]:
+    if distributors is None:
+        search_paths = [distributors_path]
+    else:
+        search_paths = [os.path.join(distributors_path, distributor) for distributor in distributors]
+
+    temp_files = []
+
+    for search_path in search_paths:
+        for directory_path, _, file_names in os.walk(search_path):
+            for file_name in file_names:
+                if (file_name.endswith(".xlsx") or file_name.endswith(".xlsm")) and _is_temp_file(file_name):
+                    temp_files.append(os.path.join(directory_path, file_name))
+
+    return temp_files
+
 
-    _create_db_tab(
-        distributor_info=distributor_info,
-        distributor_header=distributor_header,
-        workbook=new_workbook,
-        worksheet=load_tusd_or_te_sheet(workbook=workbook, tusd_or_te=TusdOrTe.TE),
-        tab_name='TE',
-        hide_first_line=True
+def _create_distributor_db(
+    distributor: str, 
+    temp_file_paths: list[Optional[str]], 
+    distributors_path: str, 
+    output_mode: OutputMode,
+    sorted_output: bool = False
+) -> Optional[str]:
+    temp_file_paths = [temp_path for temp_path in temp_file_paths if temp_path]
+
+    if not temp_file_paths:
+        return None
+
+    output_path = _get_distributor_db_path(distributors_path, distributor)
+
+    _mix_db_files(
+        file_paths=temp_file_paths,
+        output_name=output_path,
+        output_mode=output_mode,
+        sorted_output=sorted_output
     )
 
-    _create_db_tab(
-        distributor_info=distributor_info,
-        distributor_header=distributor_header,
-        workbook=new_workbook,
-        worksheet=load_effect_sheet(workbook=workbook),
-        tab_name='EFEITO'
+    for temp_file in temp_file_paths:
+        os.remove(temp_file)
+
+    return output_path
+
+
+def _update_distributor_db(
+    distributor: str, 
+    temp_file_paths: list[Optional[str]], 
+    distributors_path: str, 
+    replaced_processes: set[tuple],
+    output_mode: OutputMode,
+    sorted_output: bool = False
+) -> Optional[str]:
+    temp_file_paths = [temp_path for temp_path in temp_file_paths if temp_path]
+    output_path = _get_distributor_db_path(distributors_path, distributor)
+
+    if not temp_file_paths:
+        return None
+
+    if not os.path.exists(output_path):
+        return _create_distributor_db(
+            distributor=distributor,
+            temp_file_paths=temp_file_paths,
+            distributors_path=distributors_path,
+            output_mode=output_mode,
+            sorted_output=sorted_output
+        )
+
+    updated_path = f"{output_path}.tmp"
+
+    _mix_db_files(
+        file_paths=[output_path] + temp_file_paths,
+        output_name=updated_path,
+        output_mode=output_mode,
+        excluded_processes={output_path: replaced_processes},
+        sorted_output=sorted_output
     )
 
-    _create_db_tab(
-        distributor_info=distributor_info,
-        distributor_header=distributor_header,
-        workbook=new_workbook,
-        worksheet=load_reh_tables_sheet(workbook=workbook),
-        tab_name="TABELAS REH"
+    os.replace(updated_path, output_path)
+
+    for temp_file in temp_file_paths:
+        os.remove(temp_file)
+
+    return output_path
+
+
+def _get_distributor_db_path(distributors_path: str, distributor: str) -> str:
+    distributor_path = os.path.join(distributors_path, distributor)
+    output_folder_path = os.path.join(distributor_path, "Banco de Dados")
+    os.makedirs(output_folder_path, exist_ok=True)
+
+    return os.path.join(output_folder_path, f"{distributor}_BANCO.xlsx")
+
+
+def export_denormalized(input_path: str, output_path: str):
+    _mix_db_files(
+        file_paths=[input_path],
+        output_name=output_path,
+        output_mode="denormalized"
     )
 
+
+def _filtered_workbook(
+    workbook: Workbook,
+    acronym: str, 
+    tariff_process: Literal["Ajuste EER ANGRA III", "Liminar abrace", "Reajuste", "Revisão", "Revisão Extraordinária", "Tarifas Iniciais"],
+    process_date: any,
+    tabs: Optional[list[str]] = None,
+    output_mode: OutputMode = "denormalized"
+) -> Workbook:
+    distributor_info = get_distributor_info(acronym=acronym)
+    distributor_values = [
+        distributor_info['name'],
+        acronym,
+        distributor_info['agent'],
+        distributor_info['company_code'],
+        distributor_info['agent_id'],
+        distributor_info['concession_id'],
+        tariff_process,
+        process_date
+    ]
+
+    if output_mode == "star":
+        distributor_info = {PROCESS_KEY_COLUMN: 1}
+    else:
+        distributor_info = dict(zip(DISTRIBUTOR_HEADER, distributor_values))
+
+    distributor_header = list(distributor_info.keys())
+
+    new_workbook = Workbook(write_only=True)
+
+    for tab_name in validate_tabs(tabs):
+        with timed_stage("aba", tab=tab_name):
+            _create_db_tab(
+                distributor_info=distributor_info,
+                distributor_header=distributor_header,
+                workbook=new_workbook,
+                rows=load_tab_rows(workbook, tab_name),
+                tab_name=tab_name,
+                hide_first_line=tab_name in HIDE_FIRST_LINE_TABS
+            )
+
+    if output_mode == "star":
+        processes_sheet = new_workbook.create_sheet(title=PROCESSES_TAB)
+        processes_sheet.append([PROCESS_KEY_COLUMN] + DISTRIBUTOR_HEADER)
+        processes_sheet.append([1] + distributor_values)
+
     if len(new_workbook.sheetnames) == 0:
         new_workbook.create_sheet(title="Sheet")
 
     return new_workbook
 
 
-def _add_header_rows(header_rows: list[any], to_sheet: Worksheet):
-    worksheet = to_sheet
-
-    for row_offset, row in enumerate(header_rows, start=1):
-        for column_offset, cell in enumerate(row, start=1):
-            target_row = row_offset
-            target_column = column_offset
-
-            value = getattr(cell, "value", None)
-            worksheet.cell(row=target_row, column=target_column).value = value
+def _add_header_rows(header_rows: list[list[any]], to_sheet: SheetWriter):
+    for row in header_rows:
+        to_sheet.append(row)
 
 
 def _mix_db_files(
     file_paths: list[str], 
     output_name: str,
-    header_max_row: int = 1
+    header_max_row: int = 1,
+    output_mode: OutputMode = "denormalized",
+    excluded_processes: Optional[dict[str, set[tuple]]] = None,
+    sorted_output: bool = False,
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL
 ):
     if not file_paths:
         print(f"Lista de caminhos de arquivos vazia (iria para {output_name})")
@@ -266,55 +639,302 @@ def _mix_db_files(
         for file_path in file_paths
     ]
 
-    max_row_per_sheet = 1048576
+    output = DbOutput(header_max_row=header_max_row, output_mode=output_mode, compression_level=compression_level)
+    tab_sources = {}
+
+    try:
+        for file_path, file_workbook in zip(file_paths, file_workbooks):
+            file_processes = load_processes(file_workbook)
+            excluded = (excluded_processes or {}).get(file_path)
+
+            for file_worksheet in file_workbook.worksheets:
+                tab_name = get_base_tab_name(file_worksheet.title)
+
+                if tab_name == PROCESSES_TAB:
+                    continue
+
+                header_rows = list(file_worksheet.iter_rows(min_row=1, max_row=header_max_row, values_only=True))
+
+                if _are_header_rows_empty(header_rows):
+                    continue
+
+                if not output.has_tab(tab_name):
+                    output.add_tab(tab_name, header_rows, is_star_input=file_processes is not None)
+
+                rows = file_worksheet.iter_rows(min_row=header_max_row + 1, max_row=file_worksheet.max_row, values_only=True)
+
+                if excluded:
+                    rows = _rows_outside_processes(rows, file_processes, excluded)
+
+                if sorted_output:
+                    tab_sources.setdefault(tab_name, []).append(
+                        (file_workbook, file_processes, header_rows[0], rows)
+                    )
+                    continue
+
+                output.write_rows(tab_name, ((row, file_processes) for row in rows))
 
-    output_workbook = Workbook()
-    output_worksheet = output_workbook.active
-    output_worksheet.title = "BANCO DE DADOS"
+        for tab_name, sources in tab_sources.items():
+            output.write_rows(tab_name, _sorted_tab_rows(sources))
 
-    current_sheet = output_worksheet
-    current_row_count = header_max_row
-    sheet_index = 0
+        if sorted_output:
+            output.writer.keywords = SORTED_KEYWORD
 
-    header_rows = [] 
+        output.save(output_name)
+    finally:
+        output.close()
 
-    for file_index, file_workbook in enumerate(file_workbooks):
-        file_worksheet = file_workbook.active
 
-        if file_index == 0:
-            header_rows = list(file_worksheet.iter_rows(min_row=1, max_row=header_max_row, values_only=False))
-            _add_header_rows(header_rows, to_sheet=current_sheet)
+class DbOutput:
+    def __init__(self, header_max_row: int, output_mode: OutputMode, compression_level: int = DEFAULT_COMPRESSION_LEVEL):
+        self.header_max_row = header_max_row
+        self.output_mode = output_mode
+        self.writer = XlsxWriter(compression_level=compression_level)
 
-        min_row = header_max_row + 1
-        max_row = file_worksheet.max_row
+        self.current_sheets = {}
+        self.current_row_counts = {}
+        self.sheet_indexes = {}
+        self.tabs_header_rows = {}
+        self.process_keys = {}
 
-        for row in file_worksheet.iter_rows(min_row=min_row, max_row=max_row, values_only=True):
-            if current_row_count >= max_row_per_sheet:
-                sheet_index += 1
-                new_sheet_title = f"BANCO DE DADOS - Ext {sheet_index}"
-                current_sheet = output_workbook.create_sheet(title=new_sheet_title)
-                _add_header_rows(header_rows, to_sheet=current_sheet)
-                current_row_count = header_max_row
+    def has_tab(self, tab_name: str) -> bool:
+        return tab_name in self.current_sheets
+
+    def add_tab(self, tab_name: str, header_rows: list[tuple], is_star_input: bool):
+        header_rows = [
+            _convert_header_row(row, is_star_input=is_star_input, output_mode=self.output_mode)
+            for row in header_rows
+        ]
+
+        self.current_sheets[tab_name] = self.writer.create_sheet(title=tab_name)
+        self.current_row_counts[tab_name] = self.header_max_row
+        self.sheet_indexes[tab_name] = 0
+        self.tabs_header_rows[tab_name] = header_rows
+        _add_header_rows(header_rows, to_sheet=self.current_sheets[tab_name])
+
+    def write_rows(self, tab_name: str, rows: Iterator[tuple[tuple, Optional[dict[any, tuple]]]]):
+        current_sheet = self.current_sheets[tab_name]
+        current_row_count = self.current_row_counts[tab_name]
+        written_rows = 0
+
+        for row, file_processes in rows:
+            if current_row_count >= MAX_ROWS_PER_SHEET:
+                self.sheet_indexes[tab_name] += 1
+                new_sheet_title = f"{tab_name} - Ext {self.sheet_indexes[tab_name]}"
+                current_sheet = self.writer.create_sheet(title=new_sheet_title)
+                _add_header_rows(self.tabs_header_rows[tab_name], to_sheet=current_sheet)
+                current_row_count = self.header_max_row
+
+            row = _convert_row(
+                row=row,
+                file_processes=file_processes,
+                output_mode=self.output_mode,
+                process_keys=self.process_keys
+            )
 
             current_sheet.append(row)
             current_row_count += 1
+            written_rows += 1
+
+        get_metrics().inc("rows_written_total", written_rows, tab=tab_name)
+
+        self.current_sheets[tab_name] = current_sheet
+        self.current_row_counts[tab_name] = current_row_count
+
+    def save(self, output_name: str):
+        if not self.writer.sheetnames:
+            self.writer.create_sheet(title="BANCO DE DADOS")
+
+        if self.output_mode == "star" and self.process_keys:
+            processes_sheet = self.writer.create_sheet(title=PROCESSES_TAB)
+            processes_sheet.append([PROCESS_KEY_COLUMN] + DISTRIBUTOR_HEADER)
+
+            for distributor_values, key in self.process_keys.items():
+                processes_sheet.append([key] + list(distributor_values))
+
+        self.writer.save(output_name)
+
+    def close(self):
+        self.writer.close()
+
 
-    output_workbook.save(output_name)
+def _sorted_tab_rows(sources: list[tuple]) -> Iterator[tuple[tuple, Optional[dict[any, tuple]]]]:
+    sorted_streams = []
+    unsorted_streams = []
+
+    for source_index, (file_workbook, file_processes, header, rows) in enumerate(sources):
+        keyed_rows = _keyed_rows(source_index, file_processes, header, rows)
+
+        if file_workbook.properties.keywords == SORTED_KEYWORD:
+            sorted_streams.append(keyed_rows)
+        else:
+            unsorted_streams.append(keyed_rows)
+
+    merge_key = itemgetter(0, 1, 2)
+
+    with ExternalSorter(key=merge_key) as sorter:
+        streams = sorted_streams + sorter.sorted_runs(chain.from_iterable(unsorted_streams))
+
+        for _, source_index, _, row in heapq.merge(*streams, key=merge_key):
+            yield row, sources[source_index][1]
+
+
+def _keyed_rows(
+    source_index: int, 
+    file_processes: Optional[dict[any, tuple]], 
+    header: tuple, 
+    rows: Iterator[tuple]
+) -> Iterator[tuple]:
+    values_start = 1 if file_processes is not None else len(DISTRIBUTOR_HEADER)
+    key_indexes = [values_start + index for index in get_categorical_indexes(list(header[values_start:]))]
+    pending_rows = []
+
+    for sequence, row in enumerate(rows):
+        process = _get_row_process(row, file_processes)
+
+        if process is None:
+            pending_rows.append((sequence, row))
+            continue
+
+        sort_key = _get_sort_key(row, process, key_indexes)
+
+        for pending_sequence, pending_row in pending_rows:
+            yield sort_key[:3], source_index, pending_sequence, pending_row
+
+        pending_rows = []
+
+        yield sort_key, source_index, sequence, row
+
+    for pending_sequence, pending_row in pending_rows:
+        yield (TRAILING_ROW_KEY,), source_index, pending_sequence, pending_row
+
+
+def _get_sort_key(row: tuple, process: tuple, key_indexes: list[int]) -> tuple:
+    sigla, tariff_process, process_date = process
+    row_keys = tuple(_sort_value(row[index] if index < len(row) else None) for index in key_indexes)
+
+    return ((1, str(sigla)), _sort_value(process_date), _sort_value(tariff_process)) + row_keys
+
+
+def _sort_value(value: any) -> tuple:
+    if value is None or value == "":
+        return (0, "")
+
+    if isinstance(value, datetime):
+        return (1, value.isoformat())
+
+    if isinstance(value, (int, float)):
+        return (2, float(value))
+
+    return (3, str(value))
+
+
+def _rows_outside_processes(
+    rows: Iterator[tuple], 
+    file_processes: Optional[dict[any, tuple]], 
+    excluded: set[tuple]
+) -> Iterator[tuple]:
+    pending_rows = []
+
+    for row in rows:
+        process = _get_row_process(row, file_processes)
+
+        if process is None:
+            pending_rows.append(row)
+            continue
+
+        if process not in excluded:
+            yield from pending_rows
+            yield row
+
+        pending_rows = []
+
+    yield from pending_rows
+
+
+def _get_row_process(row: tuple, file_processes: Optional[dict[any, tuple]]) -> Optional[tuple]:
+    if file_processes is None:
+        distributor_values = row[:len(DISTRIBUTOR_HEADER)]
+    else:
+        distributor_values = file_processes.get(row[0]) if row else None
+
+    if not distributor_values or all(value is None or value == "" for value in distributor_values):
+        return None
+
+    return (distributor_values[1], distributor_values[6], distributor_values[7])
+
+
+def _convert_header_row(row: tuple, is_star_input: bool, output_mode: OutputMode) -> list[any]:
+    length = len(DISTRIBUTOR_HEADER)
+
+    if is_star_input and output_mode == "denormalized":
+        return DISTRIBUTOR_HEADER + list(row[1:])
+
+    if not is_star_input and output_mode == "star":
+        return [PROCESS_KEY_COLUMN] + list(row[length:])
+
+    return list(row)
+
+
+def _convert_row(
+    row: tuple, 
+    file_processes: Optional[dict[any, tuple]], 
+    output_mode: OutputMode, 
+    process_keys: dict[tuple, int]
+) -> tuple:
+    length = len(DISTRIBUTOR_HEADER)
+
+    if file_processes is None:
+        if output_mode == "denormalized":
+            return row
+
+        distributor_values = tuple(row[:length])
+        values = row[length:]
+    else:
+        distributor_values = file_processes.get(row[0])
+        values = row[1:]
+
+    is_blank = distributor_values is None or all(
+        value is None or value == "" for value in distributor_values
+    )
+
+    if output_mode == "denormalized":
+        if is_blank:
+            return tuple("" for _ in range(length)) + tuple(values)
+
+        return distributor_values + tuple(values)
+
+    if is_blank:
+        return ("",) + tuple(values)
+
+    if distributor_values not in process_keys:
+        process_keys[distributor_values] = len(process_keys) + 1
+
+    return (process_keys[distributor_values],) + tuple(values)
+
+
+def _are_header_rows_empty(header_rows: list[tuple]) -> bool:
+    for row in header_rows:
+        for value in row:
+            if value is not None and str(value).strip() != "":
+                return False
+
+    return True
 
 
 def _create_db_tab(
     distributor_info: dict[str, any], 
     distributor_header: list[str], 
     workbook: Workbook, 
-    worksheet: Optional[Worksheet], 
+    rows: Optional[Iterator[tuple]], 
     tab_name: str, 
     hide_first_line: bool = False
 ):
-    if not worksheet:
+    if rows is None:
         return
 
     new_worksheet = workbook.create_sheet(title=tab_name)
-    worksheet_header = [cell.value for cell in next(worksheet.iter_rows(min_row=1, max_row=1))]
+    worksheet_header = list(next(rows, None) or [])
     is_worksheet_empty = all(cell is None or str(cell).strip() == "" for cell in worksheet_header)
 
     if is_worksheet_empty:
@@ -322,25 +942,17 @@ def _create_db_tab(
 
     new_worksheet.append(distributor_header + worksheet_header)
 
-    max_row = worksheet.max_row
-    max_col = worksheet.max_column
+    distributor_values = list(distributor_info.values())
+    empty_values = ["" for _ in distributor_values]
 
     counter = 0
 
-    for row in worksheet.iter_rows(min_row=2, max_row=max_row, max_col=max_col, values_only=True):
+    for row in rows:
         if not all(cell is None for cell in row):
             if hide_first_line and counter == 0:
-                length = len(distributor_info.values())
-                empty_row = []
-
-                for _ in range(length):
-                    empty_row.append("")
-
-                new_row = empty_row + list(row)
-                new_worksheet.append(new_row)
+                new_worksheet.append(empty_values + list(row))
                 counter += 1
 
                 continue
 
-            new_row = list(distributor_info.values()) + list(row)
-            new_worksheet.append(new_row)
\ No newline at end of file
+            new_worksheet.append(distributor_values + list(row))
\ No newline at end of file
@@ -0,0 +1,104 @@
+from openpyxl import load_workbook, Workbook
+from typing import Iterator, Optional
+from .encoding import EncodedTable, StringDictionary
+from .utils import get_base_tab_name
+
+DISTRIBUTOR_HEADER = [
+    'Nome',
+    'Sigla',
+    'Concessionária/Permissionária',
+    'Código da Empresa',
+    'ID Agente',
+    'ID Concessão',
+    'Processo Tarifário',
+    'Data do processo tarifário em processamento'
+]
+
+SIGLA_INDEX = DISTRIBUTOR_HEADER.index("Sigla")
+
+AGENT_INDEX = DISTRIBUTOR_HEADER.index("Concessionária/Permissionária")
+
+PROCESS_INDEX = DISTRIBUTOR_HEADER.index("Processo Tarifário")
+
+DATE_INDEX = DISTRIBUTOR_HEADER.index("Data do processo tarifário em processamento")
+
+PROCESS_KEY_COLUMN = "ID Processo"
+
+PROCESSES_TAB = "PROCESSOS"
+
+
+def load_db_workbook(file_path: str) -> Workbook:
+    return load_workbook(file_path, keep_links=False, read_only=True, data_only=True)
+
+
+def get_db_tab_names(workbook: Workbook) -> list[str]:
+    tab_names = []
+
+    for sheet_name in workbook.sheetnames:
+        tab_name = get_base_tab_name(sheet_name)
+
+        if tab_name not in tab_names:
+            tab_names.append(tab_name)
+
+    return tab_names
+
+
+def get_db_header(workbook: Workbook, tab_name: str) -> list[any]:
+    worksheet = workbook[tab_name]
+
+    for row in worksheet.iter_rows(min_row=1, max_row=1, values_only=True):
+        return list(row)
+
+    return []
+
+
+def iter_db_rows(workbook: Workbook, tab_name: str, header_max_row: int = 1) -> Iterator[tuple]:
+    for worksheet in workbook.worksheets:
+        if get_base_tab_name(worksheet.title) != tab_name:
+            continue
+
+        yield from worksheet.iter_rows(min_row=header_max_row + 1, values_only=True)
+
+
+def load_processes(workbook: Workbook) -> Optional[dict[any, tuple]]:
+    if PROCESSES_TAB not in workbook.sheetnames:
+        return None
+
+    return read_processes(workbook[PROCESSES_TAB].iter_rows(min_row=2, values_only=True))
+
+
+def read_processes(rows: Iterator[tuple]) -> dict[any, tuple]:
+    processes = {}
+    length = len(DISTRIBUTOR_HEADER)
+
+    for row in rows:
+        if row and row[0] is not None:
+            values = tuple(row[1:length + 1])
+            processes[row[0]] = values + (None,) * (length - len(values))
+
+    return processes
+
+
+def load_encoded_tables(
+    file_path: str, 
+    tabs: Optional[list[str]] = None, 
+    dictionary: Optional[StringDictionary] = None
+) -> dict[str, EncodedTable]:
+    workbook = load_db_workbook(file_path)
+    tables = {}
+
+    for tab_name in get_db_tab_names(workbook):
+        if tabs is not None and tab_name not in tabs:
+            continue
+
+        table = EncodedTable(
+            header=get_db_header(workbook, tab_name),
+            dictionary=dictionary
+        )
+
+        table.extend(iter_db_rows(workbook, tab_name))
+        tables[tab_name] = table
+
+    workbook.close()
+
+    return tables
@@ -0,0 +1,229 @@
+from openpyxl import Workbook
+from datetime import datetime
+from typing import Iterator, Optional
+import os
+from .db_reader import load_encoded_tables, read_processes
+from .db_reader import DISTRIBUTOR_HEADER, PROCESS_KEY_COLUMN, PROCESSES_TAB, SIGLA_INDEX, PROCESS_INDEX, DATE_INDEX
+from .encoding import EncodedTable, StringDictionary
+from .tabs.tusd_or_te_data import UC_COLUMN, resolve_column_names
+
+
+DIFF_KEYS = {
+    "CUSTOS": ["TIPO TARIFA", "GRUPO DE CUSTO", "CUSTO", "TIPO DE CUSTO"],
+    "TUSD": ["TIPO DE TARIFA", "SUBGRUPO", "MODALIDADE", "CLASSE", "SUBCLASSE", "DETALHE", UC_COLUMN, "POSTO", "UNIDADE"],
+    "TE": ["TIPO DE TARIFA", "SUBGRUPO", "MODALIDADE", "CLASSE", "SUBCLASSE", "DETALHE", UC_COLUMN, "POSTO", "UNIDADE"],
+    "TABELAS REH": ["SUBGRUPO", "MODALIDADE", "ACESSANTE", "CLASSE", "SUBCLASSE", "Posto Tarifário"]
+}
+
+REPORT_HEADER = [
+    "Sigla",
+    "Processo anterior",
+    "Data anterior",
+    "Processo atual",
+    "Data atual",
+    "Chave",
+    "Situação",
+    "Coluna",
+    "Valor anterior",
+    "Valor atual",
+    "Variação",
+    "Variação %"
+]
+
+
+class ProcessTable:
+    def __init__(self, tab_name: str, table: EncodedTable, processes: Optional[dict[any, tuple]]):
+        self.tab_name = tab_name
+        self.table = table
+
+        header = table.header
+        is_star = processes is not None and header[:1] == [PROCESS_KEY_COLUMN]
+        values_start = 1 if is_star else len(DISTRIBUTOR_HEADER)
+
+        key_names = resolve_column_names(DIFF_KEYS[tab_name], header, tab_name)
+        self.key_indexes = [header.index(column_name) for column_name in key_names]
+        self.value_indexes = [
+            index for index in range(values_start, len(header))
+            if index not in self.key_indexes and not table.categorical[index]
+        ]
+
+        self.rows_by_process = self._group_rows(processes if is_star else None, values_start)
+
+    def _group_rows(self, processes: Optional[dict[any, tuple]], values_start: int) -> dict[tuple, list[int]]:
+        table = self.table
+
+        if processes is not None:
+            process_column = [processes.get(process_id) for process_id in table.columns[0]]
+        else:
+            process_column = zip(
+                table.column(table.header[SIGLA_INDEX]),
+                table.column(table.header[PROCESS_INDEX]),
+                table.column(table.header[DATE_INDEX])
+            )
+
+        rows_by_process = {}
+
+        for row_index, process in enumerate(process_column):
+            if not process:
+                continue
+
+            if processes is not None:
+                process = (process[SIGLA_INDEX], process[PROCESS_INDEX], process[DATE_INDEX])
+
+            if not process[0] or not isinstance(process[2], datetime):
+                continue
+
+            rows_by_process.setdefault(process, []).append(row_index)
+
+        return rows_by_process
+
+    def keyed_rows(self, process: tuple) -> dict[tuple, int]:
+        key_columns = [self.table.columns[index] for index in self.key_indexes]
+        keyed_rows = {}
+        occurrences = {}
+
+        for row_index in self.rows_by_process.get(process, []):
+            key = tuple(column[row_index] for column in key_columns)
+            occurrence = occurrences.get(key, 0)
+            occurrences[key] = occurrence + 1
+            keyed_rows[key + (occurrence,)] = row_index
+
+        return keyed_rows
+
+    def decode_key(self, key: tuple) -> str:
+        table = self.table
+        parts = []
+
+        for index, value in zip(self.key_indexes, key):
+            value = table.dictionary.decode(value) if table.categorical[index] else value
+
+            if value is not None and value != "Não se aplica":
+                parts.append(str(value))
+
+        if key[-1]:
+            parts.append(f"#{key[-1] + 1}")
+
+        return " | ".join(parts)
+
+
+def diff_processes(
+    table: ProcessTable,
+    previous_process: tuple,
+    current_process: tuple
+) -> Iterator[list[any]]:
+    previous_rows = table.keyed_rows(previous_process)
+    current_rows = table.keyed_rows(current_process)
+
+    value_columns = [(table.table.header[index], table.table.columns[index]) for index in table.value_indexes]
+    prefix = [current_process[0], previous_process[1], previous_process[2], current_process[1], current_process[2]]
+
+    for key, current_index in current_rows.items():
+        previous_index = previous_rows.get(key)
+
+        if previous_index is None:
+            yield prefix + [table.decode_key(key), "Nova", None, None, None, None, None]
+            continue
+
+        for column_name, column in value_columns:
+            change = _get_change(column[previous_index], column[current_index])
+
+            if change is not None:
+                yield prefix + [table.decode_key(key), "Alterada", column_name] + change
+
+    for key in sorted(previous_rows.keys() - current_rows.keys(), key=previous_rows.get):
+        yield prefix + [table.decode_key(key), "Removida", None, None, None, None, None]
+
+
+def diff_history(
+    db_path: str,
+    distributors: Optional[list[str]] = None,
+    tabs: Optional[list[str]] = None
+) -> dict[str, Iterator[list[any]]]:
+    tables = load_encoded_tables(db_path, dictionary=StringDictionary())
+    processes = _get_processes(tables.get(PROCESSES_TAB))
+    report = {}
+
+    for tab_name in tabs or list(DIFF_KEYS):
+        if tab_name not in tables or not tables[tab_name].header:
+            continue
+
+        table = ProcessTable(tab_name, tables[tab_name], processes)
+        report[tab_name] = _diff_consecutive(table, distributors)
+
+    return report
+
+
+def _diff_consecutive(table: ProcessTable, distributors: Optional[list[str]]) -> Iterator[list[any]]:
+    processes_by_distributor = {}
+
+    for process in table.rows_by_process:
+        if distributors is None or process[0] in distributors:
+            processes_by_distributor.setdefault(process[0], []).append(process)
+
+    for distributor in sorted(processes_by_distributor):
+        processes = sorted(processes_by_distributor[distributor], key=lambda process: process[2])
+
+        for previous_process, current_process in zip(processes, processes[1:]):
+            yield from diff_processes(table, previous_process, current_process)
+
+
+def write_change_report(
+    db_path: Optional[str] = None,
+    output_path: Optional[str] = None,
+    distributors: Optional[list[str]] = None,
+    tabs: Optional[list[str]] = None
+) -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    db_path = db_path or os.path.join(base_path, "Banco de Dados", "BANCO_Geral.xlsx")
+    output_path = output_path or os.path.join(base_path, "Relatórios", "ALTERACOES.xlsx")
+
+    if not os.path.exists(db_path):
+        raise ValueError(f"Banco de dados não encontrado: {db_path}")
+
+    unknown_tabs = [tab for tab in tabs or [] if tab not in DIFF_KEYS]
+
+    if unknown_tabs:
+        raise ValueError(f"Abas sem comparação: {unknown_tabs}. Use uma de {list(DIFF_KEYS)}")
+
+    workbook = Workbook(write_only=True)
+
+    for tab_name, rows in diff_history(db_path, distributors=distributors, tabs=tabs).items():
+        worksheet = workbook.create_sheet(title=tab_name)
+        worksheet.append(REPORT_HEADER)
+
+        for row in rows:
+            worksheet.append(row)
+
+    if not workbook.sheetnames:
+        workbook.create_sheet(title="ALTERACOES")
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    workbook.save(output_path)
+
+    return output_path
+
+
+def _get_processes(table: Optional[EncodedTable]) -> Optional[dict[any, tuple]]:
+    if table is None:
+        return None
+
+    return read_processes(table.rows())
+
+
+def _get_change(previous_value: any, current_value: any) -> Optional[list[any]]:
+    if previous_value == current_value:
+        return None
+
+    if not _is_number(previous_value) or not _is_number(current_value):
+        return [previous_value, current_value, None, None]
+
+    difference = current_value - previous_value
+    relative = difference / previous_value if previous_value else None
+
+    return [previous_value, current_value, difference, relative]
+
+
+def _is_number(value: any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -5,6 +5,9 @@ from typing import Literal
 from .utils import normalize
 
 
+_registry_cache: dict[str, any] = {}
+
+
 def _load_distributors_sheet() -> Worksheet:
     file_path = os.path.join(os.path.dirname(__file__), "../../distribuidoras.xlsx")
     file_path = os.path.abspath(file_path)
@@ -70,10 +73,26 @@ def create_all_folders():
     _create_folders("Permissionária")
 
 
-def _load_value(column_name: str, acronym: str, from_sheet: Worksheet) -> any:
-    worksheet = from_sheet
-    header_row = next(worksheet.iter_rows(min_row=1, max_row=1, values_only=True))
-    header = list(header_row)
+def load_distributor_registry() -> tuple[list[any], list[tuple]]:
+    file_path = os.path.join(os.path.dirname(__file__), "../../distribuidoras.xlsx")
+    file_path = os.path.abspath(file_path)
+
+    file_stat = os.stat(file_path)
+    stamp = (file_stat.st_size, file_stat.st_mtime_ns)
+
+    if _registry_cache.get("stamp") != stamp:
+        worksheet = _load_distributors_sheet()
+        rows = list(worksheet.iter_rows(values_only=True))
+
+        _registry_cache["stamp"] = stamp
+        _registry_cache["header"] = list(rows[0]) if rows else []
+        _registry_cache["rows"] = rows[1:]
+
+    return _registry_cache["header"], _registry_cache["rows"]
+
+
+def _load_value(column_name: str, acronym: str, from_registry: tuple[list[any], list[tuple]]) -> any:
+    header, rows = from_registry
 
     try:
         aimed_column = header.index(column_name)
@@ -81,7 +100,7 @@ def _load_value(column_name: str, acronym: str, from_sheet: Worksheet) -> any:
     except ValueError:
         raise ValueError(f"Column '{column_name}' or 'SIGLA' not found in header")
     
-    for row in worksheet.iter_rows(min_row=2, values_only=True):
+    for row in rows:
         column_value = row[aimed_column]
         acronym_value = row[acronym_column]
 
@@ -93,36 +112,36 @@ def _load_value(column_name: str, acronym: str, from_sheet: Worksheet) -> any:
 
 
 def get_distributor_info(acronym: str) -> dict[str, any]:
-    distributors_sheet = _load_distributors_sheet()
+    registry = load_distributor_registry()
 
     name = _load_value(
         column_name='NOME',
         acronym=acronym,
-        from_sheet=distributors_sheet
+        from_registry=registry
     )
 
     agent = _load_value(
         column_name='AGENTE',
         acronym=acronym,
-        from_sheet=distributors_sheet
+        from_registry=registry
     )
 
     company_code = _load_value(
         column_name='CÓDIGO',
         acronym=acronym,
-        from_sheet=distributors_sheet
+        from_registry=registry
     )
 
     agent_id = _load_value(
         column_name='ID AGENTE',
         acronym=acronym,
-        from_sheet=distributors_sheet
+        from_registry=registry
     )
 
     concession_id = _load_value(
         column_name='ID CONCESSÃO',
         acronym=acronym,
-        from_sheet=distributors_sheet
+        from_registry=registry
     )
 
     return {
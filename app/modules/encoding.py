@@ -0,0 +1,123 @@
+from array import array
+from typing import Iterable, Iterator, Optional
+
+
+CATEGORICAL_COLUMNS = {
+    "SUBGRUPO",
+    "MODALIDADE",
+    "CLASSE",
+    "SUBCLASSE",
+    "POSTO",
+    "Posto Tarifário",
+    "UNIDADE",
+    "TIPO DE TARIFA",
+    "TIPO TARIFA",
+    "TIPO DE CUSTO",
+    "GRUPO DE CUSTO",
+    "ACESSANTE",
+    "DETALHE",
+    "UC",
+    "Concessionária/Permissionária",
+    "Processo Tarifário"
+}
+
+
+class StringDictionary:
+    def __init__(self, values: Optional[Iterable[any]] = None):
+        self.values: list[any] = []
+        self._codes: dict[any, int] = {}
+
+        for value in values or []:
+            self.encode(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: any) -> int:
+        if value is None:
+            return -1
+
+        code = self._codes.get(value)
+
+        if code is None:
+            code = len(self.values)
+            self._codes[value] = code
+            self.values.append(value)
+
+        return code
+
+    def decode(self, code: int) -> any:
+        if code < 0:
+            return None
+
+        return self.values[code]
+
+
+def is_categorical(column_name: any) -> bool:
+    return column_name in CATEGORICAL_COLUMNS
+
+
+def get_categorical_indexes(header: list[any]) -> list[int]:
+    return [index for index, column_name in enumerate(header) if is_categorical(column_name)]
+
+
+class EncodedTable:
+    def __init__(self, header: list[any], dictionary: Optional[StringDictionary] = None):
+        self.header = list(header)
+        self.dictionary = dictionary if dictionary is not None else StringDictionary()
+        self.categorical = [is_categorical(column_name) for column_name in self.header]
+        self.columns: list[any] = [
+            array("i") if categorical else []
+            for categorical in self.categorical
+        ]
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(self, row: Iterable[any]):
+        row = list(row)
+        row += [None] * (len(self.header) - len(row))
+
+        for index, column in enumerate(self.columns):
+            value = row[index]
+
+            if self.categorical[index]:
+                column.append(self.dictionary.encode(value))
+            else:
+                column.append(value)
+
+        self._length += 1
+
+    def extend(self, rows: Iterable[Iterable[any]]):
+        for row in rows:
+            self.append(row)
+
+    def codes(self, column_name: any) -> array:
+        index = self.header.index(column_name)
+
+        if not self.categorical[index]:
+            raise ValueError(f"Coluna '{column_name}' não é categórica")
+
+        return self.columns[index]
+
+    def column(self, column_name: any) -> list[any]:
+        index = self.header.index(column_name)
+
+        if self.categorical[index]:
+            decode = self.dictionary.decode
+            return [decode(code) for code in self.columns[index]]
+
+        return self.columns[index]
+
+    def encoded_rows(self) -> Iterator[tuple]:
+        return zip(*self.columns)
+
+    def rows(self) -> Iterator[tuple]:
+        decode = self.dictionary.decode
+
+        for row in zip(*self.columns):
+            yield tuple(
+                decode(value) if categorical else value
+                for value, categorical in zip(row, self.categorical)
+            )
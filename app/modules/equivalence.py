@@ -0,0 +1,365 @@
+from datetime import date, datetime, time
+from itertools import zip_longest
+from typing import Iterator, Literal, Optional
+import hashlib
+import heapq
+import math
+import os
+import re
+import sqlite3
+from .db_reader import load_db_workbook, read_processes, get_db_tab_names, get_db_header, iter_db_rows
+from .db_reader import DISTRIBUTOR_HEADER, PROCESS_KEY_COLUMN, PROCESSES_TAB
+from .external_sort import ExternalSorter
+from .sqlite_data_base import DICTIONARY_TABLE
+
+
+CompareOrder = Literal["ordered", "unordered"]
+
+DEFAULT_MAX_DIFFERENCES = 10
+
+SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+
+HASH_BITS = 128
+
+ISO_DATE_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}([T ]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$")
+
+
+class XlsxOutput:
+    def __init__(self, file_path: str):
+        self.workbook = load_db_workbook(file_path)
+        self.tab_names = get_db_tab_names(self.workbook)
+
+    def get_header(self, tab_name: str) -> list[any]:
+        return get_db_header(self.workbook, tab_name)
+
+    def iter_rows(self, tab_name: str) -> Iterator[tuple]:
+        return iter_db_rows(self.workbook, tab_name)
+
+    def close(self):
+        self.workbook.close()
+
+
+class SqliteOutput:
+    def __init__(self, file_path: str):
+        self.connection = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True)
+        self.tab_names = [
+            name for name, in self.connection.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY rowid"
+            )
+            if name != DICTIONARY_TABLE
+        ]
+
+    def get_header(self, tab_name: str) -> list[any]:
+        cursor = self.connection.execute(f'SELECT * FROM "{tab_name} VALORES" LIMIT 0')
+        return [column[0] for column in cursor.description]
+
+    def iter_rows(self, tab_name: str) -> Iterator[tuple]:
+        return self.connection.execute(f'SELECT * FROM "{tab_name} VALORES"')
+
+    def close(self):
+        self.connection.close()
+
+
+def open_output(file_path: str) -> XlsxOutput | SqliteOutput:
+    if not os.path.exists(file_path):
+        raise ValueError(f"Arquivo não encontrado: {file_path}")
+
+    if file_path.lower().endswith(SQLITE_EXTENSIONS):
+        return SqliteOutput(file_path)
+
+    return XlsxOutput(file_path)
+
+
+def compare_outputs(
+    left_path: str,
+    right_path: str,
+    tabs: Optional[list[str]] = None,
+    order: CompareOrder = "ordered",
+    resolve_processes: bool = True,
+    significant_digits: Optional[int] = None,
+    max_differences: int = DEFAULT_MAX_DIFFERENCES
+) -> dict[str, dict[str, any]]:
+    left = open_output(left_path)
+    right = open_output(right_path)
+
+    try:
+        left_processes = _load_processes(left) if resolve_processes else None
+        right_processes = _load_processes(right) if resolve_processes else None
+
+        tab_names = list(left.tab_names) + [tab_name for tab_name in right.tab_names if tab_name not in left.tab_names]
+        results = {}
+
+        for tab_name in tab_names:
+            if tabs is not None and tab_name not in tabs:
+                continue
+
+            if tab_name == PROCESSES_TAB and (left_processes is not None or right_processes is not None):
+                continue
+
+            if tab_name not in right.tab_names or tab_name not in left.tab_names:
+                results[tab_name] = {"equal": False, "missing": "direita" if tab_name in left.tab_names else "esquerda"}
+                continue
+
+            left_table = _normalized_table(left, tab_name, left_processes, significant_digits)
+            right_table = _normalized_table(right, tab_name, right_processes, significant_digits)
+
+            if order == "unordered":
+                results[tab_name] = _compare_unordered(left_table, right_table, max_differences)
+            else:
+                results[tab_name] = _compare_ordered(left_table, right_table, max_differences)
+    finally:
+        left.close()
+        right.close()
+
+    return results
+
+
+def print_comparison(results: dict[str, dict[str, any]]) -> bool:
+    all_equal = True
+
+    for tab_name, result in results.items():
+        all_equal = all_equal and result["equal"]
+
+        if "missing" in result:
+            print(f"\n{tab_name}: aba ausente à {result['missing']}")
+            continue
+
+        status = "iguais" if result["equal"] else "DIFERENTES"
+        print(
+            f"\n{tab_name}: {status} ({result['left_rows']} x {result['right_rows']} linhas, "
+            f"hash {result['left_hash']} x {result['right_hash']})"
+        )
+
+        if result["header_differences"]:
+            print("  Cabeçalho:")
+            _print_columns(result["header_differences"])
+
+        if result["different_rows"]:
+            print(f"  {result['different_rows']} linha(s) diferente(s); primeiras:")
+
+        for difference in result["differences"]:
+            if "columns" in difference:
+                print(f"  Linha {difference['row']}:")
+                _print_columns(difference["columns"])
+            else:
+                side = "esquerda" if difference["side"] == "left" else "direita"
+                print(f"  Linha {difference['row']} só à {side}: {difference['values']}")
+
+    print("\nSaídas equivalentes." if all_equal else "\nSaídas diferentes.")
+
+    return all_equal
+
+
+def normalize_value(value: any, significant_digits: Optional[int] = None) -> any:
+    if value is None or value == "":
+        return None
+
+    if isinstance(value, bool):
+        return int(value)
+
+    if isinstance(value, (int, float)):
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return None
+
+            if significant_digits is not None:
+                value = float(f"{value:.{significant_digits}g}")
+
+            if value.is_integer():
+                return int(value)
+
+        return value
+
+    if isinstance(value, str) and ISO_DATE_PATTERN.match(value):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+
+    if isinstance(value, datetime):
+        if value.time() == time(0, 0):
+            return value.date().isoformat()
+
+        return value.isoformat()
+
+    if isinstance(value, date):
+        return value.isoformat()
+
+    return value
+
+
+def normalize_row(row: tuple, significant_digits: Optional[int] = None) -> tuple:
+    row = [normalize_value(value, significant_digits) for value in row]
+
+    while row and row[-1] is None:
+        row.pop()
+
+    return tuple(row)
+
+
+def get_row_hash(row: tuple) -> int:
+    return int.from_bytes(hashlib.blake2b(repr(row).encode("utf-8"), digest_size=HASH_BITS // 8).digest(), "big")
+
+
+def _normalized_table(
+    output: XlsxOutput | SqliteOutput,
+    tab_name: str,
+    processes: Optional[dict[any, tuple]],
+    significant_digits: Optional[int]
+) -> tuple[tuple, Iterator[tuple]]:
+    header = output.get_header(tab_name)
+    is_star = processes is not None and header[:1] == [PROCESS_KEY_COLUMN]
+
+    if is_star:
+        header = DISTRIBUTOR_HEADER + list(header[1:])
+
+    header = tuple(
+        str(column_name).replace('"', "'") if column_name is not None else f"COLUNA {index}"
+        for index, column_name in enumerate(header, start=1)
+    )
+
+    unknown_process = (None,) * (len(DISTRIBUTOR_HEADER) - 1)
+
+    def rows():
+        for row in output.iter_rows(tab_name):
+            if is_star and row:
+                distributor_values = processes.get(normalize_value(row[0]), (row[0],) + unknown_process)
+                row = distributor_values + tuple(row[1:])
+
+            row = normalize_row(row, significant_digits)
+
+            if row:
+                yield row
+
+    return header, rows()
+
+
+def _compare_ordered(
+    left_table: tuple[tuple, Iterator[tuple]],
+    right_table: tuple[tuple, Iterator[tuple]],
+    max_differences: int
+) -> dict[str, any]:
+    header = left_table[0]
+    result = _new_result(left_table[0], right_table[0])
+    left_digest = hashlib.blake2b(digest_size=HASH_BITS // 8)
+    right_digest = hashlib.blake2b(digest_size=HASH_BITS // 8)
+
+    for number, (left_row, right_row) in enumerate(zip_longest(left_table[1], right_table[1]), start=1):
+        if left_row is not None:
+            result["left_rows"] += 1
+            left_digest.update(repr(left_row).encode("utf-8"))
+
+        if right_row is not None:
+            result["right_rows"] += 1
+            right_digest.update(repr(right_row).encode("utf-8"))
+
+        if left_row == right_row:
+            continue
+
+        result["different_rows"] += 1
+
+        if len(result["differences"]) < max_differences:
+            result["differences"].append({"row": number, "columns": _get_column_differences(header, left_row or (), right_row or ())})
+
+    result["left_hash"] = left_digest.hexdigest()[:16]
+    result["right_hash"] = right_digest.hexdigest()[:16]
+    result["equal"] = not result["header_differences"] and not result["different_rows"]
+
+    return result
+
+
+def _compare_unordered(
+    left_table: tuple[tuple, Iterator[tuple]],
+    right_table: tuple[tuple, Iterator[tuple]],
+    max_differences: int
+) -> dict[str, any]:
+    result = _new_result(left_table[0], right_table[0])
+    sums = {"left": 0, "right": 0}
+    first_differences = []
+
+    def hashed_rows(side: str, rows: Iterator[tuple]) -> Iterator[tuple[int, int, tuple]]:
+        for number, row in enumerate(rows, start=1):
+            row_hash = get_row_hash(row)
+            result[f"{side}_rows"] += 1
+            sums[side] = (sums[side] + row_hash) % (1 << HASH_BITS)
+            yield row_hash, number, row
+
+    def remember(side: str, number: int, row: tuple):
+        result["different_rows"] += 1
+        difference = (-number, side, row)
+
+        if len(first_differences) < max_differences:
+            heapq.heappush(first_differences, difference)
+        elif difference > first_differences[0]:
+            heapq.heapreplace(first_differences, difference)
+
+    with ExternalSorter() as left_sorter, ExternalSorter() as right_sorter:
+        left_rows = heapq.merge(*left_sorter.sorted_runs(hashed_rows("left", left_table[1])))
+        right_rows = heapq.merge(*right_sorter.sorted_runs(hashed_rows("right", right_table[1])))
+
+        left_item = next(left_rows, None)
+        right_item = next(right_rows, None)
+
+        while left_item is not None or right_item is not None:
+            if right_item is None or (left_item is not None and left_item[0] < right_item[0]):
+                remember("left", left_item[1], left_item[2])
+                left_item = next(left_rows, None)
+            elif left_item is None or right_item[0] < left_item[0]:
+                remember("right", right_item[1], right_item[2])
+                right_item = next(right_rows, None)
+            else:
+                left_item = next(left_rows, None)
+                right_item = next(right_rows, None)
+
+    result["differences"] = [
+        {"row": -negative_number, "side": side, "values": list(row)}
+        for negative_number, side, row in sorted(first_differences, reverse=True)
+    ]
+    result["left_hash"] = f"{sums['left']:032x}"[:16]
+    result["right_hash"] = f"{sums['right']:032x}"[:16]
+    result["equal"] = not result["header_differences"] and not result["different_rows"]
+
+    return result
+
+
+def _new_result(left_header: tuple, right_header: tuple) -> dict[str, any]:
+    return {
+        "equal": True,
+        "left_rows": 0,
+        "right_rows": 0,
+        "header_differences": _get_column_differences(left_header, left_header, right_header),
+        "different_rows": 0,
+        "differences": []
+    }
+
+
+def _get_column_differences(header: tuple, left_row: tuple, right_row: tuple) -> list[dict[str, any]]:
+    differences = []
+
+    for index in range(max(len(left_row), len(right_row))):
+        left_value = left_row[index] if index < len(left_row) else None
+        right_value = right_row[index] if index < len(right_row) else None
+
+        if left_value != right_value or type(left_value) is not type(right_value):
+            differences.append({
+                "column": header[index] if index < len(header) else f"COLUNA {index + 1}",
+                "left": left_value,
+                "right": right_value
+            })
+
+    return differences
+
+
+def _print_columns(differences: list[dict[str, any]]):
+    for difference in differences:
+        print(f"    {difference['column']}: {difference['left']!r} x {difference['right']!r}")
+
+
+def _load_processes(output: XlsxOutput | SqliteOutput) -> Optional[dict[any, tuple]]:
+    if PROCESSES_TAB not in output.tab_names:
+        return None
+
+    return {
+        normalize_value(process_id): values
+        for process_id, values in read_processes(output.iter_rows(PROCESSES_TAB)).items()
+    }
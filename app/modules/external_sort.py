@@ -0,0 +1,78 @@
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, Optional
+import os
+import pickle
+import shutil
+import tempfile
+
+
+DEFAULT_RUN_ITEMS = 200000
+
+BATCH_ITEMS = 1000
+
+
+class ExternalSorter:
+    def __init__(
+        self,
+        key: Callable[[any], any] = itemgetter(0),
+        run_items: int = DEFAULT_RUN_ITEMS,
+        directory: Optional[str] = None
+    ):
+        self.key = key
+        self.run_items = run_items
+        self.directory = directory
+        self.temp_dir: Optional[str] = None
+        self.run_count = 0
+
+    def __enter__(self) -> "ExternalSorter":
+        return self
+
+    def __exit__(self, *args: any):
+        self.close()
+
+    def sorted_runs(self, items: Iterable[any]) -> list[Iterator[any]]:
+        runs = []
+        buffer = []
+
+        for item in items:
+            buffer.append(item)
+
+            if len(buffer) >= self.run_items:
+                runs.append(self._spill(buffer))
+                buffer = []
+
+        if buffer:
+            buffer.sort(key=self.key)
+            runs.append(iter(buffer))
+
+        return runs
+
+    def close(self):
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+
+    def _spill(self, buffer: list[any]) -> Iterator[any]:
+        if self.temp_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix="ordenacao_", dir=self.directory)
+
+        buffer.sort(key=self.key)
+        run_path = os.path.join(self.temp_dir, f"run_{self.run_count}.pkl")
+        self.run_count += 1
+
+        with open(run_path, "wb") as file:
+            for start in range(0, len(buffer), BATCH_ITEMS):
+                pickle.dump(buffer[start:start + BATCH_ITEMS], file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        return _read_run(run_path)
+
+
+def _read_run(run_path: str) -> Iterator[any]:
+    with open(run_path, "rb") as file:
+        while True:
+            try:
+                yield from pickle.load(file)
+            except EOFError:
+                break
+
+    os.remove(run_path)
@@ -0,0 +1,142 @@
+from typing import Optional
+from xml.etree import ElementTree
+import json
+import os
+import posixpath
+import zipfile
+
+
+INVENTORY_VERSION = 1
+
+MAIN_NAMESPACE = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+RELATIONSHIPS_NAMESPACE = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+OFFICE_DOCUMENT_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+DEFAULT_WORKBOOK_PART = "xl/workbook.xml"
+
+
+class WorkbookInventory:
+    def __init__(self, inventory_path: str):
+        self.inventory_path = inventory_path
+        self.entries: dict[str, dict[str, any]] = {}
+        self._changed = False
+
+    def load(self) -> bool:
+        if not os.path.exists(self.inventory_path):
+            return False
+
+        try:
+            with open(self.inventory_path, "r", encoding="utf-8") as file:
+                inventory = json.load(file)
+        except (OSError, ValueError):
+            return False
+
+        if inventory.get("version") != INVENTORY_VERSION:
+            return False
+
+        self.entries = inventory.get("files", {})
+        return True
+
+    def save(self):
+        if not self._changed:
+            return
+
+        os.makedirs(os.path.dirname(self.inventory_path), exist_ok=True)
+        temp_path = f"{self.inventory_path}.{os.getpid()}.tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"version": INVENTORY_VERSION, "files": self.entries}, file, ensure_ascii=False, indent=1)
+
+        os.replace(temp_path, self.inventory_path)
+        self._changed = False
+
+    def get(self, file_path: str) -> dict[str, any]:
+        file_stat = os.stat(file_path)
+        entry = self.entries.get(file_path)
+
+        if entry and entry["size"] == file_stat.st_size and entry["mtime"] == file_stat.st_mtime:
+            return entry
+
+        try:
+            sheets, error = read_sheet_names(file_path), None
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile, ElementTree.ParseError) as exception:
+            sheets, error = [], str(exception) or type(exception).__name__
+
+        entry = {
+            "size": file_stat.st_size,
+            "mtime": file_stat.st_mtime,
+            "sheets": sheets,
+            "error": error
+        }
+
+        self.entries[file_path] = entry
+        self._changed = True
+
+        return entry
+
+
+def read_sheet_names(file_path: str) -> list[str]:
+    with zipfile.ZipFile(file_path) as archive:
+        workbook_part = _get_workbook_part(archive)
+        root = ElementTree.fromstring(archive.read(workbook_part))
+
+    sheets = root.find(f"{MAIN_NAMESPACE}sheets")
+
+    if sheets is None:
+        raise ValueError(f"{workbook_part} não lista nenhuma aba")
+
+    return [sheet.get("name") for sheet in sheets.iter(f"{MAIN_NAMESPACE}sheet")]
+
+
+def _get_workbook_part(archive: zipfile.ZipFile) -> str:
+    try:
+        root = ElementTree.fromstring(archive.read("_rels/.rels"))
+    except KeyError:
+        return DEFAULT_WORKBOOK_PART
+
+    for relationship in root.iter(f"{RELATIONSHIPS_NAMESPACE}Relationship"):
+        if relationship.get("Type") == OFFICE_DOCUMENT_TYPE:
+            return posixpath.normpath(relationship.get("Target").lstrip("/"))
+
+    return DEFAULT_WORKBOOK_PART
+
+
+def inventory_jobs(
+    jobs: list[dict[str, any]],
+    tabs: list[str],
+    inventory_path: str
+) -> tuple[list[dict[str, any]], list[dict[str, any]]]:
+    inventory = WorkbookInventory(inventory_path)
+    inventory.load()
+
+    runnable_jobs = []
+    skipped_jobs = []
+
+    try:
+        for job in jobs:
+            entry = inventory.get(job["file_path"])
+
+            job["size"] = entry["size"]
+            job["tabs"] = [tab for tab in tabs if tab in entry["sheets"]]
+            job["skip_reason"] = _get_skip_reason(entry, job["tabs"])
+
+            if job["skip_reason"] is None:
+                runnable_jobs.append(job)
+            else:
+                skipped_jobs.append(job)
+    finally:
+        inventory.save()
+
+    return runnable_jobs, skipped_jobs
+
+
+def _get_skip_reason(entry: dict[str, any], present_tabs: list[str]) -> Optional[str]:
+    if entry["error"] is not None:
+        return f"arquivo ilegível ({entry['error']})"
+
+    if not present_tabs:
+        return "nenhuma das abas pedidas"
+
+    return None
@@ -0,0 +1,80 @@
+from openpyxl.worksheet.worksheet import Worksheet
+from typing import Optional
+import hashlib
+import json
+import os
+import shutil
+
+
+LAYOUT_VERSION = 2
+
+FINGERPRINT_MAX_ROW = 10
+
+_layouts: dict[str, dict[str, any]] = {}
+
+
+def get_layout_cache_path() -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    return os.path.join(base_path, ".cache", "layouts")
+
+
+def get_layout_fingerprint(worksheet: Worksheet, header_max_row: int = FINGERPRINT_MAX_ROW) -> str:
+    header_rows = [
+        [_fingerprint_value(value) for value in row]
+        for row in worksheet.iter_rows(min_row=1, max_row=header_max_row, values_only=True)
+    ]
+
+    merged_ranges = sorted(str(merged_range) for merged_range in worksheet.merged_cells.ranges)
+
+    signature = json.dumps([LAYOUT_VERSION, worksheet.title, header_rows, merged_ranges], ensure_ascii=False)
+
+    return hashlib.sha1(signature.encode("utf-8")).hexdigest()
+
+
+def _fingerprint_value(value: any) -> any:
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+
+    return str(value)
+
+
+def _get_layout_path(fingerprint: str) -> str:
+    return os.path.join(get_layout_cache_path(), f"{fingerprint}.json")
+
+
+def get_cached_layout(tab_name: str, fingerprint: str) -> Optional[dict[str, any]]:
+    if fingerprint in _layouts:
+        return _layouts[fingerprint]
+
+    try:
+        with open(_get_layout_path(fingerprint), "r", encoding="utf-8") as file:
+            entry = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if entry.get("version") != LAYOUT_VERSION or entry.get("tab") != tab_name:
+        return None
+
+    _layouts[fingerprint] = entry["layout"]
+
+    return entry["layout"]
+
+
+def save_layout(tab_name: str, fingerprint: str, layout: dict[str, any]):
+    _layouts[fingerprint] = layout
+
+    layout_path = _get_layout_path(fingerprint)
+    os.makedirs(os.path.dirname(layout_path), exist_ok=True)
+    temp_path = f"{layout_path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump({"version": LAYOUT_VERSION, "tab": tab_name, "layout": layout}, file, ensure_ascii=False)
+
+    os.replace(temp_path, layout_path)
+
+
+def clear_layout_cache():
+    _layouts.clear()
+    shutil.rmtree(get_layout_cache_path(), ignore_errors=True)
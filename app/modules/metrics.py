@@ -0,0 +1,240 @@
+from contextlib import contextmanager
+from multiprocessing import parent_process
+from typing import Optional
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+METRIC_PREFIX = "tarifas_"
+
+DURATION_BUCKETS = [0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300]
+
+WRITE_INTERVAL_SECONDS = 5.0
+
+METRICS = {
+    "files_processed_total": ("counter", "Planilhas processadas por processo tarifário"),
+    "files_failed_total": ("counter", "Planilhas que falharam por processo tarifário"),
+    "files_skipped_total": ("counter", "Planilhas ignoradas pelo inventário por processo tarifário"),
+    "rows_written_total": ("counter", "Linhas escritas nos bancos de dados por aba"),
+    "bytes_read_total": ("counter", "Bytes de planilhas de entrada lidos"),
+    "inflated_sheets_total": ("counter", "Abas lidas cujo intervalo declarado vai muito além da última linha com dados"),
+    "inflated_rows_max": ("gauge", "Maior número de linhas declaradas além da última linha com dados, por aba"),
+    "stage_duration_seconds": ("histogram", "Duração das etapas do processamento"),
+    "peak_rss_bytes": ("gauge", "Pico de memória residente por tipo de processo"),
+    "run_in_progress": ("gauge", "Indica se a execução ainda está em andamento"),
+    "run_success": ("gauge", "Indica se a última execução terminou sem erros"),
+    "run_last_update_timestamp_seconds": ("gauge", "Momento da última atualização das métricas"),
+    "run_last_success_timestamp_seconds": ("gauge", "Momento da última execução concluída sem erros")
+}
+
+
+class RunMetrics:
+    def __init__(self, output_path: Optional[str] = None, labels: Optional[dict[str, str]] = None):
+        self.output_path = output_path
+        self.labels = labels or {}
+        self.counters: dict[tuple, float] = {}
+        self.gauges: dict[tuple, float] = {}
+        self.maxima: dict[tuple, float] = {}
+        self.histograms: dict[tuple, list] = {}
+        self._last_write = 0.0
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        key = _get_key(name, labels)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str):
+        self.gauges[_get_key(name, labels)] = value
+
+    def set_max(self, name: str, value: float, **labels: str):
+        key = _get_key(name, labels)
+        self.maxima[key] = max(self.maxima.get(key, value), value)
+
+    def observe(self, name: str, value: float, **labels: str):
+        key = _get_key(name, labels)
+        histogram = self.histograms.setdefault(key, [[0] * len(DURATION_BUCKETS), 0.0, 0])
+
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if value <= bound:
+                histogram[0][index] += 1
+
+        histogram[1] += value
+        histogram[2] += 1
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            "counters": dict(self.counters),
+            "maxima": dict(self.maxima),
+            "histograms": {key: [list(buckets), total, count] for key, (buckets, total, count) in self.histograms.items()}
+        }
+
+    def merge(self, snapshot: Optional[dict[str, dict]]):
+        if not snapshot:
+            return
+
+        for key, value in snapshot["counters"].items():
+            self.counters[key] = self.counters.get(key, 0) + value
+
+        for key, value in snapshot["maxima"].items():
+            self.maxima[key] = max(self.maxima.get(key, value), value)
+
+        for key, (buckets, total, count) in snapshot["histograms"].items():
+            histogram = self.histograms.setdefault(key, [[0] * len(DURATION_BUCKETS), 0.0, 0])
+            histogram[0] = [current + added for current, added in zip(histogram[0], buckets)]
+            histogram[1] += total
+            histogram[2] += count
+
+    def render(self) -> str:
+        series = {}
+
+        for key, value in sorted(self.counters.items()):
+            series.setdefault(key[0], []).append(_format_sample(key[0], key[1], value, self.labels))
+
+        for values in [self.gauges, self.maxima]:
+            for key, value in sorted(values.items()):
+                series.setdefault(key[0], []).append(_format_sample(key[0], key[1], value, self.labels))
+
+        for key, (buckets, total, count) in sorted(self.histograms.items()):
+            name, labels = key
+            samples = series.setdefault(name, [])
+
+            for bound, bucket_count in zip(DURATION_BUCKETS, buckets):
+                samples.append(_format_sample(f"{name}_bucket", labels + (("le", str(bound)),), bucket_count, self.labels))
+
+            samples.append(_format_sample(f"{name}_bucket", labels + (("le", "+Inf"),), count, self.labels))
+            samples.append(_format_sample(f"{name}_sum", labels, total, self.labels))
+            samples.append(_format_sample(f"{name}_count", labels, count, self.labels))
+
+        lines = []
+
+        for name in sorted(series):
+            metric_type, description = METRICS[name]
+            lines.append(f"# HELP {METRIC_PREFIX}{name} {description}")
+            lines.append(f"# TYPE {METRIC_PREFIX}{name} {metric_type}")
+            lines += series[name]
+
+        return "\n".join(lines) + "\n"
+
+    def write(self, force: bool = True):
+        if self.output_path is None:
+            return
+
+        now = time.time()
+
+        if not force and now - self._last_write < WRITE_INTERVAL_SECONDS:
+            return
+
+        record_peak_rss(self)
+        self.set_gauge("run_last_update_timestamp_seconds", now)
+
+        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+        temp_path = f"{self.output_path}.tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(self.render())
+
+        os.replace(temp_path, self.output_path)
+        self._last_write = now
+
+
+_current_metrics = RunMetrics()
+
+
+def get_metrics() -> RunMetrics:
+    return _current_metrics
+
+
+@contextmanager
+def collect_metrics(metrics: RunMetrics):
+    global _current_metrics
+
+    previous_metrics = _current_metrics
+    _current_metrics = metrics
+
+    try:
+        yield metrics
+    finally:
+        _current_metrics = previous_metrics
+
+
+@contextmanager
+def run_metrics(base_path: str, run_name: str, **labels: str):
+    metrics = RunMetrics(output_path=get_metrics_path(base_path, run_name), labels={"run": run_name, **labels})
+    metrics.set_gauge("run_in_progress", 1)
+    metrics.write()
+
+    success = False
+
+    try:
+        with collect_metrics(metrics):
+            yield metrics
+
+        success = True
+    finally:
+        metrics.set_gauge("run_in_progress", 0)
+        metrics.set_gauge("run_success", 1 if success else 0)
+
+        if success:
+            metrics.set_gauge("run_last_success_timestamp_seconds", time.time())
+
+        metrics.write()
+
+
+@contextmanager
+def timed_stage(stage: str, **labels: str):
+    start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        get_metrics().observe("stage_duration_seconds", time.perf_counter() - start, stage=stage, **labels)
+
+
+def get_metrics_path(base_path: str, run_name: str) -> str:
+    return os.path.join(base_path, ".cache", "metricas", f"{run_name}.prom")
+
+
+def record_peak_rss(metrics: RunMetrics):
+    if resource is None:
+        return
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if sys.platform != "darwin":
+        peak_rss *= 1024
+
+    process = "main" if parent_process() is None else "worker"
+    metrics.set_max("peak_rss_bytes", peak_rss, process=process)
+
+
+def _get_key(name: str, labels: dict[str, str]) -> tuple:
+    if name not in METRICS:
+        raise ValueError(f"Métrica desconhecida: {name}")
+
+    return (name, tuple(sorted((key, str(value)) for key, value in labels.items())))
+
+
+def _format_sample(name: str, labels: tuple, value: float, constant_labels: dict[str, str]) -> str:
+    all_labels = tuple(sorted(constant_labels.items())) + labels
+    label_text = ",".join(f'{key}="{_escape_label(value)}"' for key, value in all_labels)
+
+    if label_text:
+        return f"{METRIC_PREFIX}{name}{{{label_text}}} {_format_value(value)}"
+
+    return f"{METRIC_PREFIX}{name} {_format_value(value)}"
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
@@ -0,0 +1,156 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Optional
+import json
+import os
+import time
+from tqdm import tqdm
+from .metrics import RunMetrics, collect_metrics, get_metrics, record_peak_rss
+
+
+def load_runtime_history(history_path: str) -> dict[str, dict[str, float]]:
+    if not os.path.exists(history_path):
+        return {}
+
+    try:
+        with open(history_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_runtime_history(history_path: str, history: dict[str, dict[str, float]]):
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    temp_path = f"{history_path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(history, file, ensure_ascii=False, indent=1)
+
+    os.replace(temp_path, history_path)
+
+
+def estimate_job_costs(file_paths: list[str], history: dict[str, dict[str, float]]) -> dict[str, float]:
+    seconds_per_byte = _get_seconds_per_byte(history)
+    costs = {}
+
+    for file_path in file_paths:
+        size = os.path.getsize(file_path)
+        entry = history.get(file_path)
+
+        if entry and entry.get("size") == size:
+            costs[file_path] = entry["seconds"]
+        else:
+            costs[file_path] = size * seconds_per_byte
+
+    return costs
+
+
+def _get_seconds_per_byte(history: dict[str, dict[str, float]]) -> float:
+    ratios = sorted(
+        entry["seconds"] / entry["size"]
+        for entry in history.values()
+        if entry.get("size")
+    )
+
+    if not ratios:
+        return 1.0
+
+    return ratios[len(ratios) // 2]
+
+
+def order_longest_first(jobs: list[dict[str, any]], history: dict[str, dict[str, float]]) -> list[dict[str, any]]:
+    costs = estimate_job_costs(
+        file_paths=[job["file_path"] for job in jobs],
+        history=history
+    )
+
+    return sorted(jobs, key=lambda job: costs[job["file_path"]], reverse=True)
+
+
+def _timed_call(run_job: Callable[[dict[str, any]], any], job: dict[str, any]) -> tuple[any, float, dict]:
+    metrics = RunMetrics()
+
+    with collect_metrics(metrics):
+        start = time.perf_counter()
+        result = run_job(job)
+        seconds = time.perf_counter() - start
+
+    record_peak_rss(metrics)
+
+    return result, seconds, metrics.snapshot()
+
+
+def run_grouped_jobs(
+    jobs: list[dict[str, any]],
+    run_job: Callable[[dict[str, any]], any],
+    on_group_done: Callable[[str, list[any]], None],
+    workers: int = 1,
+    history_path: Optional[str] = None,
+    desc: str = "Processando planilhas...",
+    done_results: Optional[dict[str, any]] = None,
+    on_job_done: Optional[Callable[[dict[str, any], any], None]] = None
+):
+    history = load_runtime_history(history_path) if history_path else {}
+    done_results = done_results or {}
+
+    pending_by_group = {}
+    results_by_group = {}
+
+    for job_index, job in enumerate(jobs):
+        job["index"] = job_index
+        pending_by_group[job["group"]] = pending_by_group.get(job["group"], 0) + 1
+        results_by_group.setdefault(job["group"], [])
+
+    def job_done(job: dict[str, any], result: any, seconds: Optional[float], snapshot: Optional[dict] = None):
+        get_metrics().merge(snapshot)
+
+        if seconds is not None:
+            history[job["file_path"]] = {
+                "seconds": seconds,
+                "size": os.path.getsize(job["file_path"])
+            }
+
+            if on_job_done:
+                on_job_done(job, result)
+
+        group = job["group"]
+        results_by_group[group].append((job["index"], result))
+        pending_by_group[group] -= 1
+
+        if pending_by_group[group] == 0:
+            results = [result for _, result in sorted(results_by_group.pop(group), key=lambda item: item[0])]
+            on_group_done(group, results)
+
+        get_metrics().write(force=False)
+
+    pending_jobs = []
+
+    for job in jobs:
+        if job["file_path"] in done_results:
+            job_done(job, done_results[job["file_path"]], None)
+        else:
+            pending_jobs.append(job)
+
+    jobs = pending_jobs
+
+    try:
+        if workers <= 1:
+            for job in tqdm(jobs, desc=desc):
+                result, seconds, snapshot = _timed_call(run_job, job)
+                job_done(job, result, seconds, snapshot)
+
+            return
+
+        ordered_jobs = order_longest_first(jobs, history)
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_timed_call, run_job, job): job
+                for job in ordered_jobs
+            }
+
+            for future in tqdm(as_completed(futures), total=len(futures), desc=desc):
+                result, seconds, snapshot = future.result()
+                job_done(futures[future], result, seconds, snapshot)
+    finally:
+        if history_path:
+            save_runtime_history(history_path, history)
@@ -0,0 +1,372 @@
+from collections import OrderedDict
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+from urllib.parse import parse_qsl, unquote, urlsplit
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import threading
+from .db_reader import load_encoded_tables, read_processes
+from .db_reader import DISTRIBUTOR_HEADER, PROCESS_KEY_COLUMN, PROCESSES_TAB, SIGLA_INDEX, PROCESS_INDEX, DATE_INDEX
+from .encoding import EncodedTable, StringDictionary
+
+
+SERVER_VERSION = 1
+
+DEFAULT_CACHE_BYTES = 256 * 1024 ** 2
+
+MAX_ENTRY_FRACTION = 4
+
+ROWS_PER_CHUNK = 1000
+
+DATE_COLUMN = DISTRIBUTOR_HEADER[DATE_INDEX]
+
+SHORTCUT_FILTERS = {
+    "sigla": DISTRIBUTOR_HEADER[SIGLA_INDEX],
+    "processo": DISTRIBUTOR_HEADER[PROCESS_INDEX]
+}
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries: OrderedDict[str, tuple[str, list[bytes]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple[str, list[bytes]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+            return entry
+
+    @property
+    def max_entry_bytes(self) -> int:
+        return self.max_bytes // MAX_ENTRY_FRACTION
+
+    def put(self, key: str, content_type: str, chunks: list[bytes]):
+        size = sum(len(chunk) for chunk in chunks)
+
+        if size > self.max_entry_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+
+            self._entries[key] = (content_type, chunks)
+            self.total_bytes += size
+
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted_chunks) = self._entries.popitem(last=False)
+                self.total_bytes -= sum(len(chunk) for chunk in evicted_chunks)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+class DataBaseSlices:
+    def __init__(self, db_path: str, cache: ResponseCache):
+        self.db_path = db_path
+        self.cache = cache
+        self.stamp: Optional[tuple] = None
+        self.tables: dict[str, EncodedTable] = {}
+        self.processes: Optional[dict[any, tuple]] = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> tuple:
+        db_stat = os.stat(self.db_path)
+        stamp = (SERVER_VERSION, db_stat.st_size, db_stat.st_mtime)
+
+        with self._lock:
+            if stamp != self.stamp:
+                self.tables = load_encoded_tables(self.db_path, dictionary=StringDictionary())
+                self.processes = _get_processes(self.tables.get(PROCESSES_TAB))
+                self.cache.clear()
+                self.stamp = stamp
+
+        return stamp
+
+    def get_etag(self, path: str, query: list[tuple[str, str]]) -> str:
+        signature = json.dumps([self.stamp, path, sorted(query)], ensure_ascii=False, default=str)
+        return f'"{hashlib.sha1(signature.encode("utf-8")).hexdigest()}"'
+
+    def describe(self) -> dict[str, any]:
+        return {
+            "tabs": {
+                tab_name: {"columns": [_json_value(column) for column in table.header], "rows": len(table)}
+                for tab_name, table in self.tables.items()
+            }
+        }
+
+    def iter_rows(self, tab_name: str, filters: dict[str, str]) -> tuple[list[any], Iterator[tuple]]:
+        if tab_name not in self.tables:
+            raise KeyError(tab_name)
+
+        table = self.tables[tab_name]
+        filters = dict(filters)
+        limit = int(filters.pop("limit")) if "limit" in filters else None
+        year = filters.pop("ano", None)
+
+        process_ids = None
+        is_star = table.header[:1] == [PROCESS_KEY_COLUMN] and self.processes is not None
+
+        column_filters = []
+
+        for name, value in filters.items():
+            column_name = SHORTCUT_FILTERS.get(name, name)
+
+            if is_star and column_name in DISTRIBUTOR_HEADER:
+                process_ids = _match_processes(self.processes, column_name, value, process_ids)
+                continue
+
+            if column_name not in table.header:
+                raise ValueError(f"Coluna desconhecida em {tab_name}: {column_name}")
+
+            column_filters.append((table.header.index(column_name), value))
+
+        if year is not None:
+            if is_star:
+                process_ids = _match_processes(self.processes, DATE_COLUMN, year, process_ids, by_year=True)
+            elif DATE_COLUMN in table.header:
+                column_filters.append((table.header.index(DATE_COLUMN), ("ano", year)))
+
+        if process_ids is not None:
+            column_filters.append((0, ("ids", process_ids)))
+
+        return table.header, _filtered_rows(table.rows(), column_filters, limit)
+
+
+class SliceRequestHandler(BaseHTTPRequestHandler):
+    slices: DataBaseSlices = None
+    server_version = "TarifasHTTP/1"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        path = unquote(url.path).rstrip("/") or "/"
+        query = parse_qsl(url.query)
+
+        try:
+            self.slices.refresh()
+        except OSError as error:
+            return self._send_error(503, f"Banco de dados indisponível: {error}")
+
+        etag = self.slices.get_etag(path, query)
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        cached = self.slices.cache.get(etag)
+
+        if cached is not None:
+            content_type, chunks = cached
+            self._send_chunks(200, content_type, etag, iter(chunks))
+            return
+
+        try:
+            content_type, chunks = self._render(path, dict(query))
+        except KeyError as error:
+            return self._send_error(404, f"Aba não encontrada: {error.args[0]}")
+        except ValueError as error:
+            return self._send_error(400, str(error))
+
+        sent_chunks = self._send_chunks(200, content_type, etag, chunks, self.slices.cache.max_entry_bytes)
+
+        if sent_chunks is not None:
+            self.slices.cache.put(etag, content_type, sent_chunks)
+
+    def _render(self, path: str, query: dict[str, str]) -> tuple[str, Iterator[bytes]]:
+        if path == "/":
+            return "application/json", iter([json.dumps(self.slices.describe(), ensure_ascii=False).encode("utf-8")])
+
+        if not path.startswith("/tabs/"):
+            raise KeyError(path)
+
+        output_format = query.pop("format", "json")
+
+        if output_format not in ["json", "csv"]:
+            raise ValueError(f"Formato desconhecido: {output_format}. Use json ou csv")
+
+        header, rows = self.slices.iter_rows(path[len("/tabs/"):], query)
+
+        if output_format == "csv":
+            return "text/csv; charset=utf-8", _csv_chunks(header, rows)
+
+        return "application/json", _json_chunks(header, rows)
+
+    def _send_chunks(
+        self,
+        status: int,
+        content_type: str,
+        etag: str,
+        chunks: Iterator[bytes],
+        max_buffered_bytes: int = 0
+    ) -> Optional[list[bytes]]:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        sent_chunks = []
+        sent_bytes = 0
+
+        try:
+            for chunk in chunks:
+                self.wfile.write(chunk)
+                sent_bytes += len(chunk)
+
+                if sent_bytes > max_buffered_bytes:
+                    sent_chunks = None
+                elif sent_chunks is not None:
+                    sent_chunks.append(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            return None
+
+        return sent_chunks
+
+    def _send_error(self, status: int, message: str):
+        body = json.dumps({"erro": message}, ensure_ascii=False).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: any):
+        pass
+
+
+def serve_data_base(
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    db_path: Optional[str] = None,
+    cache_bytes: int = DEFAULT_CACHE_BYTES
+):
+    if db_path is None:
+        base_path = os.path.join(os.path.dirname(__file__), "../../")
+        base_path = os.path.abspath(base_path)
+
+        db_path = os.path.join(base_path, "Banco de Dados", "BANCO_Geral.xlsx")
+
+    if not os.path.exists(db_path):
+        raise ValueError(f"Banco de dados não encontrado: {db_path}")
+
+    slices = DataBaseSlices(db_path=db_path, cache=ResponseCache(max_bytes=cache_bytes))
+    slices.refresh()
+
+    handler = type("Handler", (SliceRequestHandler,), {"slices": slices})
+    server = ThreadingHTTPServer((host, port), handler)
+
+    print(f"Servindo {os.path.basename(db_path)} em http://{host}:{port}/ (Ctrl+C para encerrar)...")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServidor encerrado.")
+    finally:
+        server.server_close()
+
+
+def _get_processes(table: Optional[EncodedTable]) -> Optional[dict[any, tuple]]:
+    if table is None:
+        return None
+
+    return read_processes(table.rows())
+
+
+def _match_processes(
+    processes: dict[any, tuple],
+    column_name: str,
+    value: str,
+    process_ids: Optional[set],
+    by_year: bool = False
+) -> set:
+    index = DISTRIBUTOR_HEADER.index(column_name)
+
+    matched_ids = {
+        process_id for process_id, distributor_values in processes.items()
+        if _matches(distributor_values[index], ("ano", value) if by_year else value)
+    }
+
+    return matched_ids if process_ids is None else process_ids & matched_ids
+
+
+def _filtered_rows(rows: Iterator[tuple], column_filters: list[tuple[int, any]], limit: Optional[int]) -> Iterator[tuple]:
+    count = 0
+
+    for row in rows:
+        if limit is not None and count >= limit:
+            return
+
+        if all(_matches(row[index], expected) for index, expected in column_filters):
+            count += 1
+            yield row
+
+
+def _matches(value: any, expected: any) -> bool:
+    if isinstance(expected, tuple) and expected[0] == "ids":
+        return value in expected[1]
+
+    if isinstance(expected, tuple) and expected[0] == "ano":
+        return isinstance(value, (date, datetime)) and str(value.year) == expected[1]
+
+    return value is not None and str(value) == expected
+
+
+def _json_value(value: any) -> any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+
+    return value
+
+
+def _json_chunks(header: list[any], rows: Iterator[tuple]) -> Iterator[bytes]:
+    columns = [str(_json_value(column)) for column in header]
+    separator = "["
+    batch = []
+
+    for row in rows:
+        batch.append(separator + json.dumps(dict(zip(columns, map(_json_value, row))), ensure_ascii=False, allow_nan=False))
+        separator = ","
+
+        if len(batch) >= ROWS_PER_CHUNK:
+            yield "\n".join(batch).encode("utf-8")
+            batch = []
+
+    batch.append("[]" if separator == "[" else "]")
+    yield "\n".join(batch).encode("utf-8")
+
+
+def _csv_chunks(header: list[any], rows: Iterator[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(_json_value(column) for column in header)
+    count = 0
+
+    for row in rows:
+        writer.writerow(_json_value(value) for value in row)
+        count += 1
+
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue().encode("utf-8")
@@ -0,0 +1,393 @@
+from multiprocessing import Process
+from typing import Literal, Optional
+import heapq
+import json
+import os
+import socket
+import threading
+import time
+import zlib
+from .aggregates import refresh_aggregates
+from .checkpoint import get_journal_path
+from .data_base import OutputMode, process_workbooks, process_data_base, merge_last_dbs, select_workbook_jobs
+from .scheduler import estimate_job_costs, load_runtime_history
+from .stages import validate_tabs
+
+
+SHARDS_VERSION = 1
+
+LOCK_HEARTBEAT_SECONDS = 60.0
+
+LOCK_TTL_SECONDS = 600.0
+
+ShardStrategy = Literal["hash", "cost"]
+
+
+def get_shards_path(agent: Literal["Concessionária", "Permissionária"]) -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    return os.path.join(base_path, ".cache", "fragmentos", agent)
+
+
+def plan_shards(
+    agent: Literal["Concessionária", "Permissionária"],
+    shard_count: int,
+    strategy: ShardStrategy = "cost",
+    distributors: Optional[list[str]] = None,
+    tabs: Optional[list[str]] = None,
+    output_mode: OutputMode = "denormalized",
+    sorted_output: bool = False
+) -> list[dict[str, any]]:
+    if shard_count < 1:
+        raise ValueError("O número de fragmentos deve ser pelo menos 1")
+
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    jobs = select_workbook_jobs(agent, distributors=distributors)
+    history = load_runtime_history(os.path.join(base_path, ".cache", "tempos_de_execucao.json"))
+    costs = estimate_job_costs([job["file_path"] for job in jobs], history)
+
+    distributor_costs = {}
+    distributor_files = {}
+
+    for job in jobs:
+        distributor = job["distributor"]
+        distributor_costs[distributor] = distributor_costs.get(distributor, 0.0) + costs[job["file_path"]]
+        distributor_files[distributor] = distributor_files.get(distributor, 0) + 1
+
+    if strategy == "hash":
+        assignments = _assign_by_hash(list(distributor_costs), shard_count)
+    else:
+        assignments = _assign_by_cost(distributor_costs, shard_count)
+
+    shards = [
+        {
+            "index": index,
+            "distributors": sorted(shard_distributors),
+            "files": sum(distributor_files[distributor] for distributor in shard_distributors),
+            "cost": sum(distributor_costs[distributor] for distributor in shard_distributors)
+        }
+        for index, shard_distributors in enumerate(
+            shard_distributors for shard_distributors in assignments if shard_distributors
+        )
+    ]
+
+    plan = {
+        "version": SHARDS_VERSION,
+        "agent": agent,
+        "strategy": strategy,
+        "settings": {"tabs": validate_tabs(tabs), "output_mode": output_mode, "sorted_output": sorted_output},
+        "shards": shards
+    }
+
+    shards_path = get_shards_path(agent)
+    _clear_shard_state(shards_path)
+
+    for shard in shards:
+        _remove(get_journal_path(base_path, _get_run_name(agent, shard["index"])))
+
+    _write_json(os.path.join(shards_path, "plano.json"), plan)
+
+    return shards
+
+
+def run_shard_worker(
+    agent: Literal["Concessionária", "Permissionária"],
+    workers: int = 1,
+    use_cache: bool = True,
+    worker_name: Optional[str] = None
+) -> list[int]:
+    shards_path = get_shards_path(agent)
+    plan = _read_plan(shards_path)
+    settings = plan["settings"]
+    worker_name = worker_name or f"{socket.gethostname()}-{os.getpid()}"
+
+    finished_shards = []
+
+    for shard in plan["shards"]:
+        index = shard["index"]
+
+        if os.path.exists(_get_done_path(shards_path, index)):
+            continue
+
+        owner = _claim_shard(shards_path, index, worker_name)
+
+        if owner is None:
+            continue
+
+        print(f"\n[{worker_name}] Fragmento {index}: {len(shard['distributors'])} distribuidora(s), {shard['files']} planilha(s)")
+
+        lock_path = _get_lock_path(shards_path, index)
+        stop_heartbeat = threading.Event()
+        heartbeat = threading.Thread(target=_keep_lock_alive, args=(lock_path, owner, stop_heartbeat), daemon=True)
+        heartbeat.start()
+        start = time.time()
+
+        try:
+            process_workbooks(
+                agent=agent,
+                tabs=settings["tabs"],
+                workers=workers,
+                output_mode=settings["output_mode"],
+                use_cache=use_cache,
+                resume=True,
+                distributors=shard["distributors"],
+                sorted_output=settings["sorted_output"],
+                run_name=_get_run_name(agent, index)
+            )
+
+            _write_json(
+                _get_done_path(shards_path, index),
+                {"worker": worker_name, "seconds": time.time() - start, "distributors": shard["distributors"]}
+            )
+        finally:
+            stop_heartbeat.set()
+            heartbeat.join()
+
+            if _read_lock(lock_path) == owner:
+                _remove(lock_path)
+
+        finished_shards.append(index)
+
+    return finished_shards
+
+
+def get_pending_shards(agent: Literal["Concessionária", "Permissionária"]) -> list[dict[str, any]]:
+    shards_path = get_shards_path(agent)
+    plan = _read_plan(shards_path)
+    pending = []
+
+    for shard in plan["shards"]:
+        if os.path.exists(_get_done_path(shards_path, shard["index"])):
+            continue
+
+        owner = _read_lock(_get_lock_path(shards_path, shard["index"]))
+        pending.append({**shard, "worker": owner.get("worker") if owner else None})
+
+    return pending
+
+
+def finish_shards(
+    agent: Literal["Concessionária", "Permissionária"],
+    compression_level: Optional[int] = None,
+    update_aggregates: bool = False
+):
+    pending = get_pending_shards(agent)
+
+    if pending:
+        descriptions = [
+            f"{shard['index']} ({shard['worker'] or 'sem worker'})"
+            for shard in pending
+        ]
+        raise ValueError(f"Fragmentos ainda não concluídos: {', '.join(descriptions)}")
+
+    settings = _read_plan(get_shards_path(agent))["settings"]
+    options = {"output_mode": settings["output_mode"], "sorted_output": settings["sorted_output"]}
+
+    if compression_level is not None:
+        options["compression_level"] = compression_level
+
+    process_data_base(agent, **options)
+    merge_last_dbs(**options)
+
+    if update_aggregates:
+        refresh_aggregates()
+
+
+def run_local_shards(
+    agent: Literal["Concessionária", "Permissionária"],
+    shard_count: int,
+    processes: int,
+    strategy: ShardStrategy = "cost",
+    distributors: Optional[list[str]] = None,
+    tabs: Optional[list[str]] = None,
+    output_mode: OutputMode = "denormalized",
+    sorted_output: bool = False,
+    use_cache: bool = True,
+    update_aggregates: bool = False
+):
+    plan_shards(
+        agent=agent,
+        shard_count=shard_count,
+        strategy=strategy,
+        distributors=distributors,
+        tabs=tabs,
+        output_mode=output_mode,
+        sorted_output=sorted_output
+    )
+
+    worker_processes = [
+        Process(
+            name=f"local-{number}",
+            target=run_shard_worker,
+            kwargs={"agent": agent, "use_cache": use_cache, "worker_name": f"local-{number}"}
+        )
+        for number in range(1, processes + 1)
+    ]
+
+    for worker_process in worker_processes:
+        worker_process.start()
+
+    for worker_process in worker_processes:
+        worker_process.join()
+
+    failed = [process.name for process in worker_processes if process.exitcode != 0]
+
+    if failed:
+        raise RuntimeError(f"Workers terminaram com erro: {', '.join(failed)}")
+
+    finish_shards(agent, update_aggregates=update_aggregates)
+
+
+def _assign_by_hash(distributors: list[str], shard_count: int) -> list[list[str]]:
+    assignments = [[] for _ in range(shard_count)]
+
+    for distributor in distributors:
+        assignments[zlib.crc32(distributor.encode("utf-8")) % shard_count].append(distributor)
+
+    return assignments
+
+
+def _assign_by_cost(distributor_costs: dict[str, float], shard_count: int) -> list[list[str]]:
+    assignments = [[] for _ in range(shard_count)]
+    loads = [(0.0, index) for index in range(shard_count)]
+
+    for distributor in sorted(distributor_costs, key=lambda distributor: (-distributor_costs[distributor], distributor)):
+        load, index = heapq.heappop(loads)
+        assignments[index].append(distributor)
+        heapq.heappush(loads, (load + distributor_costs[distributor], index))
+
+    return assignments
+
+
+def _claim_shard(shards_path: str, index: int, worker_name: str) -> Optional[dict[str, any]]:
+    lock_path = _get_lock_path(shards_path, index)
+
+    try:
+        descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        stale_owner = _read_lock(lock_path)
+
+        if not _is_lock_stale(stale_owner):
+            return None
+
+        abandoned_path = f"{lock_path}.{socket.gethostname()}-{os.getpid()}.abandonado"
+
+        if _read_lock(lock_path) != stale_owner:
+            return _claim_shard(shards_path, index, worker_name)
+
+        try:
+            os.rename(lock_path, abandoned_path)
+        except FileNotFoundError:
+            return _claim_shard(shards_path, index, worker_name)
+
+        if _read_lock(abandoned_path) != stale_owner:
+            _restore_lock(abandoned_path, lock_path)
+            return None
+
+        return _claim_shard(shards_path, index, worker_name)
+
+    now = time.time()
+    owner = {"worker": worker_name, "host": socket.gethostname(), "pid": os.getpid(), "started": now, "heartbeat": now}
+
+    with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+        json.dump(owner, file)
+
+    return owner
+
+
+def _is_lock_stale(owner: Optional[dict[str, any]]) -> bool:
+    if not owner:
+        return False
+
+    if owner.get("host") == socket.gethostname() and os.name != "nt":
+        try:
+            os.kill(owner["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+
+        return False
+
+    return time.time() - owner.get("heartbeat", owner.get("started", 0)) > LOCK_TTL_SECONDS
+
+
+def _keep_lock_alive(lock_path: str, owner: dict[str, any], stop: threading.Event):
+    while not stop.wait(LOCK_HEARTBEAT_SECONDS):
+        if _read_lock(lock_path) != owner:
+            return
+
+        owner["heartbeat"] = time.time()
+        _write_json(lock_path, owner)
+
+
+def _restore_lock(abandoned_path: str, lock_path: str):
+    try:
+        os.link(abandoned_path, lock_path)
+    except OSError:
+        return
+
+    _remove(abandoned_path)
+
+
+def _read_lock(lock_path: str) -> Optional[dict[str, any]]:
+    try:
+        with open(lock_path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def _read_plan(shards_path: str) -> dict[str, any]:
+    plan_path = os.path.join(shards_path, "plano.json")
+
+    try:
+        with open(plan_path, "r", encoding="utf-8") as file:
+            plan = json.load(file)
+    except (OSError, ValueError):
+        raise ValueError(f"Nenhum plano de fragmentos em {shards_path}. Rode 'shard plan' primeiro")
+
+    if plan.get("version") != SHARDS_VERSION:
+        raise ValueError(f"Plano de fragmentos em {plan_path} é de outra versão. Rode 'shard plan' novamente")
+
+    return plan
+
+
+def _clear_shard_state(shards_path: str):
+    os.makedirs(shards_path, exist_ok=True)
+
+    for name in os.listdir(shards_path):
+        if name.endswith(".trava") or name.endswith(".ok") or name.endswith(".abandonado"):
+            _remove(os.path.join(shards_path, name))
+
+
+def _get_run_name(agent: Literal["Concessionária", "Permissionária"], index: int) -> str:
+    return f"{agent}_fragmento_{index}"
+
+
+def _get_lock_path(shards_path: str, index: int) -> str:
+    return os.path.join(shards_path, f"fragmento_{index}.trava")
+
+
+def _get_done_path(shards_path: str, index: int) -> str:
+    return os.path.join(shards_path, f"fragmento_{index}.ok")
+
+
+def _write_json(path: str, content: dict[str, any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{socket.gethostname()}-{os.getpid()}.tmp"
+
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(content, file, ensure_ascii=False, indent=1)
+
+    os.replace(temp_path, path)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
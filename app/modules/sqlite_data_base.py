@@ -0,0 +1,133 @@
+from datetime import date, datetime
+from typing import Optional
+import os
+import sqlite3
+from .db_reader import load_db_workbook, get_db_tab_names, get_db_header, iter_db_rows
+from .encoding import StringDictionary, is_categorical
+
+
+DICTIONARY_TABLE = "DICIONARIO"
+
+
+def export_sqlite_db(
+    input_path: str, 
+    output_path: str, 
+    tabs: Optional[list[str]] = None,
+    dictionary: Optional[StringDictionary] = None
+):
+    dictionary = dictionary if dictionary is not None else StringDictionary()
+    workbook = load_db_workbook(input_path)
+
+    if os.path.exists(output_path):
+        os.remove(output_path)
+
+    connection = sqlite3.connect(output_path)
+
+    try:
+        with connection:
+            connection.execute(
+                f'CREATE TABLE "{DICTIONARY_TABLE}" (codigo INTEGER PRIMARY KEY, valor)'
+            )
+
+            for tab_name in get_db_tab_names(workbook):
+                if tabs is not None and tab_name not in tabs:
+                    continue
+
+                header = get_db_header(workbook, tab_name)
+
+                if not header:
+                    continue
+
+                _export_tab(
+                    connection=connection,
+                    tab_name=tab_name,
+                    header=header,
+                    rows=iter_db_rows(workbook, tab_name),
+                    dictionary=dictionary
+                )
+
+            connection.executemany(
+                f'INSERT INTO "{DICTIONARY_TABLE}" (codigo, valor) VALUES (?, ?)',
+                ((code, _sqlite_value(value)) for code, value in enumerate(dictionary.values))
+            )
+    finally:
+        connection.close()
+        workbook.close()
+
+
+def _export_tab(
+    connection: sqlite3.Connection, 
+    tab_name: str, 
+    header: list[any], 
+    rows: any, 
+    dictionary: StringDictionary
+):
+    column_names = _get_column_names(header)
+    categorical = [is_categorical(column_name) for column_name in header]
+
+    column_definitions = ", ".join(
+        f'"{column_name}" INTEGER' if is_code else f'"{column_name}"'
+        for column_name, is_code in zip(column_names, categorical)
+    )
+
+    connection.execute(f'CREATE TABLE "{tab_name}" ({column_definitions})')
+
+    placeholders = ", ".join("?" for _ in column_names)
+    length = len(column_names)
+
+    def encoded_rows():
+        for row in rows:
+            row = list(row[:length]) + [None] * (length - len(row))
+
+            yield [
+                _encoded_value(value, dictionary) if is_code else _sqlite_value(value)
+                for value, is_code in zip(row, categorical)
+            ]
+
+    connection.executemany(f'INSERT INTO "{tab_name}" VALUES ({placeholders})', encoded_rows())
+
+    selected_columns = []
+    joins = []
+
+    for index, (column_name, is_code) in enumerate(zip(column_names, categorical)):
+        if is_code:
+            alias = f"d{index}"
+            selected_columns.append(f'{alias}.valor AS "{column_name}"')
+            joins.append(
+                f'LEFT JOIN "{DICTIONARY_TABLE}" {alias} ON {alias}.codigo = t."{column_name}"'
+            )
+        else:
+            selected_columns.append(f't."{column_name}"')
+
+    connection.execute(
+        f'CREATE VIEW "{tab_name} VALORES" AS SELECT {", ".join(selected_columns)} '
+        f'FROM "{tab_name}" t {" ".join(joins)}'
+    )
+
+
+def _get_column_names(header: list[any]) -> list[str]:
+    column_names = []
+
+    for index, column_name in enumerate(header, start=1):
+        name = str(column_name).replace('"', "'") if column_name is not None else f"COLUNA {index}"
+
+        while name in column_names:
+            name = f"{name} ({index})"
+
+        column_names.append(name)
+
+    return column_names
+
+
+def _encoded_value(value: any, dictionary: StringDictionary) -> Optional[int]:
+    if value is None:
+        return None
+
+    return dictionary.encode(value)
+
+
+def _sqlite_value(value: any) -> any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    return value
@@ -0,0 +1,40 @@
+from openpyxl import Workbook
+from typing import Callable, Iterator, Optional
+from .tabs.costs_data import load_costs_rows
+from .tabs.tusd_or_te_market_data import load_tusd_or_te_market_rows
+from .tabs.tusd_or_te_data import load_tusd_or_te_rows, TusdOrTe
+from .tabs.effect_data import load_effect_rows
+from .tabs.reh_tables_data import load_reh_tables_rows
+
+
+TAB_NAMES = ["CUSTOS", "MERCADO TUSD", "TUSD", "MERCADO TE", "TE", "EFEITO", "TABELAS REH"]
+
+HIDE_FIRST_LINE_TABS = ["TUSD", "TE"]
+
+SOURCE_TABS = TAB_NAMES + TusdOrTe.TUSD.tariff_types + TusdOrTe.TE.tariff_types
+
+_TAB_LOADERS: dict[str, Callable[[Workbook], Optional[Iterator[tuple]]]] = {
+    "CUSTOS": lambda workbook: load_costs_rows(workbook=workbook),
+    "MERCADO TUSD": lambda workbook: load_tusd_or_te_market_rows(workbook=workbook, tusd_or_te="TUSD"),
+    "TUSD": lambda workbook: load_tusd_or_te_rows(workbook=workbook, tusd_or_te=TusdOrTe.TUSD),
+    "MERCADO TE": lambda workbook: load_tusd_or_te_market_rows(workbook=workbook, tusd_or_te="TE"),
+    "TE": lambda workbook: load_tusd_or_te_rows(workbook=workbook, tusd_or_te=TusdOrTe.TE),
+    "EFEITO": lambda workbook: load_effect_rows(workbook=workbook),
+    "TABELAS REH": lambda workbook: load_reh_tables_rows(workbook=workbook)
+}
+
+
+def load_tab_rows(workbook: Workbook, tab_name: str) -> Optional[Iterator[tuple]]:
+    return _TAB_LOADERS[tab_name](workbook)
+
+
+def validate_tabs(tabs: Optional[list[str]]) -> list[str]:
+    if tabs is None:
+        return list(TAB_NAMES)
+
+    unknown_tabs = [tab for tab in tabs if tab not in TAB_NAMES]
+
+    if unknown_tabs:
+        raise ValueError(f"Abas desconhecidas: {unknown_tabs}. Use uma de {TAB_NAMES}")
+
+    return [tab for tab in TAB_NAMES if tab in tabs]
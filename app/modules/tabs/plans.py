@@ -0,0 +1,200 @@
+from openpyxl import Workbook
+from openpyxl.worksheet.worksheet import Worksheet
+from typing import Iterable, Iterator, Optional, Union
+from itertools import chain, repeat
+from ..utils import read_range
+
+
+class SheetPlan:
+    def __init__(self, worksheet: Worksheet):
+        self.worksheet = worksheet
+        self.requests: set[tuple[int, int]] = set()
+        self._values: dict[tuple[int, int], list[any]] = {}
+
+    def request(self, column: int, start: int):
+        self.requests.add((column, start))
+
+    def request_all(self, columns: Iterable[int], start: int):
+        for column in columns:
+            self.request(column, start)
+
+    def values(self, column: int, start: int) -> list[any]:
+        if (column, start) not in self._values:
+            self.request(column, start)
+            self.execute()
+
+        return self._values[(column, start)]
+
+    def execute(self):
+        pending = [key for key in self.requests if key not in self._values]
+
+        if not pending:
+            return
+
+        min_col = min(column for column, _ in pending)
+        max_col = max(column for column, _ in pending)
+        min_row = min(start for _, start in pending)
+
+        columns = read_range(
+            from_worksheet=self.worksheet,
+            min_row=min_row,
+            min_col=min_col,
+            max_col=max_col,
+            direction="column"
+        )
+
+        for column, start in pending:
+            self._values[(column, start)] = columns[column - min_col][start - min_row:]
+
+
+class SheetPlans:
+    def __init__(self, workbook: Workbook):
+        self.workbook = workbook
+        self._plans: dict[str, SheetPlan] = {}
+
+    def __getitem__(self, sheet_name: str) -> SheetPlan:
+        if sheet_name not in self._plans:
+            self._plans[sheet_name] = SheetPlan(self.workbook[sheet_name])
+
+        return self._plans[sheet_name]
+
+
+class Column:
+    def __init__(self, label: Optional[str] = None, index: Optional[int] = None):
+        self.label = label
+        self.index = index
+
+
+class Tile:
+    def __init__(self, column: str, times: int):
+        self.column = column
+        self.times = times
+
+    def evaluate(self, columns: dict[str, list[any]]) -> Iterable[any]:
+        return chain.from_iterable(repeat(columns[self.column], self.times))
+
+
+class Stack:
+    def __init__(self, *columns: str):
+        self.columns = columns
+
+    def evaluate(self, columns: dict[str, list[any]]) -> Iterable[any]:
+        return chain.from_iterable(columns[column] for column in self.columns)
+
+
+class Labels:
+    def __init__(self, labels: list[str], length_of: str):
+        self.labels = labels
+        self.length_of = length_of
+
+    def evaluate(self, columns: dict[str, list[any]]) -> Iterable[any]:
+        length = len(columns[self.length_of])
+
+        return chain.from_iterable(repeat(label, length) for label in self.labels)
+
+
+OutputColumn = Union[str, Tile, Stack, Labels]
+
+
+class TabSpec:
+    def __init__(
+        self,
+        sheet: str,
+        columns: dict[str, Column],
+        output: list[tuple[str, OutputColumn]],
+        start: int,
+        header_row: int = 1,
+        excluded_values: Optional[tuple[str, list[any]]] = None,
+        drop_last_row: bool = False
+    ):
+        self.sheet = sheet
+        self.columns = columns
+        self.output = output
+        self.start = start
+        self.header_row = header_row
+        self.excluded_values = excluded_values
+        self.drop_last_row = drop_last_row
+
+
+class TabPlan:
+    def __init__(self, spec: TabSpec, sheet_plan: SheetPlan, column_indexes: dict[str, int]):
+        self.spec = spec
+        self.sheet_plan = sheet_plan
+        self.column_indexes = column_indexes
+
+    def rows(self) -> Iterator[tuple]:
+        spec = self.spec
+
+        columns = {
+            name: self.sheet_plan.values(column, spec.start)
+            for name, column in self.column_indexes.items()
+        }
+
+        if spec.excluded_values is not None:
+            columns = _without_excluded_rows(columns, *spec.excluded_values)
+
+        header = tuple(name for name, _ in spec.output)
+
+        rows = zip(*[
+            columns[output_column] if isinstance(output_column, str) else output_column.evaluate(columns)
+            for _, output_column in spec.output
+        ])
+
+        if spec.drop_last_row:
+            return _without_last_row(header, rows)
+
+        return chain([header], rows)
+
+
+def compile_spec(spec: TabSpec, sheet_plan: SheetPlan) -> TabPlan:
+    header = None
+    column_indexes = {}
+
+    for name, column in spec.columns.items():
+        if column.label is None:
+            column_indexes[name] = column.index + 1
+            continue
+
+        if header is None:
+            header_row = next(sheet_plan.worksheet.iter_rows(min_row=spec.header_row, max_row=spec.header_row, values_only=True))
+            header = list(header_row)
+
+        column_indexes[name] = header.index(column.label) + 1
+
+    sheet_plan.request_all(column_indexes.values(), spec.start)
+
+    return TabPlan(spec=spec, sheet_plan=sheet_plan, column_indexes=column_indexes)
+
+
+def load_spec_rows(workbook: Workbook, spec: TabSpec) -> Optional[Iterator[tuple]]:
+    if spec.sheet not in workbook.sheetnames:
+        return None
+
+    plan = compile_spec(spec, SheetPlan(workbook[spec.sheet]))
+
+    return plan.rows()
+
+
+def _without_excluded_rows(columns: dict[str, list[any]], key_column: str, excluded_values: list[any]) -> dict[str, list[any]]:
+    excluded_indexes = {index for index, value in enumerate(columns[key_column]) if value in excluded_values}
+
+    if not excluded_indexes:
+        return columns
+
+    return {
+        name: [value for index, value in enumerate(values) if index not in excluded_indexes]
+        for name, values in columns.items()
+    }
+
+
+def _without_last_row(header: tuple, rows: Iterator[tuple]) -> Iterator[tuple]:
+    previous_row = next(rows, None)
+
+    if previous_row is None:
+        return
+
+    yield header
+
+    for row in rows:
+        yield previous_row
+        previous_row = row
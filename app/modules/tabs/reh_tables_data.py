@@ -1,86 +1,35 @@
 from openpyxl import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
-from typing import Literal, Optional
-from ..utils import load_values, get_rows_and_columns_from
+from typing import Iterator, Literal, Optional
+from itertools import chain
+from .plans import SheetPlan
+from ..layout import get_layout_fingerprint, get_cached_layout, save_layout
+from ..utils import load_values, get_cell_value, get_rows_and_columns_of
 
 
-def load_reh_tables_sheet(workbook: Workbook) -> Optional[Worksheet]:
+def load_reh_tables_rows(workbook: Workbook) -> Optional[Iterator[tuple]]:
     tab_name = "TABELAS REH"
 
     if tab_name not in workbook.sheetnames:
         return None
 
-    reh_tables_tab = workbook[tab_name]
+    block_map = RehBlockMap(worksheet=workbook[tab_name])
 
-    subgroup_info = _get_info_from("SUBGRUPO", worksheet=reh_tables_tab, start_jump=3)
-    modality_info = _get_info_from("MODALIDADE", worksheet=reh_tables_tab, start_jump=3)
+    subgroup_info = block_map.get_info_from("SUBGRUPO")
+    modality_info = block_map.get_info_from("MODALIDADE")
+    acessor_info = block_map.get_extended_info_from("ACESSANTE", first_table=False)
+    class_info = block_map.get_extended_info_from("CLASSE", first_table=True)
+    subclass_info = block_map.get_extended_info_from("SUBCLASSE", first_table=True)
+    post_info = block_map.get_info_from("POSTO")
 
-    acessor_info = _get_extended_info_from(
-        column_name="ACESSANTE",
-        first_table=False,
-        worksheet=reh_tables_tab
-    )
-
-    class_info = _get_extended_info_from(
-        column_name="CLASSE",
-        first_table=True,
-        worksheet=reh_tables_tab
-    )
-
-    subclass_info = _get_extended_info_from(
-        column_name="SUBCLASSE",
-        first_table=True,
-        worksheet=reh_tables_tab
-    )
-
-    post_info = _get_info_from("POSTO", worksheet=reh_tables_tab, start_jump=3)
-
-    tusd_kw_ta_info = _get_tusd_or_te_info(
-        tusd_or_te="TUSD",
-        unit="R$/kW",
-        type="TARIFAS DE APLICAÇÃO",
-        worksheet=reh_tables_tab
-    )
-
-    tusd_mwh_ta_info = _get_tusd_or_te_info(
-        tusd_or_te="TUSD",
-        unit="R$/MWh",
-        type="TARIFAS DE APLICAÇÃO",
-        worksheet=reh_tables_tab
-    )
-
-    te_mwh_ta_info = _get_tusd_or_te_info(
-        tusd_or_te="TE",
-        unit="R$/MWh",
-        type="TARIFAS DE APLICAÇÃO",
-        worksheet=reh_tables_tab
-    )
-
-    tusd_kw_be_info = _get_tusd_or_te_info(
-        tusd_or_te="TUSD",
-        unit="R$/kW",
-        type="BASE ECONÔMICA",
-        worksheet=reh_tables_tab
-    )
-
-    tusd_mwh_be_info = _get_tusd_or_te_info(
-        tusd_or_te="TUSD",
-        unit="R$/MWh",
-        type="BASE ECONÔMICA",
-        worksheet=reh_tables_tab
-    )
-
-    te_mwh_be_info = _get_tusd_or_te_info(
-        tusd_or_te="TE",
-        unit="R$/MWh",
-        type="BASE ECONÔMICA",
-        worksheet=reh_tables_tab
-    )
-
-    output_workbook = Workbook()
-    new_worksheet = output_workbook.active
+    tusd_kw_ta_info = block_map.get_tusd_or_te_info("TUSD", "R$/kW", "TARIFAS DE APLICAÇÃO")
+    tusd_mwh_ta_info = block_map.get_tusd_or_te_info("TUSD", "R$/MWh", "TARIFAS DE APLICAÇÃO")
+    te_mwh_ta_info = block_map.get_tusd_or_te_info("TE", "R$/MWh", "TARIFAS DE APLICAÇÃO")
+    tusd_kw_be_info = block_map.get_tusd_or_te_info("TUSD", "R$/kW", "BASE ECONÔMICA")
+    tusd_mwh_be_info = block_map.get_tusd_or_te_info("TUSD", "R$/MWh", "BASE ECONÔMICA")
+    te_mwh_be_info = block_map.get_tusd_or_te_info("TE", "R$/MWh", "BASE ECONÔMICA")
 
-    new_worksheet.append([
+    header = (
         "SUBGRUPO",
         "MODALIDADE",
         "ACESSANTE",
@@ -93,120 +42,142 @@ def load_reh_tables_sheet(workbook: Workbook) -> Optional[Worksheet]:
         "TUSD BE R$/kW",
         "TUSD BE R$/MWh",
         "TE BE R$/MWh"
-    ])
-
-    for row in zip(subgroup_info, modality_info, acessor_info, class_info, subclass_info, post_info, tusd_kw_ta_info, tusd_mwh_ta_info, te_mwh_ta_info, tusd_kw_be_info, tusd_mwh_be_info, te_mwh_be_info):
-        new_worksheet.append(row)
-
-    return new_worksheet
-
-
-def _get_info_from(column_name: str, worksheet: Worksheet, start_jump: int) -> list[any]:
-    rows_and_columns = get_rows_and_columns_from(
-        value=column_name,
-        worksheet=worksheet
     )
 
-    all_values = []
-
-    for row_and_column in rows_and_columns:
-        values = load_values(
-            from_worksheet=worksheet,
-            index=row_and_column[1] - 1,
-            direction="column",
-            start=row_and_column[0] + start_jump
+    return chain([header], zip(subgroup_info, modality_info, acessor_info, class_info, subclass_info, post_info, tusd_kw_ta_info, tusd_mwh_ta_info, te_mwh_ta_info, tusd_kw_be_info, tusd_mwh_be_info, te_mwh_be_info))
+
+
+class RehBlockMap:
+    header_labels = ["SUBGRUPO", "MODALIDADE", "ACESSANTE", "CLASSE", "SUBCLASSE", "POSTO"]
+    unit_labels = ["R$/kW", "R$/MWh"]
+    start_jump = 3
+    header_max_row = 4
+
+    def __init__(self, worksheet: Worksheet):
+        self.worksheet = worksheet
+        self.anchors = self._load_anchors()
+
+        self.plan = SheetPlan(worksheet)
+        self._rows: dict[tuple[int, int], list[any]] = {}
+
+        for label in self.header_labels:
+            for row, column in self.anchors[label]:
+                self.plan.request(column, row + self.start_jump)
+
+        for unit in self.unit_labels:
+            for row, column in self.anchors[unit]:
+                self.plan.request(column, row + 1)
+
+        self.tables = [
+            {
+                "header_row": row,
+                "column": column,
+                "length": len(self.column_values(column, row + self.start_jump))
+            }
+            for row, column in self.anchors["SUBGRUPO"]
+        ]
+
+        self.bands = []
+
+        for unit in self.unit_labels:
+            for row, column in self.anchors[unit]:
+                self.bands.append({
+                    "unit": unit,
+                    "row": row,
+                    "column": column,
+                    "tusd_or_te": self.row_values(row - 1, column)[0]
+                })
+
+    def _load_anchors(self) -> dict[str, list[tuple[int, int]]]:
+        fingerprint = get_layout_fingerprint(self.worksheet, header_max_row=self.header_max_row)
+        cached_anchors = get_cached_layout(self.worksheet.title, fingerprint)
+
+        if cached_anchors is not None:
+            anchors = {
+                label: [tuple(row_and_column) for row_and_column in rows_and_columns]
+                for label, rows_and_columns in cached_anchors.items()
+            }
+
+            if self._are_anchors_valid(anchors):
+                return anchors
+
+        anchors = get_rows_and_columns_of(
+            values=self.header_labels + self.unit_labels,
+            worksheet=self.worksheet
         )
 
-        all_values += values
+        save_layout(self.worksheet.title, fingerprint, anchors)
 
-    return all_values
+        return anchors
 
+    def _are_anchors_valid(self, anchors: dict[str, list[tuple[int, int]]]) -> bool:
+        if set(anchors) != set(self.header_labels + self.unit_labels):
+            return False
 
-def _get_extended_info_from(column_name: str, first_table: bool, worksheet: Worksheet) -> list[any]:
-    length = _get_table_length(
-        first_table=first_table,
-        worksheet=worksheet
-    )
+        for label, rows_and_columns in anchors.items():
+            for row, column in rows_and_columns:
+                if get_cell_value(self.worksheet, row=row, column=column) != label:
+                    return False
 
-    values = []
+        return True
 
-    if first_table:
-        for _ in range(length):
-             values.append("Não se aplica")
+    def column_values(self, column: int, start: int) -> list[any]:
+        return self.plan.values(column, start)
 
-        values += _get_info_from(column_name, worksheet, start_jump=3)
-    else:
-        values += _get_info_from(column_name, worksheet, start_jump=3)
+    def row_values(self, row: int, start: int) -> list[any]:
+        key = (row, start)
 
-        for _ in range(length):
-             values.append("Não se aplica")
+        if key not in self._rows:
+            self._rows[key] = load_values(
+                from_worksheet=self.worksheet,
+                index=row - 1,
+                direction="row",
+                start=start
+            )
 
-    return values
+        return self._rows[key]
 
+    def get_info_from(self, column_name: str) -> list[any]:
+        all_values = []
 
-def _get_table_length(first_table: bool, worksheet: Worksheet) -> int:
-    rows_and_columns = get_rows_and_columns_from(
-        value="SUBGRUPO",
-        worksheet=worksheet
-    )
+        for row, column in self.anchors[column_name]:
+            all_values += self.column_values(column, row + self.start_jump)
 
-    if len(rows_and_columns) > 0:
+        return all_values
+
+    def get_table_length(self, first_table: bool) -> int:
         index = 0 if first_table else 1
-        row_and_column = rows_and_columns[index]
-    else:
-        row_and_column = (2, 1) if first_table else (2, 12)
-
-    values = load_values(
-        from_worksheet=worksheet,
-        index=row_and_column[1] - 1,
-        direction="column",
-        start=row_and_column[0] + 3
-    )
 
-    return len(values)
+        if len(self.tables) > 0:
+            return self.tables[index]["length"]
 
+        row, column = (2, 1) if first_table else (2, 12)
 
-def _get_tusd_or_te_info(
-    tusd_or_te: Literal["TUSD", "TE"], 
-    unit: Literal["R$/kW", "R$/MWh"], 
-    type: Literal["TARIFAS DE APLICAÇÃO", "BASE ECONÔMICA"],
-    worksheet: Worksheet
-) -> list[any]:
-    rows_and_columns = get_rows_and_columns_from(
-        value=unit, 
-        worksheet=worksheet
-    )
+        return len(self.column_values(column, row + self.start_jump))
 
-    all_column_values = []
+    def get_extended_info_from(self, column_name: str, first_table: bool) -> list[any]:
+        filler = ["Não se aplica" for _ in range(self.get_table_length(first_table))]
 
-    for row_and_column in rows_and_columns:
-        tusd_or_te_values = load_values(
-            from_worksheet=worksheet,
-            index=row_and_column[0] - 2,
-            direction="row",
-            start=row_and_column[1]
-        )
+        if first_table:
+            return filler + self.get_info_from(column_name)
 
-        tusd_or_te_upper_value = tusd_or_te_values[0]
+        return self.get_info_from(column_name) + filler
 
-        if tusd_or_te_upper_value == tusd_or_te:
-            tariff_or_base_values = load_values(
-                from_worksheet=worksheet,
-                index=row_and_column[0] - 3,
-                direction="row",
-                start=row_and_column[1]
-            )
+    def get_tusd_or_te_info(
+        self,
+        tusd_or_te: Literal["TUSD", "TE"], 
+        unit: Literal["R$/kW", "R$/MWh"], 
+        type: Literal["TARIFAS DE APLICAÇÃO", "BASE ECONÔMICA"]
+    ) -> list[any]:
+        all_column_values = []
 
-            tariff_or_base_upper_value = tariff_or_base_values[0]
+        for band in self.bands:
+            if band["unit"] != unit or band["tusd_or_te"] != tusd_or_te:
+                continue
 
-            if tariff_or_base_upper_value == type:
-                column_values = load_values(
-                    from_worksheet=worksheet,
-                    index=row_and_column[1] - 1,
-                    direction="column",
-                    start=row_and_column[0] + 1
-                )
+            if self.row_values(band["row"] - 2, band["column"])[0] != type:
+                continue
 
-                all_column_values += column_values
+            all_column_values += self.column_values(band["column"], band["row"] + 1)
 
-    return all_column_values
+        return all_column_values
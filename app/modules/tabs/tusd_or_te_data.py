@@ -1,8 +1,9 @@
 from openpyxl import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
 from enum import Enum
-from typing import Optional
-from itertools import groupby
+from typing import Iterator, Optional
+from itertools import chain, groupby, islice, zip_longest
+from .plans import SheetPlan, SheetPlans
 from ..utils import load_values, get_rows_and_columns_from, join_sheets_vertically
 
 
@@ -35,7 +36,10 @@ class TusdOrTe(Enum):
                 return ["TR TE", "TE BE", "TE BF", "TE CVA"]
 
 
-def load_tusd_or_te_sheet(workbook: Workbook, tusd_or_te: TusdOrTe) -> Optional[Worksheet]:
+UC_COLUMN = "UC"
+
+
+def load_tusd_or_te_rows(workbook: Workbook, tusd_or_te: TusdOrTe) -> Optional[Iterator[tuple]]:
     tab_name = tusd_or_te.main_tab
 
     if tab_name not in workbook.sheetnames:
@@ -45,128 +49,86 @@ def load_tusd_or_te_sheet(workbook: Workbook, tusd_or_te: TusdOrTe) -> Optional[
     header_row = next(tab.iter_rows(min_row=1, max_row=1, values_only=True))
     header = list(header_row)
 
-    length = _get_length(
+    column_names = _get_main_column_names(
+        workbook=workbook,
+        tusd_or_te=tusd_or_te
+    )
+
+    remaining_header = _get_remaining_header(
         workbook=workbook,
+        reference_tab=tusd_or_te.reference_tab
+    )
+
+    plans = SheetPlans(workbook)
+
+    remaining_columns = _request_columns(
+        plans=plans,
+        header=header,
+        column_names=column_names,
+        remaining_header=remaining_header,
+        tusd_or_te=tusd_or_te
+    )
+
+    length = _get_length(
+        plans=plans,
         header=header,
         reference_tab=tusd_or_te.reference_tab
     )
 
-    main_sheet = _load_main_sheet(
-        workbook=workbook,
+    main_header, main_rows = _load_main_rows(
+        plans=plans,
         header=header,
+        column_names=column_names,
         length=length,
         tusd_or_te=tusd_or_te
     )
 
-    remaining_sheets = _get_remaining_sheets(
-        workbook=workbook,
+    remaining_rows = _get_remaining_rows(
+        plans=plans,
+        remaining_header=remaining_header,
+        remaining_columns=remaining_columns,
         length=length,
         tusd_or_te=tusd_or_te
     )
 
-    output_workbook = Workbook()
-    new_worksheet = output_workbook.active
-
-    for row in main_sheet.iter_rows(values_only=True):
-        new_worksheet.append(list(row))
+    return _side_by_side_rows(
+        left_rows=chain([main_header], main_rows),
+        right_rows=remaining_rows,
+        left_width=len(main_header)
+    )
 
-    num_cols_main_sheet = main_sheet.max_column
 
-    remaining_sheets_data = []
+def _side_by_side_rows(left_rows: Iterator[tuple], right_rows: Iterator[tuple], left_width: int) -> Iterator[tuple]:
+    empty_left_row = (None,) * left_width
 
-    for sheet in remaining_sheets:
-        for row in sheet.iter_rows(values_only=True):
-            remaining_sheets_data.append(list(row))
+    for left_row, right_row in zip_longest(left_rows, right_rows):
+        yield tuple(left_row or empty_left_row) + tuple(right_row or ())
 
-    for i, row_data in enumerate(remaining_sheets_data, start=1):
-        for j, value in enumerate(row_data, start=1):
-            new_worksheet.cell(row=i, column=num_cols_main_sheet + j, value=value)
 
-    return new_worksheet
+def get_uc_column_name(header: list[any], tab_name: str) -> any:
+    if "DETALHE" not in header or header.index("DETALHE") + 1 == len(header):
+        raise ValueError(f"Aba {tab_name} sem a coluna de UC após DETALHE: {header}")
 
+    return header[header.index("DETALHE") + 1]
 
-def _load_main_sheet(
-    workbook: Workbook, 
-    header: list[str], 
-    length: int, 
-    tusd_or_te: TusdOrTe
-) -> Worksheet:
-    tariff_type_info = _load_tariff_type_info(
-        length=length,
-        tariff_types=tusd_or_te.tariff_types
-    )
 
-    subgroup_info = _load_info_at(
-        workbook=workbook,
-        header=header,
-        tariff_types=tusd_or_te.tariff_types,
-        column_name="SUBGRUPO",
-        insert_new_row=True
-    )
+def resolve_column_names(column_names: list[str], header: list[any], tab_name: str) -> list[any]:
+    if UC_COLUMN in column_names:
+        uc_column_name = get_uc_column_name(header, tab_name)
+        column_names = [uc_column_name if column_name == UC_COLUMN else column_name for column_name in column_names]
 
-    modality_info = _load_info_at(
-        workbook=workbook,
-        header=header,
-        tariff_types=tusd_or_te.tariff_types,
-        column_name="MODALIDADE",
-        insert_new_row=True
-    )
+    missing_columns = [column_name for column_name in column_names if column_name not in header]
 
-    class_info = _load_info_at(
-        workbook=workbook,
-        header=header,
-        tariff_types=tusd_or_te.tariff_types,
-        column_name="CLASSE",
-        insert_new_row=True
-    )
+    if missing_columns:
+        raise ValueError(f"Aba {tab_name} sem as colunas {missing_columns}")
 
-    subclass_info = _load_info_at(
-        workbook=workbook,
-        header=header,
-        tariff_types=tusd_or_te.tariff_types,
-        column_name="SUBCLASSE",
-        insert_new_row=True
-    )
+    return column_names
 
-    detail_info = _load_info_at(
-        workbook=workbook,
-        header=header,
-        tariff_types=tusd_or_te.tariff_types,
-        column_name="DETALHE",
-        insert_new_row=True
-    )
 
+def _get_main_column_names(workbook: Workbook, tusd_or_te: TusdOrTe) -> list[any]:
     uc_column_name = workbook[tusd_or_te.main_tab]["F1"].value
 
-    uc_info = _load_info_at(
-        workbook=workbook,
-        header=header,
-        tariff_types=tusd_or_te.tariff_types,
-        column_name=uc_column_name,
-        insert_new_row=True
-    )
-
-    post_info = _load_info_at(
-        workbook=workbook,
-        header=header,
-        tariff_types=tusd_or_te.tariff_types,
-        column_name="POSTO",
-        insert_new_row=True
-    )
-
-    unity_info = _load_info_at(
-        workbook=workbook,
-        header=header,
-        tariff_types=tusd_or_te.tariff_types,
-        column_name="UNIDADE",
-        insert_new_row=True
-    )
-
-    output_workbook = Workbook()
-    new_worksheet = output_workbook.active
-
-    new_worksheet.append([
-        "TIPO DE TARIFA",
+    return [
         "SUBGRUPO",
         "MODALIDADE",
         "CLASSE",
@@ -175,12 +137,57 @@ def _load_main_sheet(
         uc_column_name,
         "POSTO",
         "UNIDADE"
-    ])
+    ]
 
-    for row in zip(tariff_type_info, subgroup_info, modality_info, class_info, subclass_info, detail_info, uc_info, post_info, unity_info):
-        new_worksheet.append(row)
 
-    return new_worksheet
+def _request_columns(
+    plans: SheetPlans, 
+    header: list[str], 
+    column_names: list[any], 
+    remaining_header: list[any], 
+    tusd_or_te: TusdOrTe
+) -> dict[str, int]:
+    plans[tusd_or_te.reference_tab].request(header.index("SUBGRUPO") + 1, start=5)
+
+    main_columns = [header.index(column_name) + 1 for column_name in column_names]
+    remaining_columns = {}
+
+    for tariff_type in tusd_or_te.tariff_types:
+        plan = plans[tariff_type]
+        plan.request_all(main_columns, start=5)
+
+        header_row = next(plan.worksheet.iter_rows(min_row=3, max_row=3, values_only=True))
+        first_column = list(header_row).index(remaining_header[0]) + 1
+
+        plan.request_all(range(first_column, first_column + len(remaining_header)), start=4)
+        remaining_columns[tariff_type] = first_column
+
+    return remaining_columns
+
+
+def _load_main_rows(
+    plans: SheetPlans, 
+    header: list[str], 
+    column_names: list[any], 
+    length: int, 
+    tusd_or_te: TusdOrTe
+) -> tuple[tuple, Iterator[tuple]]:
+    tariff_type_info = _load_tariff_type_info(
+        length=length,
+        tariff_types=tusd_or_te.tariff_types
+    )
+
+    info = _load_info_at(
+        plans=plans,
+        header=header,
+        tariff_types=tusd_or_te.tariff_types,
+        column_names=column_names,
+        insert_new_row=True
+    )
+
+    main_header = ("TIPO DE TARIFA", *column_names)
+
+    return main_header, zip(tariff_type_info, *info)
     
 
 def _load_tariff_type_info(length: int, tariff_types: list[str]) -> list[str]:
@@ -193,109 +200,66 @@ def _load_tariff_type_info(length: int, tariff_types: list[str]) -> list[str]:
     return all_info
 
 
-def _get_length(workbook: Workbook, header: list[str], reference_tab: str) -> int:
-    values = load_values(
-        from_worksheet=workbook[reference_tab],
-        index=header.index("SUBGRUPO"),
-        direction="column",
-        start=5
-    )
+def _get_length(plans: SheetPlans, header: list[str], reference_tab: str) -> int:
+    values = plans[reference_tab].values(header.index("SUBGRUPO") + 1, start=5)
 
     return len(values)
 
     
 def _load_info_at(
-    workbook: Workbook, 
+    plans: SheetPlans, 
     header: list[str], 
     tariff_types: list[str], 
-    column_name: str, 
+    column_names: list[any], 
     insert_new_row: bool = False
-) -> list[any]:
-    all_info = [""] if insert_new_row else []
+) -> list[list[any]]:
+    all_info = [[""] if insert_new_row else [] for _ in column_names]
 
     for tariff_type in tariff_types:
-        worksheet = workbook[tariff_type]
-
-        info = load_values(
-            from_worksheet=worksheet,
-            index=header.index(column_name),
-            direction="column",
-            start=5
-        )
+        plan = plans[tariff_type]
 
-        all_info += info
+        for info, column_name in zip(all_info, column_names):
+            info += plan.values(header.index(column_name) + 1, start=5)
 
     return all_info
 
 
-def _get_remaining_sheets(workbook: Workbook, length: int, tusd_or_te: TusdOrTe) -> list[Worksheet]:
-    sheets = []
-
+def _get_remaining_rows(
+    plans: SheetPlans, 
+    remaining_header: list[any], 
+    remaining_columns: dict[str, int], 
+    length: int, 
+    tusd_or_te: TusdOrTe
+) -> Iterator[tuple]:
     for index, tariff_type in enumerate(tusd_or_te.tariff_types):
-        tab_sheet = _get_sheet_from_tab(
-            workbook=workbook,
-            reference_tab=tusd_or_te.reference_tab,
-            tab_name=tariff_type,
+        yield from _get_rows_from_tab(
+            plan=plans[tariff_type],
+            remaining_header=remaining_header,
+            first_column=remaining_columns[tariff_type],
             length=length,
             first_tab= index == 0
         )
 
-        sheets.append(tab_sheet)
 
-    return sheets
-
-
-def _get_sheet_from_tab(
-    workbook: Workbook, 
-    reference_tab: str, 
-    tab_name: str, 
+def _get_rows_from_tab(
+    plan: SheetPlan, 
+    remaining_header: list[any], 
+    first_column: int, 
     length: int, 
     first_tab: bool
-) -> Worksheet:
-    remaining_header = _get_remaining_header(
-        workbook=workbook,
-        reference_tab=reference_tab
-    )
-
-    output_workbook = Workbook()
-    new_worksheet = output_workbook.active
-
-    for col_index, title in enumerate(remaining_header, start=1):
-        new_worksheet.cell(row=1, column=col_index, value=title)
-
-    worksheet = workbook[tab_name]
-    header_row = next(worksheet.iter_rows(min_row=3, max_row=3, values_only=True))
-    header = list(header_row)
-    column_index = header.index(remaining_header[0])
-    all_values = []
-
-    for column_name in remaining_header:
-        if isinstance(column_name, str):
-            values = load_values(
-                from_worksheet=worksheet,
-                index=column_index,
-                direction="column",
-                start=4
-            )
+) -> Iterator[tuple]:
+    all_values = [
+        plan.values(first_column + offset, start=4)[:length+1]
+        for offset, column_name in enumerate(remaining_header)
+        if isinstance(column_name, str)
+    ]
 
-            values = values[:length+1]
-            all_values.append(values)
+    rows = zip(*all_values)
 
-        column_index += 1
+    if first_tab:
+        return chain([tuple(remaining_header)], rows)
 
-    for row_index, row_values in enumerate(zip(*all_values), start=2):
-        for col_index, value in enumerate(row_values, start=1):
-            new_worksheet.cell(row=row_index, column=col_index, value=value)
-
-    if not first_tab:
-        data = list(new_worksheet.iter_rows(min_row=3, values_only=True))
-        new_worksheet.delete_rows(1, new_worksheet.max_row)
-
-        for row_index, row in enumerate(data, start=1):
-            for col_index, value in enumerate(row, start=1):
-                new_worksheet.cell(row=row_index, column=col_index, value=value)
-
-    return new_worksheet
+    return islice(rows, 1, None)
     
 
 def _get_remaining_header(workbook: Workbook, reference_tab: str) -> list[any]:
@@ -0,0 +1,268 @@
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Optional
+import os
+import pickle
+from .db_reader import load_db_workbook, load_processes, get_db_tab_names, get_db_header, iter_db_rows
+from .db_reader import DISTRIBUTOR_HEADER, PROCESS_KEY_COLUMN, SIGLA_INDEX, PROCESS_INDEX, DATE_INDEX
+
+
+INDEX_VERSION = 2
+
+INDEXED_TABS = {
+    "TUSD": ("SUBGRUPO", "MODALIDADE", "POSTO"),
+    "TE": ("SUBGRUPO", "MODALIDADE", "POSTO"),
+    "TABELAS REH": ("SUBGRUPO", "MODALIDADE", "Posto Tarifário")
+}
+
+PROCESS_PRECEDENCE = {
+    "Tarifas Iniciais": 0,
+    "Revisão": 1,
+    "Reajuste": 2,
+    "Revisão Extraordinária": 3,
+    "Ajuste EER ANGRA III": 4,
+    "Liminar abrace": 5
+}
+
+
+class TariffIndex:
+    def __init__(self, headers: dict[str, list[any]], intervals: dict[tuple, tuple[list[datetime], list[Optional[dict[str, any]]]]]):
+        self.headers = headers
+        self.intervals = intervals
+        self.posts: dict[tuple, list[any]] = {}
+
+        for key in intervals:
+            self.posts.setdefault(key[:-1], []).append(key[-1])
+
+    def lookup(
+        self,
+        sigla: str,
+        subgroup: any,
+        modality: any,
+        post: any,
+        on: date,
+        tabs: Optional[list[str]] = None
+    ) -> list[dict[str, any]]:
+        on = _as_datetime(on)
+        results = []
+
+        for key in self._get_keys(sigla, subgroup, modality, post, tabs):
+            starts, entries = self.intervals[key]
+            position = bisect_right(starts, on) - 1
+
+            if position >= 0 and entries[position] is not None:
+                results.append(self._result(key, starts, entries, position))
+
+        return results
+
+    def lookup_range(
+        self,
+        sigla: str,
+        subgroup: any,
+        modality: any,
+        post: any,
+        start: date,
+        end: date,
+        tabs: Optional[list[str]] = None
+    ) -> list[dict[str, any]]:
+        start, end = _as_datetime(start), _as_datetime(end)
+        results = []
+
+        for key in self._get_keys(sigla, subgroup, modality, post, tabs):
+            starts, entries = self.intervals[key]
+            first = max(bisect_right(starts, start) - 1, 0)
+            last = bisect_right(starts, end)
+
+            for position in range(first, last):
+                if entries[position] is not None:
+                    results.append(self._result(key, starts, entries, position))
+
+        return results
+
+    def _get_keys(self, sigla: str, subgroup: any, modality: any, post: any, tabs: Optional[list[str]]) -> list[tuple]:
+        keys = []
+
+        for tab_name in tabs or list(INDEXED_TABS):
+            posts = self.posts.get((tab_name, sigla, subgroup, modality), []) if post is None else [post]
+
+            for key_post in posts:
+                key = (tab_name, sigla, subgroup, modality, key_post)
+
+                if key in self.intervals:
+                    keys.append(key)
+
+        return keys
+
+    def _result(self, key: tuple, starts: list[datetime], entries: list[Optional[dict[str, any]]], position: int) -> dict[str, any]:
+        tab_name = key[0]
+        entry = entries[position]
+        header = self.headers[tab_name]
+
+        return {
+            "tab": tab_name,
+            "post": key[-1],
+            "process": entry["process"],
+            "valid_from": starts[position],
+            "valid_until": starts[position + 1] if position + 1 < len(starts) else None,
+            "rows": [dict(zip(header, row)) for row in entry["rows"]]
+        }
+
+
+def get_default_db_path() -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    return os.path.join(base_path, "Banco de Dados", "BANCO_Geral.xlsx")
+
+
+def get_default_index_path() -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    return os.path.join(base_path, ".cache", "indice_tarifas.pkl")
+
+
+def load_tariff_index(
+    db_path: Optional[str] = None,
+    index_path: Optional[str] = None,
+    rebuild: bool = False
+) -> TariffIndex:
+    db_path = db_path or get_default_db_path()
+    index_path = index_path or get_default_index_path()
+
+    if not os.path.exists(db_path):
+        raise ValueError(f"Banco de dados não encontrado: {db_path}")
+
+    stamp = _get_stamp(db_path)
+
+    if not rebuild:
+        index = _read_index(index_path, stamp)
+
+        if index is not None:
+            return index
+
+    index = build_tariff_index(db_path)
+    _write_index(index_path, stamp, index)
+
+    return index
+
+
+def build_tariff_index(db_path: str) -> TariffIndex:
+    workbook = load_db_workbook(db_path)
+
+    try:
+        processes = load_processes(workbook)
+        headers = {}
+        entries_by_key = {}
+        processes_by_distributor = {}
+
+        for tab_name in get_db_tab_names(workbook):
+            if tab_name not in INDEXED_TABS:
+                continue
+
+            header = get_db_header(workbook, tab_name)
+            is_star = processes is not None and header[:1] == [PROCESS_KEY_COLUMN]
+            values_start = 1 if is_star else len(DISTRIBUTOR_HEADER)
+
+            headers[tab_name] = header[values_start:]
+            key_indexes = [header.index(column_name) - values_start for column_name in INDEXED_TABS[tab_name]]
+
+            for row in iter_db_rows(workbook, tab_name):
+                distributor_values = processes.get(row[0]) if is_star else row[:values_start]
+
+                if not distributor_values or not distributor_values[SIGLA_INDEX]:
+                    continue
+
+                process_date = distributor_values[DATE_INDEX]
+
+                if not isinstance(process_date, datetime):
+                    continue
+
+                values = row[values_start:]
+                key = (tab_name, distributor_values[SIGLA_INDEX]) + tuple(
+                    values[index] if index < len(values) else None for index in key_indexes
+                )
+                process = distributor_values[PROCESS_INDEX]
+
+                processes_by_distributor.setdefault(key[:2], set()).add((process_date, process))
+                entry = entries_by_key.setdefault(key, {}).setdefault((process_date, process), [])
+                entry.append(tuple(values))
+    finally:
+        workbook.close()
+
+    intervals = {
+        key: _get_intervals(entries, processes_by_distributor[key[:2]])
+        for key, entries in entries_by_key.items()
+    }
+
+    return TariffIndex(headers=headers, intervals=intervals)
+
+
+def _get_intervals(
+    entries: dict[tuple, list[tuple]], 
+    distributor_processes: set[tuple]
+) -> tuple[list[datetime], list[Optional[dict[str, any]]]]:
+    ordered_processes = sorted(distributor_processes, key=lambda item: (item[0], PROCESS_PRECEDENCE.get(item[1], -1)))
+
+    starts = []
+    interval_entries = []
+
+    for process_date, process in ordered_processes:
+        rows = entries.get((process_date, process))
+        entry = {"process": process, "rows": rows} if rows is not None else None
+
+        if starts and starts[-1] == process_date:
+            if entry is not None or interval_entries[-1] is None:
+                interval_entries[-1] = entry
+
+            continue
+
+        if entry is None and (not interval_entries or interval_entries[-1] is None):
+            continue
+
+        starts.append(process_date)
+        interval_entries.append(entry)
+
+    return starts, interval_entries
+
+
+def _as_datetime(value: date) -> datetime:
+    if isinstance(value, datetime):
+        return value
+
+    return datetime(value.year, value.month, value.day)
+
+
+def _get_stamp(db_path: str) -> tuple:
+    db_stat = os.stat(db_path)
+    return (INDEX_VERSION, os.path.abspath(db_path), db_stat.st_size, db_stat.st_mtime)
+
+
+def _read_index(index_path: str, stamp: tuple) -> Optional[TariffIndex]:
+    if not os.path.exists(index_path):
+        return None
+
+    try:
+        with open(index_path, "rb") as file:
+            entry = pickle.load(file)
+    except Exception:
+        return None
+
+    if entry.get("stamp") != stamp:
+        return None
+
+    return TariffIndex(headers=entry["headers"], intervals=entry["intervals"])
+
+
+def _write_index(index_path: str, stamp: tuple, index: TariffIndex):
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "wb") as file:
+        pickle.dump(
+            {"stamp": stamp, "headers": index.headers, "intervals": index.intervals},
+            file,
+            protocol=pickle.HIGHEST_PROTOCOL
+        )
+
+    os.replace(temp_path, index_path)
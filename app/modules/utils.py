@@ -1,11 +1,15 @@
 from pathlib import Path
 from openpyxl import Workbook
 from openpyxl.worksheet.worksheet import Worksheet
-from typing import Literal
+from typing import Literal, Optional
+from weakref import WeakKeyDictionary
 import unicodedata
-from openpyxl.utils import column_index_from_string
+import hashlib
+import re
+from openpyxl.utils import column_index_from_string, get_column_letter
 from openpyxl.utils.cell import coordinate_from_string
 from datetime import datetime
+from .metrics import get_metrics
 
 
 def get_suffix(file_name: str) -> str:
@@ -21,53 +25,254 @@ def load_values(
 ) -> list[any]:
     worksheet = from_worksheet
 
-    propagated_values = _propagate_merged_values(
+    if direction == "column":
+        return read_range(
+            from_worksheet=worksheet,
+            min_row=start,
+            min_col=index + 1,
+            max_col=index + 1,
+            direction="column"
+        )[0]
+
+    return read_range(
         from_worksheet=worksheet,
-        index=index + 1,
-        direction=direction,
-        start=start
-    )
+        min_row=index + 1,
+        max_row=index + 1,
+        min_col=start,
+        direction="row"
+    )[0]
 
-    return _remove_empty_values(propagated_values)
 
+INFLATED_RANGE_MIN_ROWS = 1000
 
-def _propagate_merged_values(
-    from_worksheet: Worksheet, 
-    index: int, 
-    direction: Literal["row", "column"], 
-    start: int
-) -> list[str | None]:
+
+def read_range(
+    from_worksheet: Worksheet,
+    min_row: int,
+    min_col: int,
+    max_row: Optional[int] = None,
+    max_col: Optional[int] = None,
+    direction: Literal["row", "column"] = "column",
+    trim: bool = True
+) -> list[list[any]]:
     worksheet = from_worksheet
-    merged_ranges = worksheet.merged_cells.ranges
-    end = worksheet.max_column + 1 if direction == "row" else worksheet.max_row + 1
-    values = []
-
-    for row_or_column_index in range(start, end):
-        cell = worksheet.cell(
-            row=index if direction == "row" else row_or_column_index, 
-            column=row_or_column_index if direction == "row" else index
+    max_row = worksheet.max_row if max_row is None else max_row
+    max_col = worksheet.max_column if max_col is None else max_col
+    line_count = (max_col - min_col if direction == "column" else max_row - min_row) + 1
+
+    if max_row < min_row or max_col < min_col:
+        return [[] for _ in range(max(line_count, 0))]
+
+    scan_max_row, scan_max_col = max_row, max_col
+    bounds = _get_data_bounds(worksheet) if trim else None
+
+    if bounds is not None:
+        scan_max_row = min(max_row, max(
+            bounds.last_row(min_col=min_col, max_col=max_col),
+            _get_merged_last_row(worksheet, min_col=min_col, max_col=max_col)
+        ))
+
+        scan_max_col = min(max_col, max(
+            bounds.last_column(min_row=min_row, max_row=max_row),
+            _get_merged_last_column(worksheet, min_row=min_row, max_row=max_row)
+        ))
+
+    rows = []
+
+    if scan_max_row >= min_row and scan_max_col >= min_col:
+        rows = list(_iter_row_values(
+            worksheet=worksheet,
+            min_row=min_row,
+            max_row=scan_max_row,
+            min_col=min_col,
+            max_col=scan_max_col
+        ))
+
+        _fill_merged_values(
+            worksheet=worksheet,
+            rows=rows,
+            min_row=min_row,
+            max_row=min_row + len(rows) - 1,
+            min_col=min_col,
+            max_col=scan_max_col
         )
 
-        value = cell.value
+    values = rows if direction == "row" else [list(column) for column in zip(*rows)]
 
-        if value is not None:
-            values.append(value)
-        else:
-            for merged_range in merged_ranges:
-                if cell.coordinate in merged_range:
-                    top_left = worksheet.cell(
-                        row=merged_range.min_row,
-                        column=merged_range.min_col
-                    )
+    if not trim:
+        width = max_col - min_col + 1 if direction == "row" else max_row - min_row + 1
+        values = [line + [None] * (width - len(line)) for line in values]
+        values += [[None] * width for _ in range(line_count - len(values))]
+        return values
 
-                    values.append(top_left.value)
-                    break
-            else:
-                values.append(None)
+    values = [_remove_empty_values(line) for line in values]
+    values += [[] for _ in range(line_count - len(values))]
 
     return values
 
 
+def _iter_row_values(worksheet: Worksheet, min_row: int, max_row: int, min_col: int, max_col: int):
+    if not hasattr(worksheet, "_cells"):
+        for row in worksheet.iter_rows(
+            min_row=min_row, 
+            max_row=max_row, 
+            min_col=min_col, 
+            max_col=max_col, 
+            values_only=True
+        ):
+            yield list(row)
+
+        return
+
+    cells = worksheet._cells
+    columns = range(min_col, max_col + 1)
+
+    for row_index in range(min_row, max_row + 1):
+        row = []
+
+        for column_index in columns:
+            cell = cells.get((row_index, column_index))
+            row.append(None if cell is None else cell.value)
+
+        yield row
+
+
+def get_cell_value(worksheet: Worksheet, row: int, column: int) -> any:
+    if not hasattr(worksheet, "_cells"):
+        return worksheet.cell(row=row, column=column).value
+
+    cell = worksheet._cells.get((row, column))
+    return None if cell is None else cell.value
+
+
+class DataBounds:
+    def __init__(self, worksheet: Worksheet):
+        self.last_rows: dict[int, int] = {}
+        self.last_columns: dict[int, int] = {}
+
+        for (row_index, column_index), cell in worksheet._cells.items():
+            if cell.value is None:
+                continue
+
+            if self.last_rows.get(column_index, 0) < row_index:
+                self.last_rows[column_index] = row_index
+
+            if self.last_columns.get(row_index, 0) < column_index:
+                self.last_columns[row_index] = column_index
+
+        self.stamp = _get_bounds_stamp(worksheet)
+        self.max_row = max(self.last_rows.values(), default=0)
+
+    def last_row(self, min_col: int, max_col: Optional[int] = None) -> int:
+        return _get_last_index(self.last_rows, first=min_col, last=max_col)
+
+    def last_column(self, min_row: int, max_row: Optional[int] = None) -> int:
+        return _get_last_index(self.last_columns, first=min_row, last=max_row)
+
+
+_bounds_by_worksheet = WeakKeyDictionary()
+
+
+def _get_bounds_stamp(worksheet: Worksheet) -> tuple[int, int, int]:
+    return (len(worksheet._cells), worksheet.max_row, worksheet.max_column)
+
+
+def _get_data_bounds(worksheet: Worksheet) -> Optional[DataBounds]:
+    if not hasattr(worksheet, "_cells"):
+        return None
+
+    bounds = _bounds_by_worksheet.get(worksheet)
+
+    if bounds is not None and bounds.stamp == _get_bounds_stamp(worksheet):
+        return bounds
+
+    bounds = DataBounds(worksheet)
+    _bounds_by_worksheet[worksheet] = bounds
+
+    _record_inflated_range(
+        worksheet=worksheet,
+        data_max_row=bounds.max_row
+    )
+
+    return bounds
+
+
+def _get_last_index(last_indexes: dict[int, int], first: int, last: Optional[int]) -> int:
+    if last is None or last - first + 1 > len(last_indexes):
+        return max(
+            (value for index, value in last_indexes.items() if index >= first and (last is None or index <= last)),
+            default=0
+        )
+
+    return max((last_indexes.get(index, 0) for index in range(first, last + 1)), default=0)
+
+
+def _get_merged_last_row(worksheet: Worksheet, min_col: int, max_col: Optional[int]) -> int:
+    last_row = 0
+
+    for merged_range in worksheet.merged_cells.ranges:
+        if merged_range.max_col < min_col or (max_col is not None and merged_range.min_col > max_col):
+            continue
+
+        last_row = max(last_row, merged_range.max_row)
+
+    return last_row
+
+
+def _get_merged_last_column(worksheet: Worksheet, min_row: int, max_row: Optional[int]) -> int:
+    last_column = 0
+
+    for merged_range in worksheet.merged_cells.ranges:
+        if merged_range.max_row < min_row or (max_row is not None and merged_range.min_row > max_row):
+            continue
+
+        last_column = max(last_column, merged_range.max_col)
+
+    return last_column
+
+
+def _record_inflated_range(worksheet: Worksheet, data_max_row: int):
+    extra_rows = worksheet.max_row - data_max_row
+
+    if extra_rows < INFLATED_RANGE_MIN_ROWS:
+        return
+
+    metrics = get_metrics()
+    metrics.inc("inflated_sheets_total", tab=worksheet.title)
+    metrics.set_max("inflated_rows_max", extra_rows, tab=worksheet.title)
+
+
+def _fill_merged_values(
+    worksheet: Worksheet, 
+    rows: list[list[any]], 
+    min_row: int, 
+    max_row: int, 
+    min_col: int, 
+    max_col: int
+):
+    for merged_range in worksheet.merged_cells.ranges:
+        first_row = max(merged_range.min_row, min_row)
+        last_row = min(merged_range.max_row, max_row)
+        first_col = max(merged_range.min_col, min_col)
+        last_col = min(merged_range.max_col, max_col)
+
+        if first_row > last_row or first_col > last_col:
+            continue
+
+        top_left_value = get_cell_value(
+            worksheet=worksheet,
+            row=merged_range.min_row,
+            column=merged_range.min_col
+        )
+
+        for row_index in range(first_row, last_row + 1):
+            row = rows[row_index - min_row]
+
+            for column_index in range(first_col - min_col, last_col - min_col + 1):
+                if row[column_index] is None:
+                    row[column_index] = top_left_value
+
+
 def _remove_empty_values(values: list[any]) -> list[any]:
     for i in range(len(values) - 1, -1, -1):
         if values[i] is not None:
@@ -76,6 +281,20 @@ def _remove_empty_values(values: list[any]) -> list[any]:
     return []
 
 
+def get_file_hash(file_path: str) -> str:
+    file_hash = hashlib.sha256()
+
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()
+
+
+def get_base_tab_name(sheet_title: str) -> str:
+    return re.sub(r" - Ext \d+$", "", sheet_title)
+
+
 def normalize(text: str) -> str:
     if not isinstance(text, str):
         return ""
@@ -108,6 +327,20 @@ def get_rows_and_columns_from(value: any, worksheet: Worksheet) -> list[tuple[in
     return rows_and_columns
 
 
+def get_rows_and_columns_of(values: list[any], worksheet: Worksheet) -> dict[any, list[tuple[int, int]]]:
+    coordinates = {value: [] for value in values}
+
+    for row_index, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
+        for column_index, cell_value in enumerate(row, start=1):
+            if cell_value in coordinates:
+                coordinates[cell_value].append((row_index, column_index))
+
+    return {
+        value: sorted(rows_and_columns, key=lambda rc: (get_column_letter(rc[1]), rc[0]))
+        for value, rows_and_columns in coordinates.items()
+    }
+
+
 def _sorting_key(coordinate: str):
     letter = ''.join(filter(str.isalpha, coordinate))
     number = int(''.join(filter(str.isdigit, coordinate)))
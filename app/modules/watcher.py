@@ -0,0 +1,268 @@
+from typing import Literal, Optional
+import json
+import os
+import time
+import traceback
+from .data_base import process_new_workbooks, OutputMode, TARIFF_PROCESSES
+from .stages import validate_tabs
+from .utils import get_suffix
+
+
+RETRY_BASE_SECONDS = 60.0
+
+RETRY_MAX_SECONDS = 3600.0
+
+
+class WorkbookWatcher:
+    def __init__(self, distributors_path: str, catalog_path: str, settle_seconds: float = 10.0):
+        self.distributors_path = distributors_path
+        self.catalog_path = catalog_path
+        self.settle_seconds = settle_seconds
+        self.files: dict[str, list[float]] = {}
+        self.directories: dict[str, float] = {}
+        self.pending: dict[str, dict[str, any]] = {}
+
+    def load_catalog(self) -> bool:
+        if not os.path.exists(self.catalog_path):
+            return False
+
+        try:
+            with open(self.catalog_path, "r", encoding="utf-8") as file:
+                catalog = json.load(file)
+        except (OSError, ValueError):
+            return False
+
+        self.files = catalog.get("files", {})
+        return True
+
+    def save_catalog(self):
+        os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
+        temp_path = f"{self.catalog_path}.tmp"
+
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump({"files": self.files}, file, ensure_ascii=False, indent=1)
+
+        os.replace(temp_path, self.catalog_path)
+
+    def seed_catalog(self):
+        for file_path, file_stat in self._scan(full=True).items():
+            self.files[file_path] = file_stat
+
+        self.save_catalog()
+
+    def poll(self, full: bool = False) -> list[str]:
+        now = time.time()
+
+        for file_path, file_stat in self._scan(full=full).items():
+            if self.files.get(file_path) == file_stat:
+                continue
+
+            if file_path not in self.pending:
+                self.pending[file_path] = {"stat": file_stat, "since": now}
+
+        ready_paths = []
+
+        for file_path, entry in list(self.pending.items()):
+            file_stat = _get_file_stat(file_path)
+
+            if file_stat is None:
+                del self.pending[file_path]
+                continue
+
+            if file_stat != entry["stat"]:
+                self.pending[file_path] = {"stat": file_stat, "since": now}
+                continue
+
+            if now - entry["since"] < self.settle_seconds or now < entry.get("retry_at", 0) or _is_locked(file_path):
+                continue
+
+            ready_paths.append(file_path)
+
+        return sorted(ready_paths)
+
+    def mark_done(self, file_paths: list[str]):
+        for file_path in file_paths:
+            entry = self.pending.pop(file_path, None)
+
+            if entry is not None:
+                self.files[file_path] = entry["stat"]
+
+        self.save_catalog()
+
+    def mark_failed(self, file_paths: list[str]) -> float:
+        now = time.time()
+        retry_seconds = 0.0
+
+        for file_path in file_paths:
+            entry = self.pending.get(file_path)
+
+            if entry is None:
+                continue
+
+            entry["failures"] = entry.get("failures", 0) + 1
+            retry_seconds = max(retry_seconds, min(RETRY_BASE_SECONDS * 2 ** (entry["failures"] - 1), RETRY_MAX_SECONDS))
+            entry["retry_at"] = now + retry_seconds
+
+        return retry_seconds
+
+    def record_files(self, file_paths: list[str]):
+        for file_path in file_paths:
+            file_stat = _get_file_stat(file_path)
+            self.pending.pop(file_path, None)
+
+            if file_stat is not None:
+                self.files[file_path] = file_stat
+
+        self.save_catalog()
+
+    def _scan(self, full: bool) -> dict[str, list[float]]:
+        file_stats = {}
+        unchanged_directories = set()
+
+        for directory_path in self._get_process_directories():
+            directory_mtime = os.stat(directory_path).st_mtime
+
+            if not full and self.directories.get(directory_path) == directory_mtime:
+                unchanged_directories.add(directory_path)
+                continue
+
+            self.directories[directory_path] = directory_mtime
+
+            for file_name in os.listdir(directory_path):
+                if not _is_input_file(file_name):
+                    continue
+
+                file_path = os.path.join(directory_path, file_name)
+                file_stat = _get_file_stat(file_path)
+
+                if file_stat is not None:
+                    file_stats[file_path] = file_stat
+
+        for file_path in self.files:
+            if os.path.dirname(file_path) not in unchanged_directories:
+                continue
+
+            file_stat = _get_file_stat(file_path)
+
+            if file_stat is not None:
+                file_stats[file_path] = file_stat
+
+        return file_stats
+
+    def _get_process_directories(self) -> list[str]:
+        directories = []
+
+        for distributor in sorted(os.listdir(self.distributors_path)):
+            distributor_path = os.path.join(self.distributors_path, distributor)
+
+            if not os.path.isdir(distributor_path):
+                continue
+
+            for tariff_process in TARIFF_PROCESSES:
+                directory_path = os.path.join(distributor_path, tariff_process)
+
+                if os.path.isdir(directory_path):
+                    directories.append(directory_path)
+
+        return directories
+
+
+def watch_workbooks(
+    agent: Literal["Concessionária", "Permissionária"],
+    interval: float = 30.0,
+    settle_seconds: float = 10.0,
+    tabs: Optional[list[str]] = None,
+    workers: int = 1,
+    output_mode: OutputMode = "denormalized",
+    use_cache: bool = True,
+    process_existing: bool = False,
+    sorted_output: bool = False,
+    update_aggregates: bool = False,
+    base_path: Optional[str] = None
+):
+    tabs = validate_tabs(tabs)
+
+    if base_path is None:
+        base_path = os.path.join(os.path.dirname(__file__), "../../")
+        base_path = os.path.abspath(base_path)
+
+    watcher = WorkbookWatcher(
+        distributors_path=os.path.join(base_path, f"{agent}s"),
+        catalog_path=os.path.join(base_path, ".cache", f"catalogo_{agent}.json"),
+        settle_seconds=settle_seconds
+    )
+
+    if not watcher.load_catalog() and not process_existing:
+        watcher.seed_catalog()
+
+    print(f"Monitorando planilhas de {agent}s a cada {interval:g}s (Ctrl+C para encerrar)...")
+
+    full = True
+
+    try:
+        while True:
+            ready_paths = watcher.poll(full=full)
+            full = False
+
+            if ready_paths:
+                print(f"\n{len(ready_paths)} planilha(s) nova(s) ou alterada(s) encontrada(s).")
+                failed_paths = []
+
+                try:
+                    process_new_workbooks(
+                        agent=agent,
+                        file_paths=ready_paths,
+                        tabs=tabs,
+                        workers=workers,
+                        output_mode=output_mode,
+                        use_cache=use_cache,
+                        sorted_output=sorted_output,
+                        update_aggregates=update_aggregates,
+                        on_file_failed=failed_paths.append
+                    )
+                except Exception as error:
+                    retry_seconds = watcher.mark_failed(ready_paths)
+                    traceback.print_exc()
+                    print(
+                        f"\nErro ao processar {len(ready_paths)} planilha(s): {type(error).__name__}: {error}"
+                        f"\nNova tentativa em {retry_seconds:g}s ou quando os arquivos mudarem."
+                    )
+                else:
+                    watcher.mark_done([file_path for file_path in ready_paths if file_path not in failed_paths])
+
+                    if failed_paths:
+                        retry_seconds = watcher.mark_failed(failed_paths)
+                        print(f"\n{len(failed_paths)} planilha(s) falharam. Nova tentativa em {retry_seconds:g}s ou quando os arquivos mudarem.")
+
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\nMonitoramento encerrado.")
+
+
+def _is_input_file(file_name: str) -> bool:
+    if file_name.startswith("~$"):
+        return False
+
+    suffix = get_suffix(file_name)
+
+    if suffix not in [".xlsx", ".xlsm"]:
+        return False
+
+    return not file_name.replace(suffix, "").endswith("_temp")
+
+
+def _is_locked(file_path: str) -> bool:
+    directory_path, file_name = os.path.split(file_path)
+
+    lock_names = [f"~${file_name}", f"~${file_name[2:]}"]
+
+    return any(os.path.exists(os.path.join(directory_path, lock_name)) for lock_name in lock_names)
+
+
+def _get_file_stat(file_path: str) -> Optional[list[float]]:
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return None
+
+    return [file_stat.st_size, file_stat.st_mtime]
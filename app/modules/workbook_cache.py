@@ -0,0 +1,237 @@
+from collections import OrderedDict
+from openpyxl import load_workbook, Workbook, __version__ as openpyxl_version
+from typing import Optional
+import os
+import pickle
+from .stages import SOURCE_TABS
+from .utils import get_file_hash
+
+
+CACHE_VERSION = 2
+
+DEFAULT_MAX_CACHE_BYTES = 2 * 1024 ** 3
+
+_memory_entries: OrderedDict[str, bytes] = OrderedDict()
+
+_memory_hashes: dict[tuple, str] = {}
+
+_memory_max_entries = 0
+
+
+def get_default_cache_dir() -> str:
+    base_path = os.path.join(os.path.dirname(__file__), "../../")
+    base_path = os.path.abspath(base_path)
+
+    return os.path.join(base_path, ".cache", "planilhas")
+
+
+def load_cached_workbook(
+    file_path: str, 
+    cache_dir: Optional[str] = None, 
+    max_cache_bytes: int = DEFAULT_MAX_CACHE_BYTES
+) -> Workbook:
+    cache_dir = cache_dir or get_default_cache_dir()
+    file_hash = _get_file_hash(file_path)
+    cache_path = os.path.join(cache_dir, f"{file_hash}.pkl")
+
+    workbook_data = _memory_entries.get(file_hash)
+
+    if workbook_data is not None:
+        _memory_entries.move_to_end(file_hash)
+        return pickle.loads(workbook_data)
+
+    workbook_data = _read_cache_entry(cache_path)
+
+    if workbook_data is not None:
+        _touch(cache_path)
+        _remember(file_hash, workbook_data)
+        return pickle.loads(workbook_data)
+
+    workbook = load_workbook(file_path, data_only=True)
+    workbook_data = pickle.dumps(_build_workbook(_extract_sheets(workbook)), protocol=pickle.HIGHEST_PROTOCOL)
+
+    _write_cache_entry(cache_path, workbook_data)
+    _evict_entries(cache_dir, max_cache_bytes)
+    _remember(file_hash, workbook_data)
+
+    return workbook
+
+
+def set_memory_cache_size(max_entries: int):
+    global _memory_max_entries
+
+    _memory_max_entries = max_entries
+
+    while len(_memory_entries) > _memory_max_entries:
+        _forget_oldest()
+
+    if not _memory_max_entries:
+        _memory_hashes.clear()
+
+
+def get_memory_cache_info() -> dict[str, int]:
+    return {"entries": len(_memory_entries), "max_entries": _memory_max_entries, "hashes": len(_memory_hashes)}
+
+
+def _get_file_hash(file_path: str) -> str:
+    if not _memory_max_entries:
+        return get_file_hash(file_path)
+
+    file_stat = os.stat(file_path)
+    stamp = (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns)
+
+    if stamp not in _memory_hashes:
+        _memory_hashes[stamp] = get_file_hash(file_path)
+
+    return _memory_hashes[stamp]
+
+
+def _remember(file_hash: str, workbook_data: bytes):
+    if not _memory_max_entries:
+        return
+
+    _memory_entries[file_hash] = workbook_data
+    _memory_entries.move_to_end(file_hash)
+
+    while len(_memory_entries) > _memory_max_entries:
+        _forget_oldest()
+
+
+def _forget_oldest():
+    file_hash, _ = _memory_entries.popitem(last=False)
+
+    for stamp in [stamp for stamp, stamp_hash in _memory_hashes.items() if stamp_hash == file_hash]:
+        del _memory_hashes[stamp]
+
+
+def clear_workbook_cache(cache_dir: Optional[str] = None) -> int:
+    cache_dir = cache_dir or get_default_cache_dir()
+    _memory_entries.clear()
+    _memory_hashes.clear()
+
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    removed = 0
+
+    for name in os.listdir(cache_dir):
+        if name.endswith(".pkl") or name.endswith(".tmp"):
+            _remove(os.path.join(cache_dir, name))
+            removed += 1
+
+    return removed
+
+
+def _extract_sheets(workbook: Workbook) -> dict[str, dict[str, list]]:
+    sheets = {}
+
+    for sheet_name in workbook.sheetnames:
+        if sheet_name not in SOURCE_TABS:
+            continue
+
+        worksheet = workbook[sheet_name]
+
+        cells = []
+
+        for row_index, row in enumerate(worksheet.iter_rows(values_only=True), start=1):
+            for column_index, value in enumerate(row, start=1):
+                if value is not None:
+                    cells.append((row_index, column_index, value))
+
+        sheets[sheet_name] = {
+            "cells": cells,
+            "max_row": worksheet.max_row,
+            "max_column": worksheet.max_column,
+            "merged": [str(merged_range) for merged_range in worksheet.merged_cells.ranges]
+        }
+
+    return sheets
+
+
+def _build_workbook(sheets: dict[str, dict[str, list]]) -> Workbook:
+    workbook = Workbook()
+    default_sheet = workbook.active
+    workbook.remove(default_sheet)
+
+    for sheet_name, sheet in sheets.items():
+        worksheet = workbook.create_sheet(title=sheet_name)
+
+        for row_index, column_index, value in sheet["cells"]:
+            worksheet.cell(row=row_index, column=column_index, value=value)
+
+        worksheet.cell(row=sheet["max_row"], column=sheet["max_column"])
+
+        for merged_range in sheet["merged"]:
+            worksheet.merge_cells(merged_range)
+
+    return workbook
+
+
+def _read_cache_entry(cache_path: str) -> Optional[bytes]:
+    if not os.path.exists(cache_path):
+        return None
+
+    try:
+        with open(cache_path, "rb") as file:
+            entry = pickle.load(file)
+    except Exception:
+        _remove(cache_path)
+        return None
+
+    if entry.get("version") != CACHE_VERSION or entry.get("openpyxl") != openpyxl_version:
+        _remove(cache_path)
+        return None
+
+    return entry["workbook"]
+
+
+def _write_cache_entry(cache_path: str, workbook_data: bytes):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+
+    with open(temp_path, "wb") as file:
+        pickle.dump({"version": CACHE_VERSION, "openpyxl": openpyxl_version, "workbook": workbook_data}, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temp_path, cache_path)
+
+
+def _evict_entries(cache_dir: str, max_cache_bytes: int):
+    entries = []
+    total_bytes = 0
+
+    for name in os.listdir(cache_dir):
+        if not name.endswith(".pkl"):
+            continue
+
+        path = os.path.join(cache_dir, name)
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total_bytes += stat.st_size
+
+    entries.sort()
+
+    for _, size, path in entries:
+        if total_bytes <= max_cache_bytes:
+            break
+
+        _remove(path)
+        total_bytes -= size
+
+
+def _touch(path: str):
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
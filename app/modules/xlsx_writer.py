@@ -0,0 +1,467 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timezone
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.datetime import to_excel
+from openpyxl.utils.exceptions import IllegalCharacterError
+from typing import Iterable, Optional
+from xml.sax.saxutils import escape, quoteattr
+import math
+import os
+import shutil
+import struct
+import tempfile
+import time as clock
+import zlib
+
+
+DEFAULT_COMPRESSION_LEVEL = 6
+
+MAX_ROWS_PER_SHEET = 1048576
+
+MAX_STRING_LENGTH = 32767
+
+NON_FINITE_ERROR = "#NUM!"
+
+CHUNK_BYTES = 1024 ** 2
+
+ZIP64_LIMIT = 0xFFFFFFFF
+
+ZIP64_MARKER = 0xFFFFFFFF
+
+DATETIME_STYLE = 1
+
+DATE_STYLE = 2
+
+TIME_STYLE = 3
+
+MAIN_NAMESPACE = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+RELATIONSHIP_NAMESPACE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+CONTENT_TYPES = {
+    "workbook": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml",
+    "worksheet": "application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml",
+    "styles": "application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml",
+    "sharedStrings": "application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml",
+    "core": "application/vnd.openxmlformats-package.core-properties+xml"
+}
+
+STYLES_XML = (
+    XML_DECLARATION
+    + f'<styleSheet xmlns="{MAIN_NAMESPACE}">'
+    + '<numFmts count="2">'
+    + '<numFmt numFmtId="164" formatCode="yyyy-mm-dd h:mm:ss"/>'
+    + '<numFmt numFmtId="165" formatCode="yyyy-mm-dd"/>'
+    + '</numFmts>'
+    + '<fonts count="1"><font><sz val="11"/><name val="Calibri"/><family val="2"/></font></fonts>'
+    + '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    + '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    + '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    + '<cellXfs count="4">'
+    + '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    + '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    + '<xf numFmtId="165" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    + '<xf numFmtId="21" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+    + '</cellXfs>'
+    + '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    + '</styleSheet>'
+)
+
+
+class SharedStrings:
+    def __init__(self):
+        self.indexes: dict[str, int] = {}
+        self.count = 0
+
+    def add(self, value: str) -> int:
+        self.count += 1
+        index = self.indexes.get(value)
+
+        if index is None:
+            index = self.indexes[value] = len(self.indexes)
+
+        return index
+
+    def to_xml(self) -> str:
+        items = []
+
+        for value in self.indexes:
+            if value != value.strip():
+                items.append(f'<si><t xml:space="preserve">{escape(value)}</t></si>')
+            else:
+                items.append(f"<si><t>{escape(value)}</t></si>")
+
+        return (
+            XML_DECLARATION
+            + f'<sst xmlns="{MAIN_NAMESPACE}" count="{self.count}" uniqueCount="{len(self.indexes)}">'
+            + "".join(items)
+            + "</sst>"
+        )
+
+
+class SheetWriter:
+    def __init__(self, title: str, body_path: str, shared_strings: SharedStrings):
+        self.title = title
+        self.body_path = body_path
+        self.shared_strings = shared_strings
+        self.row_count = 0
+        self.column_count = 0
+        self._file = open(body_path, "w", encoding="utf-8", buffering=CHUNK_BYTES)
+
+    def append(self, row: Iterable[any]):
+        if self.row_count >= MAX_ROWS_PER_SHEET:
+            raise ValueError(f"A aba {self.title} excedeu o limite de {MAX_ROWS_PER_SHEET} linhas")
+
+        self.row_count += 1
+        row_number = self.row_count
+        cells = []
+        column = 0
+
+        for column, value in enumerate(row, start=1):
+            if value is None or value == "":
+                continue
+
+            cells.append(self._cell_xml(f"{get_column_letter(column)}{row_number}", value))
+
+        self.column_count = max(self.column_count, column)
+
+        if cells:
+            self._file.write(f'<row r="{row_number}">{"".join(cells)}</row>')
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def get_dimension(self) -> str:
+        if not self.row_count or not self.column_count:
+            return "A1"
+
+        return f"A1:{get_column_letter(self.column_count)}{self.row_count}"
+
+    def _cell_xml(self, reference: str, value: any) -> str:
+        if isinstance(value, str):
+            return f'<c r="{reference}" t="s"><v>{self.shared_strings.add(_check_string(value, reference))}</v></c>'
+
+        if isinstance(value, bool):
+            return f'<c r="{reference}" t="b"><v>{int(value)}</v></c>'
+
+        if isinstance(value, int):
+            return f'<c r="{reference}"><v>{value}</v></c>'
+
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return f'<c r="{reference}" t="e"><v>{NON_FINITE_ERROR}</v></c>'
+
+            return f'<c r="{reference}"><v>{value!r}</v></c>'
+
+        if isinstance(value, datetime):
+            return f'<c r="{reference}" s="{DATETIME_STYLE}"><v>{to_excel(value)}</v></c>'
+
+        if isinstance(value, date):
+            return f'<c r="{reference}" s="{DATE_STYLE}"><v>{to_excel(value)}</v></c>'
+
+        if isinstance(value, time):
+            return f'<c r="{reference}" s="{TIME_STYLE}"><v>{to_excel(value)}</v></c>'
+
+        return f'<c r="{reference}" t="s"><v>{self.shared_strings.add(_check_string(str(value), reference))}</v></c>'
+
+
+class XlsxWriter:
+    def __init__(
+        self,
+        compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+        workers: Optional[int] = None,
+        keywords: Optional[str] = None
+    ):
+        self.compression_level = compression_level
+        self.workers = workers
+        self.keywords = keywords
+        self.shared_strings = SharedStrings()
+        self.sheets: list[SheetWriter] = []
+        self.temp_dir = tempfile.mkdtemp(prefix="xlsx_")
+
+    @property
+    def sheetnames(self) -> list[str]:
+        return [sheet.title for sheet in self.sheets]
+
+    def create_sheet(self, title: str) -> SheetWriter:
+        if title in self.sheetnames:
+            raise ValueError(f"Aba repetida: {title}")
+
+        body_path = os.path.join(self.temp_dir, f"sheet{len(self.sheets) + 1}.xml")
+        sheet = SheetWriter(title=title, body_path=body_path, shared_strings=self.shared_strings)
+        self.sheets.append(sheet)
+
+        return sheet
+
+    def save(self, output_path: str):
+        if not self.sheets:
+            self.create_sheet("Sheet")
+
+        try:
+            for sheet in self.sheets:
+                sheet.close()
+
+            workers = self.workers or min(len(self.sheets), os.cpu_count() or 1)
+
+            with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+                sheet_parts = list(executor.map(self._compress_sheet, self.sheets))
+
+            parts = [
+                self._compress_text("[Content_Types].xml", self._content_types_xml()),
+                self._compress_text("_rels/.rels", self._root_rels_xml()),
+                self._compress_text("docProps/core.xml", self._core_xml()),
+                self._compress_text("xl/workbook.xml", self._workbook_xml()),
+                self._compress_text("xl/_rels/workbook.xml.rels", self._workbook_rels_xml()),
+                self._compress_text("xl/styles.xml", STYLES_XML),
+                self._compress_text("xl/sharedStrings.xml", self.shared_strings.to_xml())
+            ] + sheet_parts
+
+            _write_zip(output_path, parts)
+        finally:
+            self.close()
+
+    def close(self):
+        for sheet in self.sheets:
+            sheet.close()
+
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _compress_sheet(self, sheet: SheetWriter) -> tuple[str, str, int, int, int]:
+        index = self.sheets.index(sheet) + 1
+        header = (
+            XML_DECLARATION
+            + f'<worksheet xmlns="{MAIN_NAMESPACE}" xmlns:r="{RELATIONSHIP_NAMESPACE}">'
+            + f'<dimension ref="{sheet.get_dimension()}"/><sheetData>'
+        )
+        footer = "</sheetData></worksheet>"
+
+        def chunks():
+            yield header.encode("utf-8")
+
+            with open(sheet.body_path, "rb") as file:
+                while chunk := file.read(CHUNK_BYTES):
+                    yield chunk
+
+            yield footer.encode("utf-8")
+
+        return self._compress(f"xl/worksheets/sheet{index}.xml", chunks())
+
+    def _compress_text(self, name: str, text: str) -> tuple[str, str, int, int, int]:
+        return self._compress(name, [text.encode("utf-8")])
+
+    def _compress(self, name: str, chunks: Iterable[bytes]) -> tuple[str, str, int, int, int]:
+        compressor = zlib.compressobj(self.compression_level, zlib.DEFLATED, -15)
+        compressed_path = os.path.join(self.temp_dir, f"{name.replace('/', '_')}.deflate")
+        crc = 0
+        size = 0
+
+        with open(compressed_path, "wb") as file:
+            for chunk in chunks:
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                file.write(compressor.compress(chunk))
+
+            file.write(compressor.flush())
+            compressed_size = file.tell()
+
+        return name, compressed_path, crc, compressed_size, size
+
+    def _content_types_xml(self) -> str:
+        overrides = [
+            ("/xl/workbook.xml", CONTENT_TYPES["workbook"]),
+            ("/xl/styles.xml", CONTENT_TYPES["styles"]),
+            ("/xl/sharedStrings.xml", CONTENT_TYPES["sharedStrings"]),
+            ("/docProps/core.xml", CONTENT_TYPES["core"])
+        ] + [
+            (f"/xl/worksheets/sheet{index}.xml", CONTENT_TYPES["worksheet"])
+            for index in range(1, len(self.sheets) + 1)
+        ]
+
+        return (
+            XML_DECLARATION
+            + '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            + '<Default Extension="xml" ContentType="application/xml"/>'
+            + "".join(f'<Override PartName="{part}" ContentType="{content_type}"/>' for part, content_type in overrides)
+            + "</Types>"
+        )
+
+    def _root_rels_xml(self) -> str:
+        return (
+            XML_DECLARATION
+            + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + f'<Relationship Id="rId1" Type="{RELATIONSHIP_NAMESPACE}/officeDocument" Target="xl/workbook.xml"/>'
+            + '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" Target="docProps/core.xml"/>'
+            + "</Relationships>"
+        )
+
+    def _core_xml(self) -> str:
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        keywords = f"<cp:keywords>{escape(self.keywords)}</cp:keywords>" if self.keywords else ""
+
+        return (
+            XML_DECLARATION
+            + '<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties" '
+            + 'xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/" '
+            + 'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">'
+            + keywords
+            + f'<dcterms:created xsi:type="dcterms:W3CDTF">{now}</dcterms:created>'
+            + f'<dcterms:modified xsi:type="dcterms:W3CDTF">{now}</dcterms:modified>'
+            + "</cp:coreProperties>"
+        )
+
+    def _workbook_xml(self) -> str:
+        sheets = "".join(
+            f'<sheet name={quoteattr(sheet.title)} sheetId="{index}" r:id="rId{index}"/>'
+            for index, sheet in enumerate(self.sheets, start=1)
+        )
+
+        return (
+            XML_DECLARATION
+            + f'<workbook xmlns="{MAIN_NAMESPACE}" xmlns:r="{RELATIONSHIP_NAMESPACE}">'
+            + f"<sheets>{sheets}</sheets>"
+            + "</workbook>"
+        )
+
+    def _workbook_rels_xml(self) -> str:
+        relationships = [
+            f'<Relationship Id="rId{index}" Type="{RELATIONSHIP_NAMESPACE}/worksheet" Target="worksheets/sheet{index}.xml"/>'
+            for index in range(1, len(self.sheets) + 1)
+        ]
+        styles_id = len(self.sheets) + 1
+
+        relationships.append(f'<Relationship Id="rId{styles_id}" Type="{RELATIONSHIP_NAMESPACE}/styles" Target="styles.xml"/>')
+        relationships.append(f'<Relationship Id="rId{styles_id + 1}" Type="{RELATIONSHIP_NAMESPACE}/sharedStrings" Target="sharedStrings.xml"/>')
+
+        return (
+            XML_DECLARATION
+            + '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + "".join(relationships)
+            + "</Relationships>"
+        )
+
+
+def _check_string(value: str, reference: str) -> str:
+    value = value[:MAX_STRING_LENGTH]
+
+    if ILLEGAL_CHARACTERS_RE.search(value):
+        raise IllegalCharacterError(f"{value!r} (célula {reference}) tem caracteres que não podem ser usados em planilhas")
+
+    return value
+
+
+def _write_zip(output_path: str, parts: list[tuple[str, str, int, int, int]]):
+    dos_time, dos_date = _get_dos_timestamp()
+    central_records = []
+
+    with open(output_path, "wb") as output:
+        for name, compressed_path, crc, compressed_size, size in parts:
+            offset = output.tell()
+            encoded_name = name.encode("utf-8")
+            is_zip64 = size >= ZIP64_LIMIT or compressed_size >= ZIP64_LIMIT
+
+            extra = struct.pack("<HHQQ", 1, 16, size, compressed_size) if is_zip64 else b""
+
+            output.write(struct.pack(
+                "<IHHHHHIIIHH",
+                0x04034b50,
+                45 if is_zip64 else 20,
+                0,
+                zlib.DEFLATED,
+                dos_time,
+                dos_date,
+                crc,
+                ZIP64_MARKER if is_zip64 else compressed_size,
+                ZIP64_MARKER if is_zip64 else size,
+                len(encoded_name),
+                len(extra)
+            ))
+            output.write(encoded_name + extra)
+
+            with open(compressed_path, "rb") as file:
+                shutil.copyfileobj(file, output, CHUNK_BYTES)
+
+            os.remove(compressed_path)
+            central_records.append(_central_record(encoded_name, crc, compressed_size, size, offset, dos_time, dos_date))
+
+        directory_offset = output.tell()
+
+        for record in central_records:
+            output.write(record)
+
+        directory_size = output.tell() - directory_offset
+        count = len(central_records)
+
+        if directory_offset >= ZIP64_LIMIT or directory_size >= ZIP64_LIMIT or count >= 0xFFFF:
+            end_offset = output.tell()
+            output.write(struct.pack("<IQHHIIQQQQ", 0x06064b50, 44, 45, 45, 0, 0, count, count, directory_size, directory_offset))
+            output.write(struct.pack("<IIQI", 0x07064b50, 0, end_offset, 1))
+
+        output.write(struct.pack(
+            "<IHHHHIIH",
+            0x06054b50,
+            0,
+            0,
+            min(count, 0xFFFF),
+            min(count, 0xFFFF),
+            ZIP64_MARKER if directory_size >= ZIP64_LIMIT else directory_size,
+            ZIP64_MARKER if directory_offset >= ZIP64_LIMIT else directory_offset,
+            0
+        ))
+
+
+def _central_record(
+    encoded_name: bytes,
+    crc: int,
+    compressed_size: int,
+    size: int,
+    offset: int,
+    dos_time: int,
+    dos_date: int
+) -> bytes:
+    zip64_values = []
+
+    if size >= ZIP64_LIMIT:
+        zip64_values.append(size)
+
+    if compressed_size >= ZIP64_LIMIT:
+        zip64_values.append(compressed_size)
+
+    if offset >= ZIP64_LIMIT:
+        zip64_values.append(offset)
+
+    extra = struct.pack(f"<HH{len(zip64_values)}Q", 1, 8 * len(zip64_values), *zip64_values) if zip64_values else b""
+    version = 45 if zip64_values else 20
+
+    return struct.pack(
+        "<IHHHHHHIIIHHHHHII",
+        0x02014b50,
+        version,
+        version,
+        0,
+        zlib.DEFLATED,
+        dos_time,
+        dos_date,
+        crc,
+        ZIP64_MARKER if compressed_size >= ZIP64_LIMIT else compressed_size,
+        ZIP64_MARKER if size >= ZIP64_LIMIT else size,
+        len(encoded_name),
+        len(extra),
+        0,
+        0,
+        0,
+        0,
+        ZIP64_MARKER if offset >= ZIP64_LIMIT else offset
+    ) + encoded_name + extra
+
+
+def _get_dos_timestamp() -> tuple[int, int]:
+    now = clock.localtime()
+    dos_time = (now.tm_hour << 11) | (now.tm_min << 5) | (now.tm_sec // 2)
+    dos_date = ((now.tm_year - 1980) << 9) | (now.tm_mon << 4) | now.tm_mday
+
+    return dos_time, dos_date
@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
+
+
+@pytest.fixture(autouse=True)
+def layout_cache(tmp_path, monkeypatch):
+    from modules import layout
+
+    cache_path = str(tmp_path / "layouts")
+    monkeypatch.setattr(layout, "get_layout_cache_path", lambda: cache_path)
+    monkeypatch.setattr(layout, "_layouts", {})
+
+    return cache_path
@@ -0,0 +1,35 @@
+from modules import daemon
+from modules.watcher import WorkbookWatcher
+
+
+def test_process_job_leaves_failed_files_for_the_next_job(tmp_path, monkeypatch):
+    process_path = tmp_path / "Concessionárias" / "AME" / "Reajuste"
+    process_path.mkdir(parents=True)
+    file_paths = []
+
+    for name in ["AME_Reajuste_2022-04-01.xlsx", "AME_Reajuste_2023-04-01.xlsx"]:
+        (process_path / name).write_bytes(b"planilha")
+        file_paths.append(str(process_path / name))
+
+    calls = []
+
+    def process_new_workbooks(agent, file_paths, on_file_failed=None, **kwargs):
+        calls.append(list(file_paths))
+
+        if len(calls) == 1:
+            on_file_failed(file_paths[1])
+
+        return ["AME"]
+
+    monkeypatch.setattr(daemon, "process_new_workbooks", process_new_workbooks)
+
+    warm_daemon = daemon.WarmDaemon(socket_path=str(tmp_path / "servico.sock"))
+    warm_daemon.watchers["Concessionária"] = WorkbookWatcher(
+        str(tmp_path / "Concessionárias"), str(tmp_path / "catalogo.json"), settle_seconds=0
+    )
+
+    result = daemon._run_process_job(warm_daemon, {"agent": "Concessionária"})
+
+    assert result["failed"] == 1
+    assert daemon._run_process_job(warm_daemon, {"agent": "Concessionária"})["files"] == 1
+    assert calls == [file_paths, [file_paths[1]]]
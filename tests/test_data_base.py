@@ -0,0 +1,94 @@
+from datetime import datetime
+import os
+from openpyxl import Workbook
+from modules import data_base
+from modules.db_reader import DISTRIBUTOR_HEADER
+
+HEADER = tuple(DISTRIBUTOR_HEADER) + ("SUBGRUPO", "VALOR")
+
+EMPTY_DISTRIBUTOR = ("",) * len(DISTRIBUTOR_HEADER)
+
+
+def _row(process: str, process_date: datetime, subgroup: str, value: float) -> tuple:
+    return ("Amazonas Energia", "AME", "Concessionária", "D02", 1, 2, process, process_date, subgroup, value)
+
+
+def _sorted_rows(*sources: list[tuple]) -> list[tuple]:
+    sources = [(Workbook(), None, HEADER, iter(rows)) for rows in sources]
+
+    return [row for row, _ in data_base._sorted_tab_rows(sources)]
+
+
+def test_hidden_rows_stay_before_their_process():
+    newer = [EMPTY_DISTRIBUTOR + ("B1", None), _row("Reajuste", datetime(2023, 4, 1), "B1", 2.0)]
+    older = [EMPTY_DISTRIBUTOR + ("A4", None), _row("Revisão", datetime(2021, 4, 1), "A4", 1.0)]
+
+    rows = _sorted_rows(newer, older)
+
+    assert rows == [older[0], older[1], newer[0], newer[1]]
+
+
+def test_sorted_redelivery_keeps_one_hidden_row_per_process():
+    revision = [EMPTY_DISTRIBUTOR + ("A4", None), _row("Revisão", datetime(2021, 4, 1), "A4", 1.0)]
+    adjustment = [EMPTY_DISTRIBUTOR + ("B1", None), _row("Reajuste", datetime(2023, 4, 1), "B1", 2.0)]
+    rows = _sorted_rows(adjustment, revision)
+
+    for _ in range(2):
+        kept_rows = data_base._rows_outside_processes(iter(rows), None, {("AME", "Revisão", datetime(2021, 4, 1))})
+        rows = _sorted_rows(list(kept_rows), revision)
+
+    assert rows == revision + adjustment
+
+
+def test_resume_retries_failed_files(tmp_path, monkeypatch):
+    process_path = tmp_path / "Concessionárias" / "AME" / "Reajuste"
+    process_path.mkdir(parents=True)
+    jobs = []
+
+    for name in ["AME_Reajuste_2022-04-01.xlsx", "AME_Reajuste_2023-04-01.xlsx"]:
+        (process_path / name).write_bytes(b"planilha")
+        jobs.append({"group": "AME", "distributor": "AME", "tariff_process": "Reajuste", "file_path": str(process_path / name)})
+
+    calls = []
+    failing = {jobs[1]["file_path"]}
+
+    def process_workbook_file(job, **kwargs):
+        calls.append(job["file_path"])
+
+        if job["file_path"] in failing:
+            return None
+
+        temp_path = job["file_path"].replace(".xlsx", "_temp.xlsx")
+
+        with open(temp_path, "wb") as file:
+            file.write(b"temporario")
+
+        return temp_path
+
+    def create_distributor_db(distributor, temp_file_paths, distributors_path, **kwargs):
+        output_path = os.path.join(distributors_path, distributor, "AME_BANCO.xlsx")
+
+        with open(output_path, "wb") as file:
+            file.write(repr(temp_file_paths).encode("utf-8"))
+
+        return output_path
+
+    monkeypatch.setattr(data_base, "select_workbook_jobs", lambda agent, distributors=None: [dict(job) for job in jobs])
+    monkeypatch.setattr(data_base, "inventory_workbook_jobs", lambda agent, jobs, tabs=None: (jobs, []))
+    monkeypatch.setattr(data_base, "_process_workbook_file", process_workbook_file)
+    monkeypatch.setattr(data_base, "_create_distributor_db", create_distributor_db)
+
+    data_base.process_workbooks("Concessionária", tabs=["CUSTOS"], base_path=str(tmp_path))
+
+    assert calls == [job["file_path"] for job in jobs]
+
+    failing.clear()
+    calls.clear()
+    data_base.process_workbooks("Concessionária", tabs=["CUSTOS"], resume=True, base_path=str(tmp_path))
+
+    assert calls == [jobs[1]["file_path"]]
+
+    calls.clear()
+    data_base.process_workbooks("Concessionária", tabs=["CUSTOS"], resume=True, base_path=str(tmp_path))
+
+    assert calls == [job["file_path"] for job in jobs]
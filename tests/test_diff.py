@@ -0,0 +1,52 @@
+from datetime import datetime
+import pytest
+from openpyxl import Workbook
+from modules.db_reader import DISTRIBUTOR_HEADER
+from modules.diff import diff_history
+
+TUSD_HEADER = [
+    "TIPO DE TARIFA", "SUBGRUPO", "MODALIDADE", "CLASSE", "SUBCLASSE", "DETALHE", "UC DO CONSUMIDOR", "POSTO", "UNIDADE", "FIO A"
+]
+
+
+def _write_db(path: str, header: list[str], rows: list[list[any]]):
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "TUSD"
+    worksheet.append(DISTRIBUTOR_HEADER + header)
+
+    for row in rows:
+        worksheet.append(row)
+
+    workbook.save(path)
+
+
+def _tariff_row(process: str, process_date: datetime, uc: str, value: float) -> list[any]:
+    distributor_values = ["Amazonas Energia", "AME", "Concessionária", "D02", 1, 2, process, process_date]
+
+    return distributor_values + ["TR TUSD", "B1", "CONVENCIONAL", "RES", "Não se aplica", "Não se aplica", uc, "Não se aplica", "MWh", value]
+
+
+def test_uc_column_is_resolved_from_header(tmp_path):
+    db_path = str(tmp_path / "banco.xlsx")
+
+    _write_db(db_path, TUSD_HEADER, [
+        _tariff_row("Revisão", datetime(2021, 4, 1), "UC1", 10.0),
+        _tariff_row("Revisão", datetime(2021, 4, 1), "UC2", 20.0),
+        _tariff_row("Reajuste", datetime(2022, 4, 1), "UC2", 20.0),
+        _tariff_row("Reajuste", datetime(2022, 4, 1), "UC1", 12.0)
+    ])
+
+    rows = list(diff_history(db_path)["TUSD"])
+
+    assert [(row[5], row[6], row[7]) for row in rows] == [("TR TUSD | B1 | CONVENCIONAL | RES | UC1 | MWh", "Alterada", "FIO A")]
+
+
+def test_missing_key_column_fails(tmp_path):
+    db_path = str(tmp_path / "banco.xlsx")
+    header = [column_name for column_name in TUSD_HEADER if column_name != "MODALIDADE"]
+
+    _write_db(db_path, header, [])
+
+    with pytest.raises(ValueError, match="MODALIDADE"):
+        diff_history(db_path)
@@ -0,0 +1,10 @@
+import pytest
+import main
+
+
+def test_resume_is_rejected_on_partial_runs(capsys):
+    with pytest.raises(SystemExit) as error:
+        main.main(["process", "--since", "2023-01-01", "--resume"])
+
+    assert error.value.code == 2
+    assert "--resume" in capsys.readouterr().err
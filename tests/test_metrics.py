@@ -0,0 +1,18 @@
+from modules.metrics import get_metrics, get_metrics_path, run_metrics
+
+
+def test_runs_are_labelled_by_name(tmp_path):
+    for run_name in ["processamento_Concessionária", "novas_planilhas_Concessionária"]:
+        with run_metrics(str(tmp_path), run_name, agent="Concessionária"):
+            get_metrics().inc("files_processed_total", tariff_process="Reajuste")
+
+    samples = [
+        line for run_name in ["processamento_Concessionária", "novas_planilhas_Concessionária"]
+        for line in open(get_metrics_path(str(tmp_path), run_name), encoding="utf-8").read().splitlines()
+        if line.startswith("tarifas_files_processed_total")
+    ]
+
+    assert samples == [
+        'tarifas_files_processed_total{agent="Concessionária",run="processamento_Concessionária",tariff_process="Reajuste"} 1',
+        'tarifas_files_processed_total{agent="Concessionária",run="novas_planilhas_Concessionária",tariff_process="Reajuste"} 1'
+    ]
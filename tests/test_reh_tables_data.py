@@ -0,0 +1,104 @@
+import pytest
+from modules.tabs.reh_tables_data import load_reh_tables_rows
+from modules.utils import load_values, get_rows_and_columns_from
+from workbooks import make_reh_workbook
+
+
+def _legacy_info_from(column_name, worksheet):
+    values = []
+
+    for row, column in get_rows_and_columns_from(value=column_name, worksheet=worksheet):
+        values += load_values(from_worksheet=worksheet, index=column - 1, direction="column", start=row + 3)
+
+    return values
+
+
+def _legacy_extended_info_from(column_name, first_table, worksheet):
+    subgroups = get_rows_and_columns_from(value="SUBGRUPO", worksheet=worksheet)
+
+    if subgroups:
+        row, column = subgroups[0 if first_table else 1]
+    else:
+        row, column = (2, 1) if first_table else (2, 12)
+
+    filler = ["Não se aplica"] * len(load_values(from_worksheet=worksheet, index=column - 1, direction="column", start=row + 3))
+
+    if first_table:
+        return filler + _legacy_info_from(column_name, worksheet)
+
+    return _legacy_info_from(column_name, worksheet) + filler
+
+
+def _legacy_tusd_or_te_info(tusd_or_te, unit, type, worksheet):
+    values = []
+
+    for row, column in get_rows_and_columns_from(value=unit, worksheet=worksheet):
+        if load_values(from_worksheet=worksheet, index=row - 2, direction="row", start=column)[0] != tusd_or_te:
+            continue
+
+        if load_values(from_worksheet=worksheet, index=row - 3, direction="row", start=column)[0] != type:
+            continue
+
+        values += load_values(from_worksheet=worksheet, index=column - 1, direction="column", start=row + 1)
+
+    return values
+
+
+def _legacy_reh_rows(workbook):
+    worksheet = workbook["TABELAS REH"]
+
+    columns = [
+        _legacy_info_from("SUBGRUPO", worksheet),
+        _legacy_info_from("MODALIDADE", worksheet),
+        _legacy_extended_info_from("ACESSANTE", False, worksheet),
+        _legacy_extended_info_from("CLASSE", True, worksheet),
+        _legacy_extended_info_from("SUBCLASSE", True, worksheet),
+        _legacy_info_from("POSTO", worksheet)
+    ]
+
+    for type in ["TARIFAS DE APLICAÇÃO", "BASE ECONÔMICA"]:
+        for tusd_or_te, unit in [("TUSD", "R$/kW"), ("TUSD", "R$/MWh"), ("TE", "R$/MWh")]:
+            columns.append(_legacy_tusd_or_te_info(tusd_or_te, unit, type, worksheet))
+
+    return list(zip(*columns))
+
+
+@pytest.mark.parametrize("seed, extra_blocks", [(0, 0), (1, 0), (2, 2)])
+def test_block_map_matches_legacy_scans(seed, extra_blocks):
+    workbook = make_reh_workbook(seed=seed, extra_blocks=extra_blocks)
+
+    rows = list(load_reh_tables_rows(workbook))
+
+    assert len(rows) > 1
+    assert len(rows[0]) == 12
+    assert rows[1:] == _legacy_reh_rows(workbook)
+
+
+def test_missing_sheet_returns_none():
+    workbook = make_reh_workbook()
+    workbook["TABELAS REH"].title = "OUTRA"
+
+    assert load_reh_tables_rows(workbook) is None
+
+
+def test_cached_layout_is_not_reused_for_extra_blocks():
+    load_reh_tables_rows(make_reh_workbook(seed=0))
+    workbook = make_reh_workbook(seed=2, extra_blocks=2)
+
+    rows = list(load_reh_tables_rows(workbook))
+
+    assert rows[1:] == _legacy_reh_rows(workbook)
+
+
+def test_cached_layout_is_reused_for_same_blocks(monkeypatch):
+    from modules.tabs import reh_tables_data
+
+    load_reh_tables_rows(make_reh_workbook(seed=0))
+    workbook = make_reh_workbook(seed=1)
+
+    def fail(**kwargs):
+        raise AssertionError("layout discovered again")
+
+    monkeypatch.setattr(reh_tables_data, "get_rows_and_columns_of", fail)
+
+    assert list(load_reh_tables_rows(workbook))[1:] == _legacy_reh_rows(workbook)
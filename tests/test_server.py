@@ -0,0 +1,38 @@
+import io
+import json
+from modules import server
+from modules.server import ResponseCache, SliceRequestHandler
+
+
+class _Handler(SliceRequestHandler):
+    def __init__(self):
+        self.wfile = io.BytesIO()
+
+    def send_response(self, status):
+        pass
+
+    def send_header(self, name, value):
+        pass
+
+    def end_headers(self):
+        pass
+
+
+def test_json_rows_are_valid_json():
+    body = b"".join(server._json_chunks(["VALOR", "OUTRO"], iter([(float("nan"), float("inf")), (1.5, -0.25)])))
+
+    assert json.loads(body, parse_constant=lambda constant: 1 / 0) == [
+        {"VALOR": None, "OUTRO": None},
+        {"VALOR": 1.5, "OUTRO": -0.25}
+    ]
+
+
+def test_large_responses_stop_being_buffered():
+    cache = ResponseCache(max_bytes=40)
+    handler = _Handler()
+
+    chunks = [b"0123456789"] * 3
+
+    assert handler._send_chunks(200, "text/csv", "etag", iter(chunks), cache.max_entry_bytes) is None
+    assert handler.wfile.getvalue() == b"".join(chunks)
+    assert handler._send_chunks(200, "text/csv", "etag", iter(chunks[:1]), cache.max_entry_bytes) == chunks[:1]
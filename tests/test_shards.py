@@ -0,0 +1,82 @@
+import json
+import os
+import threading
+import time
+from modules import shards
+
+
+def test_plan_clears_previous_shard_journals(tmp_path, monkeypatch):
+    jobs = []
+
+    for distributor in ["AME", "CEMIG"]:
+        file_path = tmp_path / f"{distributor}_Reajuste_2023-04-01.xlsx"
+        file_path.write_bytes(b"planilha")
+        jobs.append({"distributor": distributor, "file_path": str(file_path)})
+
+    abspath = os.path.abspath
+    monkeypatch.setattr(shards.os.path, "abspath", lambda path: str(tmp_path) if path.endswith("../../") else abspath(path))
+    monkeypatch.setattr(shards, "select_workbook_jobs", lambda agent, distributors=None: jobs)
+
+    journal_paths = [tmp_path / ".cache" / f"execucao_Concessionária_fragmento_{index}.jsonl" for index in range(2)]
+    journal_paths[0].parent.mkdir(parents=True)
+
+    for journal_path in journal_paths:
+        journal_path.write_text('{"type": "run"}\n{"type": "distributor", "distributor": "AME"}\n', encoding="utf-8")
+
+    planned = shards.plan_shards("Concessionária", shard_count=2, strategy="hash")
+
+    assert sorted(distributor for shard in planned for distributor in shard["distributors"]) == ["AME", "CEMIG"]
+    assert not any(journal_path.exists() for journal_path in journal_paths)
+
+
+def _write_lock(lock_path, heartbeat: float, host: str = "outro-host"):
+    lock_path.write_text(json.dumps({"worker": "remoto", "host": host, "pid": 1, "started": 0.0, "heartbeat": heartbeat}), encoding="utf-8")
+
+
+def test_expired_remote_locks_are_taken_over(tmp_path):
+    lock_path = tmp_path / "fragmento_0.trava"
+    _write_lock(lock_path, time.time())
+
+    assert shards._claim_shard(str(tmp_path), 0, "local") is None
+
+    _write_lock(lock_path, time.time() - shards.LOCK_TTL_SECONDS - 1)
+    owner = shards._claim_shard(str(tmp_path), 0, "local")
+
+    assert owner["worker"] == "local"
+    assert json.loads(lock_path.read_text(encoding="utf-8")) == owner
+
+
+def test_takeover_leaves_a_lock_claimed_meanwhile(tmp_path, monkeypatch):
+    lock_path = tmp_path / "fragmento_0.trava"
+    _write_lock(lock_path, time.time() - shards.LOCK_TTL_SECONDS - 1)
+    is_lock_stale = shards._is_lock_stale
+    calls = []
+
+    def claimed_meanwhile(owner):
+        calls.append(owner)
+
+        if len(calls) == 1:
+            _write_lock(lock_path, time.time(), host="outro-worker")
+
+        return is_lock_stale(owner)
+
+    monkeypatch.setattr(shards, "_is_lock_stale", claimed_meanwhile)
+
+    assert shards._claim_shard(str(tmp_path), 0, "local") is None
+    assert json.loads(lock_path.read_text(encoding="utf-8"))["host"] == "outro-worker"
+
+
+def test_running_workers_refresh_their_lock(tmp_path, monkeypatch):
+    lock_path = str(tmp_path / "fragmento_0.trava")
+    owner = shards._claim_shard(str(tmp_path), 0, "local")
+    started = owner["heartbeat"]
+    stop = threading.Event()
+
+    monkeypatch.setattr(shards, "LOCK_HEARTBEAT_SECONDS", 0.01)
+    heartbeat = threading.Thread(target=shards._keep_lock_alive, args=(lock_path, owner, stop))
+    heartbeat.start()
+    time.sleep(0.1)
+    stop.set()
+    heartbeat.join()
+
+    assert shards._read_lock(lock_path)["heartbeat"] > started
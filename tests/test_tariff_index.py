@@ -0,0 +1,60 @@
+from datetime import datetime
+from openpyxl import Workbook
+from modules.db_reader import DISTRIBUTOR_HEADER
+from modules.tariff_index import build_tariff_index
+
+
+def _distributor_values(process: str, process_date: datetime) -> list[any]:
+    return ["Amazonas Energia", "AME", "Concessionária", "D02", 1, 2, process, process_date]
+
+
+def _write_db(path: str, rows: list[list[any]]):
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "TUSD"
+    worksheet.append(DISTRIBUTOR_HEADER + ["SUBGRUPO", "MODALIDADE", "POSTO", "TUSD"])
+
+    for row in rows:
+        worksheet.append(row)
+
+    workbook.save(path)
+
+
+def test_dropped_key_ends_at_next_process(tmp_path):
+    first = _distributor_values("Revisão", datetime(2021, 4, 1))
+    second = _distributor_values("Reajuste", datetime(2022, 4, 1))
+    db_path = str(tmp_path / "banco.xlsx")
+
+    _write_db(db_path, [
+        first + ["B1", "CONVENCIONAL", "Não se aplica", 10.0],
+        first + ["A4", "AZUL", "P", 20.0],
+        second + ["B1", "CONVENCIONAL", "Não se aplica", 11.0]
+    ])
+
+    index = build_tariff_index(db_path)
+
+    [result] = index.lookup("AME", "A4", "AZUL", "P", on=datetime(2021, 6, 1))
+    assert result["valid_until"] == datetime(2022, 4, 1)
+    assert index.lookup("AME", "A4", "AZUL", "P", on=datetime(2022, 6, 1)) == []
+
+    [result] = index.lookup("AME", "B1", "CONVENCIONAL", "Não se aplica", on=datetime(2022, 6, 1))
+    assert result["valid_until"] is None
+    assert result["rows"][0]["TUSD"] == 11.0
+
+    ranged = index.lookup_range("AME", "A4", "AZUL", "P", start=datetime(2021, 1, 1), end=datetime(2023, 1, 1))
+    assert [result["process"] for result in ranged] == ["Revisão"]
+
+
+def test_missing_post_matches_every_post(tmp_path):
+    process = _distributor_values("Revisão", datetime(2021, 4, 1))
+    db_path = str(tmp_path / "banco.xlsx")
+
+    _write_db(db_path, [
+        process + ["A4", "AZUL", "P", 20.0],
+        process + ["A4", "AZUL", "FP", 5.0]
+    ])
+
+    index = build_tariff_index(db_path)
+    results = index.lookup("AME", "A4", "AZUL", None, on=datetime(2021, 6, 1))
+
+    assert sorted(result["post"] for result in results) == ["FP", "P"]
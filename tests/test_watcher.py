@@ -0,0 +1,84 @@
+import os
+from modules import watcher as watcher_module
+
+
+def _make_tree(tmp_path):
+    distributors_path = tmp_path / "Concessionárias"
+    process_path = distributors_path / "AME" / "Reajuste"
+    process_path.mkdir(parents=True)
+
+    file_path = process_path / "AME_Reajuste_2023-04-01.xlsx"
+    file_path.write_bytes(b"planilha")
+
+    return str(distributors_path), str(file_path)
+
+
+def test_watch_keeps_polling_after_a_failed_batch(tmp_path, monkeypatch, capsys):
+    distributors_path, file_path = _make_tree(tmp_path)
+    calls = []
+    sleeps = []
+
+    def process_new_workbooks(file_paths, **kwargs):
+        calls.append(list(file_paths))
+
+        if len(calls) == 1:
+            raise OSError("banco travado")
+
+        return ["AME"]
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+
+        if len(sleeps) == 3:
+            raise KeyboardInterrupt
+
+    clock = iter(range(0, 100000, 100))
+
+    monkeypatch.setattr(watcher_module, "process_new_workbooks", process_new_workbooks)
+    monkeypatch.setattr(watcher_module.time, "sleep", sleep)
+    monkeypatch.setattr(watcher_module.time, "time", lambda: next(clock))
+    monkeypatch.setattr(watcher_module, "RETRY_BASE_SECONDS", 50.0)
+
+    watcher_module.watch_workbooks("Concessionária", interval=1, settle_seconds=0, process_existing=True, base_path=str(tmp_path))
+
+    assert calls == [[file_path], [file_path]]
+    assert "banco travado" in capsys.readouterr().out
+
+
+def test_failed_files_wait_before_retrying(tmp_path):
+    distributors_path, file_path = _make_tree(tmp_path)
+    watcher = watcher_module.WorkbookWatcher(distributors_path, str(tmp_path / "catalogo.json"), settle_seconds=0)
+
+    assert watcher.poll(full=True) == [file_path]
+
+    retry_seconds = watcher.mark_failed([file_path])
+
+    assert retry_seconds == watcher_module.RETRY_BASE_SECONDS
+    assert watcher.poll() == []
+    assert file_path not in watcher.files
+
+    with open(file_path, "ab") as file:
+        file.write(b" alterada")
+
+    os.utime(file_path, (1, 1))
+
+    assert watcher.poll() == []
+    assert watcher.poll() == [file_path]
+
+
+def test_files_overwritten_in_place_are_detected(tmp_path):
+    distributors_path, file_path = _make_tree(tmp_path)
+    watcher = watcher_module.WorkbookWatcher(distributors_path, str(tmp_path / "catalogo.json"), settle_seconds=0)
+
+    assert watcher.poll(full=True) == [file_path]
+
+    watcher.mark_done([file_path])
+    directory_path = os.path.dirname(file_path)
+    directory_stat = os.stat(directory_path)
+
+    with open(file_path, "wb") as file:
+        file.write(b"planilha regravada")
+
+    os.utime(directory_path, ns=(directory_stat.st_atime_ns, directory_stat.st_mtime_ns))
+
+    assert watcher.poll() == [file_path]
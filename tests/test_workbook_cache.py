@@ -0,0 +1,42 @@
+from modules import workbook_cache
+from workbooks import make_reh_workbook
+
+
+def _save_workbooks(tmp_path, count: int) -> list[str]:
+    file_paths = []
+
+    for index in range(count):
+        file_path = str(tmp_path / f"AME_Reajuste_202{index}-04-01.xlsx")
+        make_reh_workbook(seed=index).save(file_path)
+        file_paths.append(file_path)
+
+    return file_paths
+
+
+def _cell_values(workbook) -> dict[str, list[tuple]]:
+    return {worksheet.title: list(worksheet.iter_rows(values_only=True)) for worksheet in workbook.worksheets}
+
+
+def test_cached_workbook_matches_source(tmp_path):
+    file_path, = _save_workbooks(tmp_path, 1)
+    cache_dir = str(tmp_path / "cache")
+
+    source = workbook_cache.load_cached_workbook(file_path, cache_dir=cache_dir)
+    cached = workbook_cache.load_cached_workbook(file_path, cache_dir=cache_dir)
+
+    assert _cell_values(cached) == _cell_values(source)
+    assert sorted(map(str, cached["TABELAS REH"].merged_cells.ranges)) == sorted(map(str, source["TABELAS REH"].merged_cells.ranges))
+
+
+def test_memory_hashes_are_evicted_with_their_entries(tmp_path):
+    file_paths = _save_workbooks(tmp_path, 3)
+    cache_dir = str(tmp_path / "cache")
+    workbook_cache.set_memory_cache_size(2)
+
+    try:
+        for file_path in file_paths:
+            workbook_cache.load_cached_workbook(file_path, cache_dir=cache_dir)
+
+        assert workbook_cache.get_memory_cache_info() == {"entries": 2, "max_entries": 2, "hashes": 2}
+    finally:
+        workbook_cache.set_memory_cache_size(0)
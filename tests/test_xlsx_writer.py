@@ -0,0 +1,104 @@
+from datetime import date, datetime, time
+import zipfile
+import pytest
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import IllegalCharacterError
+from modules import data_base, xlsx_writer
+from modules.data_base import DbOutput
+from modules.xlsx_writer import XlsxWriter
+
+ROWS = [
+    ["Sigla", "Data", "Dia", "Hora", "Ativo", "Valor", "Linhas"],
+    ["AME", datetime(2023, 4, 1, 12, 30), date(2023, 4, 1), time(8, 15), True, 1.25, 3],
+    [" AME ", datetime(2022, 4, 1), date(2022, 4, 1), time(0, 0), False, -0.5, 0],
+    ["AME", None, "", None, True, 1e-9, 123456789012],
+    ["AME", None, None, None, False, 0.1 + 0.2, 2 ** 53 + 1],
+    ["AME", None, None, None, False, 123.45600000000002, -7]
+]
+
+
+def _expected(row: list[any]) -> tuple:
+    return tuple(
+        None if value == "" else datetime.combine(value, time()) if type(value) is date else value
+        for value in row
+    )
+
+
+def _save(tmp_path, rows: list[list[any]], title: str = "DADOS") -> str:
+    output_path = str(tmp_path / "saida.xlsx")
+    writer = XlsxWriter()
+    sheet = writer.create_sheet(title)
+
+    for row in rows:
+        sheet.append(row)
+
+    writer.save(output_path)
+
+    return output_path
+
+
+def _load_rows(path: str) -> dict[str, list[tuple]]:
+    workbook = load_workbook(path)
+
+    return {worksheet.title: [tuple(row) for row in worksheet.iter_rows(values_only=True)] for worksheet in workbook.worksheets}
+
+
+def test_values_round_trip(tmp_path):
+    output_path = _save(tmp_path, ROWS)
+
+    with zipfile.ZipFile(output_path) as archive:
+        assert archive.testzip() is None
+        shared_strings = archive.read("xl/sharedStrings.xml").decode("utf-8")
+
+    assert 'count="12" uniqueCount="9"' in shared_strings
+    assert '<t xml:space="preserve"> AME </t>' in shared_strings
+
+    assert _load_rows(output_path) == {"DADOS": [_expected(row) for row in ROWS]}
+
+
+def test_non_finite_numbers_are_written_as_errors(tmp_path):
+    output_path = _save(tmp_path, [[float("nan"), float("inf"), 1.5]])
+
+    assert _load_rows(output_path) == {"DADOS": [("#NUM!", "#NUM!", 1.5)]}
+
+
+def test_core_properties_do_not_name_openpyxl(tmp_path):
+    output_path = _save(tmp_path, ROWS)
+
+    with zipfile.ZipFile(output_path) as archive:
+        assert b"openpyxl" not in archive.read("docProps/core.xml")
+
+
+def test_illegal_characters_are_rejected(tmp_path):
+    with pytest.raises(IllegalCharacterError, match="B1"):
+        _save(tmp_path, [["ok", "a\x01b"]])
+
+
+def test_rows_roll_over_to_ext_sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_base, "MAX_ROWS_PER_SHEET", 3)
+    output_path = str(tmp_path / "banco.xlsx")
+
+    output = DbOutput(header_max_row=1, output_mode="denormalized")
+    output.add_tab("TUSD", [("SUBGRUPO", "VALOR")], is_star_input=False)
+    output.write_rows("TUSD", ((("B1", float(index)), None) for index in range(5)))
+    output.save(output_path)
+
+    assert _load_rows(output_path) == {
+        "TUSD": [("SUBGRUPO", "VALOR"), ("B1", 0.0), ("B1", 1.0)],
+        "TUSD - Ext 1": [("SUBGRUPO", "VALOR"), ("B1", 2.0), ("B1", 3.0)],
+        "TUSD - Ext 2": [("SUBGRUPO", "VALOR"), ("B1", 4.0)]
+    }
+
+
+def test_zip64_records_are_readable(tmp_path, monkeypatch):
+    monkeypatch.setattr(xlsx_writer, "ZIP64_LIMIT", 64)
+    output_path = _save(tmp_path, ROWS)
+
+    with zipfile.ZipFile(output_path) as archive:
+        assert archive.testzip() is None
+        assert all(info.file_size >= 64 for info in archive.infolist())
+
+    with open(output_path, "rb") as file:
+        assert b"PK\x06\x06" in file.read()
+
+    assert _load_rows(output_path)["DADOS"][1] == _expected(ROWS[1])
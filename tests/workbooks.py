@@ -0,0 +1,68 @@
+from openpyxl import Workbook
+import random
+
+
+SUBGROUPS = ["A1", "A2", "A3a", "A4", "AS", "B1", "B2", "B3"]
+
+MODALITIES = ["AZUL", "VERDE", "CONVENCIONAL", "Não se aplica"]
+
+POSTS = ["P", "FP", "Não se aplica"]
+
+FIRST_TABLE_COLUMNS = ["SUBGRUPO", "MODALIDADE", "ACESSANTE", "POSTO"]
+
+SECOND_TABLE_COLUMNS = ["SUBGRUPO", "MODALIDADE", "CLASSE", "SUBCLASSE", "POSTO"]
+
+
+def make_reh_workbook(seed: int = 0, rows: int = 12, extra_blocks: int = 0) -> Workbook:
+    rnd = random.Random(seed)
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.title = "TABELAS REH"
+    worksheet.cell(row=1, column=1, value="TABELAS DA REH")
+
+    blocks = [(2, 1, FIRST_TABLE_COLUMNS, rows // 2), (2, 12, SECOND_TABLE_COLUMNS, rows)]
+    blocks += [(40 + 20 * index, 1, SECOND_TABLE_COLUMNS, rows // 3) for index in range(extra_blocks)]
+
+    for header_row, start_column, columns, length in blocks:
+        _add_reh_block(worksheet, rnd, header_row, start_column, columns, length)
+
+    return workbook
+
+
+def _add_reh_block(worksheet, rnd: random.Random, header_row: int, start_column: int, columns: list[str], length: int):
+    for offset, name in enumerate(columns):
+        worksheet.cell(row=header_row, column=start_column + offset, value=name)
+        worksheet.merge_cells(
+            start_row=header_row, start_column=start_column + offset,
+            end_row=header_row + 2, end_column=start_column + offset
+        )
+
+    tariff_column = start_column + len(columns)
+
+    for offset, label in [(0, "TARIFAS DE APLICAÇÃO"), (3, "BASE ECONÔMICA")]:
+        worksheet.cell(row=header_row, column=tariff_column + offset, value=label)
+        worksheet.merge_cells(
+            start_row=header_row, start_column=tariff_column + offset,
+            end_row=header_row, end_column=tariff_column + offset + 2
+        )
+
+        worksheet.cell(row=header_row + 1, column=tariff_column + offset, value="TUSD")
+        worksheet.merge_cells(
+            start_row=header_row + 1, start_column=tariff_column + offset,
+            end_row=header_row + 1, end_column=tariff_column + offset + 1
+        )
+        worksheet.cell(row=header_row + 1, column=tariff_column + offset + 2, value="TE")
+
+        worksheet.cell(row=header_row + 2, column=tariff_column + offset, value="R$/kW")
+        worksheet.cell(row=header_row + 2, column=tariff_column + offset + 1, value="R$/MWh")
+        worksheet.cell(row=header_row + 2, column=tariff_column + offset + 2, value="R$/MWh")
+
+    for index in range(length):
+        row = header_row + 3 + index
+        values = {"SUBGRUPO": SUBGROUPS[index % 8], "MODALIDADE": MODALITIES[index % 4], "POSTO": POSTS[index % 3]}
+
+        for offset, name in enumerate(columns):
+            worksheet.cell(row=row, column=start_column + offset, value=values.get(name, f"{name[:3]}{index}"))
+
+        for offset in range(6):
+            worksheet.cell(row=row, column=tariff_column + offset, value=round(rnd.random() * 300, 2))